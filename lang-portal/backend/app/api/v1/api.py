@@ -3,6 +3,7 @@ from app.api.v1.endpoints import (
     activities,
     admin,
     dashboard,
+    export,
     language_pairs,
     languages,
     logs,
@@ -27,6 +28,7 @@ api_router.include_router(language_pairs.router, prefix="/language-pairs", tags=
 api_router.include_router(languages.router, prefix="/languages", tags=["languages"])
 api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
 api_router.include_router(statistics.router, prefix="/statistics", tags=["statistics"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
 
 # System endpoints
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -1,10 +1,11 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, UTC
 
-from app.db.database import get_db
-from app.services.activity import activity_service, session_service
+from app.db.database import get_read_db
+from app.db.writer import WriteQueue, get_write_queue
+from app.services.activity import async_activity_service, async_session_service
 from app.schemas.activity import (
     ActivityCreate,
     ActivityUpdate,
@@ -17,6 +18,8 @@ from app.schemas.activity import (
 )
 from app.schemas.vocabulary import VocabularyResponse
 from app.core.cache import cache_response
+from app.core.conditional import conditional_get
+from app.core.pagination import set_page_headers
 from app.models.activity import Activity, Session as ActivitySession, SessionAttempt
 
 router = APIRouter()
@@ -79,7 +82,7 @@ router = APIRouter()
 )
 async def create_activity(
     activity: ActivityCreate,
-    db: Session = Depends(get_db)
+    writes: WriteQueue = Depends(get_write_queue)
 ):
     """Create activity with cache support."""
     # Validate vocabulary groups
@@ -91,30 +94,36 @@ async def create_activity(
                 "message": "At least one vocabulary group must be specified"
             }
         )
-    return activity_service.create_with_validation(db, obj_in=activity)
+
+    async def add_activity(writer: AsyncSession) -> Activity:
+        return await async_activity_service.add_with_validation(writer, obj_in=activity)
+
+    return await writes.submit(add_activity)
 
 @router.get(
     "/activities",
     response_model=List[ActivityResponse],
     summary="List Activities",
-    description="Get a list of all activities with cache support."
+    description="""
+    Get a list of activities.
+    
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one;
+    X-Total-Count holds the number of activities.
+    """
 )
 async def list_activities(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    sort: str = Query("id", description="id, name or recent"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List activities with cache."""
-    activities = []
-    db_activities = activity_service.get_multi(db, skip=skip, limit=limit)
-    
-    for activity in db_activities:
-        # Get each activity with cache support
-        cached_activity = activity_service.get_with_cache(db, id=activity.id)
-        if cached_activity:
-            activities.append(cached_activity)
-    
-    return activities
+    """List activities."""
+    page = await async_activity_service.get_page(db, skip=skip, limit=limit, cursor=cursor, sort=sort)
+    set_page_headers(response, request, page)
+    return page.items
 
 @router.get(
     "/activities/{activity_id}",
@@ -136,10 +145,10 @@ async def list_activities(
 )
 async def get_activity(
     activity_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get activity with cache support."""
-    activity = activity_service.get_with_cache(db, id=activity_id)
+    """Get activity by ID."""
+    activity = await async_activity_service.get(db, id=activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     return activity
@@ -147,6 +156,7 @@ async def get_activity(
 @router.get(
     "/activities/{activity_id}/practice",
     response_model=dict,
+    dependencies=[Depends(conditional_get(async_activity_service.get_practice_version, "activity_id"))],
     summary="Get Practice Vocabulary",
     description="""
     Get vocabulary items for practice from the activity's vocabulary groups.
@@ -166,12 +176,17 @@ async def get_activity(
         }
     }
 )
-@cache_response(prefix="activity:practice", expire=60)
+@cache_response(
+    prefix="activity:practice",
+    expire=3600,
+    stale_ttl=120,
+    tags=["activities:{activity_id}", "table:vocabulary_groups", "table:vocabularies"]
+)
 async def get_practice_vocabulary(
     activity_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    activity = activity_service.get(db, id=activity_id)
+    activity = await async_activity_service.get(db, id=activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     items = activity.get_practice_vocabulary()  # Get items directly from activity model
@@ -201,14 +216,16 @@ async def get_practice_vocabulary(
 async def update_activity(
     activity_id: int,
     activity_update: ActivityUpdate,
-    db: Session = Depends(get_db)
+    writes: WriteQueue = Depends(get_write_queue)
 ):
     """Update activity and handle cache invalidation."""
-    db_activity = activity_service.get(db, id=activity_id)
-    if not db_activity:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    
-    return activity_service.update(db, db_obj=db_activity, obj_in=activity_update)
+    async def change_activity(writer: AsyncSession) -> Activity:
+        db_activity = await async_activity_service.get(writer, id=activity_id)
+        if not db_activity:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        return await async_activity_service.apply_update(writer, db_obj=db_activity, obj_in=activity_update)
+
+    return await writes.submit(change_activity)
 
 @router.delete(
     "/activities/{activity_id}",
@@ -230,10 +247,13 @@ async def update_activity(
 )
 async def delete_activity(
     activity_id: int,
-    db: Session = Depends(get_db)
+    writes: WriteQueue = Depends(get_write_queue)
 ):
     """Delete activity and clean up cache."""
-    return activity_service.delete(db, id=activity_id)
+    async def remove_activity(writer: AsyncSession) -> Activity:
+        return await async_activity_service.remove(writer, id=activity_id)
+
+    return await writes.submit(remove_activity)
 
 @router.post(
     "/activities/{activity_id}/sessions",
@@ -261,21 +281,25 @@ async def delete_activity(
 async def create_session(
     activity_id: int,
     session_create: SessionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    writes: WriteQueue = Depends(get_write_queue)
 ):
-    activity = activity_service.get(db, id=activity_id)
-    if not activity:
+    if not await async_activity_service.exists(db, activity_id):
         raise HTTPException(status_code=404, detail="Activity not found")
 
     # Create session
-    session = ActivitySession(
-        activity_id=activity_id,
-        start_time=session_create.start_time,
-        end_time=session_create.end_time
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
+    async def add_session(writer: AsyncSession) -> ActivitySession:
+        session = ActivitySession(
+            activity_id=activity_id,
+            start_time=session_create.start_time,
+            end_time=session_create.end_time
+        )
+        writer.add(session)
+        await writer.flush()
+        await writer.refresh(session)
+        return session
+
+    session = await writes.submit(add_session)
 
     # Return with empty attempts list and initial stats
     return SessionResponse(
@@ -298,6 +322,8 @@ async def create_session(
     Get a list of practice sessions for an activity.
     
     Sessions are ordered by creation date, with the most recent first.
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one;
+    X-Total-Count holds the number of sessions of the activity.
     """,
     responses={
         404: {
@@ -312,15 +338,25 @@ async def create_session(
         }
     }
 )
-@cache_response(prefix="activity:sessions", expire=60)
+@cache_response(
+    prefix="activity:sessions",
+    expire=600,
+    include_query_params=True,
+    tags=["activities:{activity_id}", "table:sessions", "table:session_attempts"]
+)
 async def get_sessions(
     activity_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    activity = activity_service.get(db, id=activity_id)
-    if not activity:
+    if not await async_activity_service.exists(db, activity_id):
         raise HTTPException(status_code=404, detail="Activity not found")
-    return session_service.get_by_activity(db, activity_id=activity_id)
+    page = await async_session_service.get_page(db, limit=limit, cursor=cursor, activity_id=activity_id)
+    set_page_headers(response, request, page)
+    return page.items
 
 @router.post(
     "/sessions/{session_id}/attempts",
@@ -373,15 +409,16 @@ async def get_sessions(
 async def record_attempt(
     session_id: int,
     attempt: SessionAttemptCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    writes: WriteQueue = Depends(get_write_queue)
 ):
-    session = session_service.get(db, id=session_id)
+    session = await async_session_service.get(db, id=session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
     # Verify vocabulary belongs to activity's groups
-    activity = activity_service.get(db, id=session.activity_id)
-    if not activity_service.has_vocabulary(activity, attempt.vocabulary_id):
+    activity = await async_activity_service.get(db, id=session.activity_id)
+    if not async_activity_service.has_vocabulary(activity, attempt.vocabulary_id):
         raise HTTPException(
             status_code=400,
             detail={
@@ -391,16 +428,19 @@ async def record_attempt(
         )
 
     # Create attempt
-    db_attempt = SessionAttempt(
-        session_id=session_id,
-        vocabulary_id=attempt.vocabulary_id,
-        is_correct=attempt.is_correct,
-        response_time_ms=attempt.response_time_ms
-    )
-    db.add(db_attempt)
-    db.commit()
-    db.refresh(db_attempt)
-    return db_attempt
+    async def add_attempt(writer: AsyncSession) -> SessionAttempt:
+        db_attempt = SessionAttempt(
+            session_id=session_id,
+            vocabulary_id=attempt.vocabulary_id,
+            is_correct=attempt.is_correct,
+            response_time_ms=attempt.response_time_ms
+        )
+        writer.add(db_attempt)
+        await writer.flush()
+        await writer.refresh(db_attempt)
+        return db_attempt
+
+    return await writes.submit(add_attempt)
 
 @router.get(
     "/activities/{activity_id}/progress",
@@ -445,12 +485,24 @@ async def record_attempt(
         }
     }
 )
-@cache_response(prefix="activity:progress", expire=60)
+@cache_response(
+    prefix="activity:progress",
+    expire=3600,
+    stale_ttl=120,
+    refresh_ahead=0.8,
+    tags=[
+        "activities:{activity_id}",
+        "table:session_attempts",
+        "table:vocabulary_progress",
+        "table:vocabulary_groups",
+        "table:vocabularies",
+    ]
+)
 async def get_activity_progress(
     activity_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    activity = activity_service.get(db, id=activity_id)
+    activity = await async_activity_service.get(db, id=activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
-    return activity_service.get_progress(db, activity_id=activity_id)
\ No newline at end of file
+    return await async_activity_service.get_progress(db, activity_id=activity_id)
\ No newline at end of file
@@ -7,7 +7,6 @@ import glob
 import json
 from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from pathlib import Path
 
 from app.core.config import settings
 from app.db.database import get_db, engine
@@ -158,47 +157,28 @@ async def list_models() -> Dict[str, Any]:
 # Cache inspection endpoints
 @router.get("/cache/info")
 async def get_cache_info() -> Dict[str, Any]:
-    """Get cache information."""
-    cache_dir = Path(settings.CACHE_DIR)
-    cache_files = list(cache_dir.glob("*.cache"))
-    
-    total_size = sum(f.stat().st_size for f in cache_files)
+    """Get cache information from the in-memory index."""
+    stats = cache.stats()
+    total_size = stats["store"]["bytes"]
     
     return {
-        "cache_type": "local_file",
-        "cache_dir": str(cache_dir),
+        "cache_type": f"local_{settings.CACHE_BACKEND}",
+        "cache_dir": str(cache.cache_dir),
         "stats": {
-            "total_files": len(cache_files),
+            "total_files": stats["store"]["entries"],
             "total_size_bytes": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2)
-        }
+        },
+        "tiers": stats
     }
 
 @router.get("/cache/keys")
-async def list_cache_keys(pattern: str = "*") -> Dict[str, Any]:
-    """List cache keys matching a pattern."""
-    cache_dir = Path(settings.CACHE_DIR)
-    cache_files = list(cache_dir.glob("*.cache"))
-    key_info = []
-    
-    for cache_file in cache_files[:100]:  # Limit to 100 files for performance
-        try:
-            with cache_file.open("r") as f:
-                content = json.load(f)
-                key_info.append({
-                    "file": cache_file.name,
-                    "created_at": content.get("created_at"),
-                    "expires_at": content.get("expires_at"),
-                    "size_bytes": cache_file.stat().st_size
-                })
-        except Exception as e:
-            key_info.append({
-                "file": cache_file.name,
-                "error": str(e)
-            })
+async def list_cache_keys(pattern: str = "*", limit: int = 100) -> Dict[str, Any]:
+    """List cached entries under a key prefix pattern without reading cache files."""
+    key_info = cache.list_entries(limit=min(limit, 1000), pattern=pattern)
     
     return {
-        "total_keys": len(cache_files),
+        "total_keys": cache.stats()["store"]["entries"],
         "displayed_keys": len(key_info),
         "keys": key_info
     }
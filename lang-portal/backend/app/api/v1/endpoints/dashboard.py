@@ -1,11 +1,9 @@
 from typing import List
 from fastapi import APIRouter, Depends, Query, Request, HTTPException
-from sqlalchemy.orm import Session
-import time
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.db.database import get_db
+from app.db.database import get_read_db
 from app.services.dashboard import dashboard_service
 from app.schemas.dashboard import (
     DashboardStats,
@@ -18,31 +16,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Rate limiting settings
-RATE_LIMIT_REQUESTS = 60  # requests per minute
-RATE_LIMIT_WINDOW = 60  # seconds
-request_timestamps = {}
-
-def check_rate_limit(request: Request):
-    """Check if request is within rate limits."""
-    now = time.time()
-    client = request.client.host
-    
-    # Clean old timestamps
-    request_timestamps[client] = [ts for ts in request_timestamps.get(client, [])
-                                if now - ts < RATE_LIMIT_WINDOW]
-    
-    # Check rate limit
-    if len(request_timestamps.get(client, [])) >= RATE_LIMIT_REQUESTS:
-        logger.warning(f"Rate limit exceeded for {client}")
-        raise HTTPException(
-            status_code=429,
-            detail="Too many requests. Please try again later."
-        )
-    
-    # Add current timestamp
-    request_timestamps.setdefault(client, []).append(now)
-
 @router.get(
     "/stats",
     response_model=DashboardStats,
@@ -55,7 +28,7 @@ def check_rate_limit(request: Request):
     - Number of active vocabulary groups
     - Current and longest study streaks
     
-    Response is cached for 5 minutes.
+    Response is cached for 1 hour and invalidated when study data changes.
     """,
     response_description="Dashboard statistics",
     responses={
@@ -78,12 +51,16 @@ def check_rate_limit(request: Request):
         }
     }
 )
-@cache_response(prefix="dashboard:stats", expire=300)
-async def get_dashboard_stats(request: Request, db: Session = Depends(get_db)):
-    """Get dashboard statistics with rate limiting."""
+@cache_response(
+    prefix="dashboard:stats",
+    expire=3600,
+    stale_ttl=300,
+    tags=["table:session_attempts", "table:sessions", "table:activities", "table:vocabulary_groups"]
+)
+async def get_dashboard_stats(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Get dashboard statistics."""
     try:
-        check_rate_limit(request)
-        return dashboard_service.get_stats(db)
+        return await dashboard_service.get_stats(db)
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -107,7 +84,7 @@ async def get_dashboard_stats(request: Request, db: Session = Depends(get_db)):
     The progress percentage is calculated as (studied_items / total_items) * 100.
     An item is considered mastered when its success rate is 80% or higher.
     
-    Response is cached for 5 minutes.
+    Response is cached for 1 hour and invalidated when study data changes.
     """,
     response_description="Learning progress statistics",
     responses={
@@ -126,12 +103,15 @@ async def get_dashboard_stats(request: Request, db: Session = Depends(get_db)):
         }
     }
 )
-@cache_response(prefix="dashboard:progress", expire=300)
-async def get_dashboard_progress(request: Request, db: Session = Depends(get_db)):
-    """Get learning progress with rate limiting."""
+@cache_response(
+    prefix="dashboard:progress",
+    expire=3600,
+    tags=["table:session_attempts", "table:activities", "table:vocabulary_groups", "table:vocabularies"]
+)
+async def get_dashboard_progress(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Get learning progress."""
     try:
-        check_rate_limit(request)
-        return dashboard_service.get_progress(db)
+        return await dashboard_service.get_progress(db)
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -157,7 +137,7 @@ async def get_dashboard_progress(request: Request, db: Session = Depends(get_db)
     - Success rate
     - Correct and incorrect answer counts
     
-    Response is cached for 1 minute.
+    Response is cached for 10 minutes and invalidated when sessions change.
     """,
     response_description="List of recent study sessions",
     responses={
@@ -193,7 +173,12 @@ async def get_dashboard_progress(request: Request, db: Session = Depends(get_db)
         }
     }
 )
-@cache_response(prefix="dashboard:sessions", expire=60, include_query_params=True)
+@cache_response(
+    prefix="dashboard:sessions",
+    expire=600,
+    include_query_params=True,
+    tags=["table:sessions", "table:session_attempts", "table:activities"]
+)
 async def get_latest_sessions(
     request: Request,
     limit: int = Query(
@@ -202,12 +187,11 @@ async def get_latest_sessions(
         le=20,
         description="Number of sessions to return (max: 20)"
     ),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get latest sessions with rate limiting."""
+    """Get latest sessions."""
     try:
-        check_rate_limit(request)
-        return dashboard_service.get_latest_sessions(db, limit)
+        return await dashboard_service.get_latest_sessions(db, limit)
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.database import get_read_engine
+from app.services.export import (
+    EXPORT_FORMATS,
+    attempts_export,
+    progress_export,
+    stream_export,
+    vocabulary_export
+)
+
+router = APIRouter()
+
+ExportFormat = Literal["ndjson", "csv"]
+
+def export_response(engine: AsyncEngine, stmt: Select, name: str, export_format: str) -> StreamingResponse:
+    """Stream an export as a file download."""
+    return StreamingResponse(
+        stream_export(engine, stmt, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'}
+    )
+
+@router.get("/vocabularies")
+async def export_vocabularies(
+    format: ExportFormat = Query("ndjson"),
+    language_pair_id: Optional[int] = Query(None, gt=0),
+    group_id: Optional[int] = Query(None, gt=0),
+    after_id: Optional[int] = Query(None, ge=0, description="Resume after this vocabulary id"),
+    engine: AsyncEngine = Depends(get_read_engine)
+) -> StreamingResponse:
+    """Export vocabulary as NDJSON or CSV, ordered by id."""
+    stmt = vocabulary_export(language_pair_id=language_pair_id, group_id=group_id, after_id=after_id)
+    return export_response(engine, stmt, "vocabularies", format)
+
+@router.get("/progress")
+async def export_progress(
+    format: ExportFormat = Query("ndjson"),
+    language_pair_id: Optional[int] = Query(None, gt=0),
+    mastered: Optional[bool] = Query(None),
+    after_id: Optional[int] = Query(None, ge=0, description="Resume after this progress id"),
+    engine: AsyncEngine = Depends(get_read_engine)
+) -> StreamingResponse:
+    """Export vocabulary progress as NDJSON or CSV, ordered by id."""
+    stmt = progress_export(language_pair_id=language_pair_id, mastered=mastered, after_id=after_id)
+    return export_response(engine, stmt, "progress", format)
+
+@router.get("/attempts")
+async def export_attempts(
+    format: ExportFormat = Query("ndjson"),
+    session_id: Optional[int] = Query(None, gt=0),
+    activity_id: Optional[int] = Query(None, gt=0),
+    since: Optional[datetime] = Query(None, description="Only attempts made at or after this time"),
+    after_id: Optional[int] = Query(None, ge=0, description="Resume after this attempt id"),
+    engine: AsyncEngine = Depends(get_read_engine)
+) -> StreamingResponse:
+    """Export session attempts as NDJSON or CSV, ordered by id."""
+    stmt = attempts_export(session_id=session_id, activity_id=activity_id, since=since, after_id=after_id)
+    return export_response(engine, stmt, "attempts", format)
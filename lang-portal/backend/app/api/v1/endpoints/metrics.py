@@ -1,10 +1,11 @@
 """System-wide metrics and monitoring endpoints."""
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Request
 from typing import Dict
 from datetime import datetime
 import psutil
 import logging
 from app.core.cache import cache
+from app.core.metrics import api_metrics, query_metrics, write_queue_metrics
 from app.schemas.metrics import (
     CacheMetricsResponse,
     SystemMetricsResponse,
@@ -12,9 +13,7 @@ from app.schemas.metrics import (
     DatabaseMetricsResponse,
     FullMetricsResponse
 )
-from app.db.database import get_db
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from app.db.stats import database_stats
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -60,25 +59,31 @@ async def get_system_metrics() -> Dict:
 async def get_api_metrics(request: Request) -> Dict:
     """Get API metrics with monitoring."""
     try:
-        # Get rate limiting stats from request state
-        rate_limits = getattr(request.app.state, 'rate_limits', {})
+        response_times = api_metrics.get_response_times()
+        errors = api_metrics.error_counts
         
         return {
             "requests": {
-                "total": len(rate_limits),
-                "rate_limited": sum(1 for v in rate_limits.values() if v.get('blocked', False)),
-                "successful": sum(1 for v in rate_limits.values() if not v.get('blocked', False))
+                "total": api_metrics.total_requests,
+                "rate_limited": sum(api_metrics.rate_limited.values()),
+                "rate_limited_by_class": dict(api_metrics.rate_limited),
+                "successful": api_metrics.total_requests - errors["4xx"] - errors["5xx"],
+                "in_flight": api_metrics.in_flight,
+                "peak_in_flight": api_metrics.peak_in_flight,
+                "slow": api_metrics.slow_requests
             },
             "endpoints": {
                 "active": len(request.app.routes),
                 "error_rates": {
-                    "4xx": request.app.state.error_counts.get('4xx', 0),
-                    "5xx": request.app.state.error_counts.get('5xx', 0)
-                }
+                    "4xx": errors["4xx"],
+                    "5xx": errors["5xx"]
+                },
+                "routes": api_metrics.get_route_stats()
             },
             "performance": {
-                "avg_response_time": request.app.state.avg_response_time,
-                "peak_response_time": request.app.state.peak_response_time
+                "avg_response_time": response_times["avg"],
+                "peak_response_time": response_times["max"],
+                "response_times": response_times
             }
         }
     except Exception as e:
@@ -91,36 +96,16 @@ async def get_api_metrics(request: Request) -> Dict:
     summary="Get Database Metrics",
     description="Get detailed database performance and usage metrics."
 )
-async def get_database_metrics(db: Session = Depends(get_db)) -> Dict:
-    """Get database metrics with monitoring."""
+async def get_database_metrics() -> Dict:
+    """Get the latest background sample of the database metrics."""
+    snapshot = database_stats.snapshot()
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="Database metrics have not been sampled yet")
     try:
-        # Get database statistics
-        stats_query = text("""
-            SELECT 
-                (SELECT COUNT(*) FROM activities) as activities_count,
-                (SELECT COUNT(*) FROM vocabularies) as vocabularies_count,
-                (SELECT COUNT(*) FROM session_attempts) as attempts_count,
-                pg_database_size(current_database()) as db_size
-        """)
-        
-        result = db.execute(stats_query).first()
-        
         return {
-            "tables": {
-                "activities": result.activities_count,
-                "vocabularies": result.vocabularies_count,
-                "attempts": result.attempts_count
-            },
-            "size": {
-                "total_bytes": result.db_size,
-                "total_mb": round(result.db_size / (1024 * 1024), 2)
-            },
-            "performance": {
-                "active_connections": db.execute(text("SELECT COUNT(*) FROM pg_stat_activity")).scalar(),
-                "cache_hit_ratio": db.execute(text(
-                    "SELECT sum(heap_blks_hit) / (sum(heap_blks_hit) + sum(heap_blks_read)) FROM pg_statio_user_tables"
-                )).scalar()
-            }
+            **snapshot,
+            "write_queue": write_queue_metrics.to_dict(),
+            "queries": query_metrics.to_dict()
         }
     except Exception as e:
         logger.error(f"Error getting database metrics: {str(e)}")
@@ -146,16 +131,13 @@ async def get_cache_metrics() -> Dict:
     summary="Get Full System Metrics",
     description="Get comprehensive metrics for the entire system."
 )
-async def get_full_metrics(
-    request: Request,
-    db: Session = Depends(get_db)
-) -> Dict:
+async def get_full_metrics(request: Request) -> Dict:
     """Get comprehensive system metrics."""
     try:
         return {
             "system": await get_system_metrics(),
             "api": await get_api_metrics(request),
-            "database": await get_database_metrics(db),
+            "database": await get_database_metrics() if database_stats.snapshot() is not None else None,
             "cache": await get_cache_metrics(),
             "timestamp": datetime.utcnow().isoformat(),
             "uptime": request.app.state.start_time.isoformat() if hasattr(request.app.state, 'start_time') else None
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.vocabulary import Vocabulary
-from app.schemas.vocabulary import VocabularyCreate, VocabularyRead
+from app.schemas.vocabulary import VocabularyCreate, VocabularyImportResult, VocabularyRead
 from app.models.language_pair import LanguagePair
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
+from app.db.writer import WriteQueue, get_write_queue
+from app.services.vocabulary_import import VocabularyImporter, iter_lines
 
 router = APIRouter()
 
@@ -29,4 +33,48 @@ def create_vocabulary(
     db.add(db_vocabulary)
     db.commit()
     db.refresh(db_vocabulary)
-    return VocabularyRead.model_validate(db_vocabulary) 
\ No newline at end of file
+    return VocabularyRead.model_validate(db_vocabulary)
+
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/json-lines": "jsonl",
+}
+
+@router.post("/import", response_model=VocabularyImportResult)
+async def import_vocabularies(
+    request: Request,
+    format: Optional[Literal["csv", "jsonl"]] = Query(None, description="Defaults to the request's content type"),
+    language_pair_id: Optional[int] = Query(None, gt=0, description="Used for rows without a language_pair_id"),
+    group_id: Optional[int] = Query(None, gt=0, description="Add the imported words to this group"),
+    on_conflict: Literal["update", "skip"] = Query("update", description="Update or keep existing translations"),
+    batch_size: Optional[int] = Query(None, gt=0, le=5000),
+    db: AsyncSession = Depends(get_read_db),
+    writes: WriteQueue = Depends(get_write_queue)
+) -> VocabularyImportResult:
+    """
+    Bulk import vocabulary from a CSV or JSON Lines request body.
+
+    The body is streamed and written in batches, so large files are never
+    held in memory. Existing words are upserted; invalid rows are skipped
+    and reported with their line numbers.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        format = IMPORT_CONTENT_TYPES.get(content_type)
+        if format is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Unsupported content type; send text/csv or application/x-ndjson, or pass format"
+            )
+
+    importer = VocabularyImporter(
+        db, writes, format,
+        language_pair_id=language_pair_id,
+        group_id=group_id,
+        on_conflict=on_conflict,
+        batch_size=batch_size
+    )
+    result = await importer.run(iter_lines(request.stream()))
+    return VocabularyImportResult.model_validate(result)
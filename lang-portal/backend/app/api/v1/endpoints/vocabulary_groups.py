@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.core.conditional import conditional_get
+from app.core.pagination import set_page_headers
 from app.db.database import get_db
 from app.services.vocabulary_group import vocabulary_group_service
 from app.schemas.vocabulary_group import (
@@ -10,6 +12,8 @@ from app.schemas.vocabulary_group import (
     VocabularyGroupUpdate,
     VocabularyGroupResponse,
     VocabularyGroupDetail,
+    VocabularyBrief,
+    ActivityBrief,
     PracticeItem
 )
 
@@ -58,7 +62,12 @@ def create_vocabulary_group(
     "/vocabulary-groups",
     response_model=List[VocabularyGroupResponse],
     summary="List Vocabulary Groups",
-    description="List all vocabulary groups with optional language pair filtering",
+    description="""
+    List vocabulary groups with optional language pair filtering.
+    
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one;
+    X-Total-Count holds the number of matching groups.
+    """,
     responses={
         200: {
             "description": "List of vocabulary groups",
@@ -80,18 +89,36 @@ def create_vocabulary_group(
     }
 )
 def list_vocabulary_groups(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    sort: str = Query("id", description="id, name or recent"),
     language_pair_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    return vocabulary_group_service.get_multi(
-        db, skip=skip, limit=limit, language_pair_id=language_pair_id
+    page = vocabulary_group_service.get_page(
+        db, skip=skip, limit=limit, cursor=cursor, sort=sort, language_pair_id=language_pair_id
     )
+    set_page_headers(response, request, page)
+    counts = vocabulary_group_service.get_vocabulary_counts(db, group_ids=[group.id for group in page.items])
+    return [
+        VocabularyGroupResponse(
+            id=group.id,
+            name=group.name,
+            description=group.description,
+            language_pair_id=group.language_pair_id,
+            vocabulary_count=counts.get(group.id, 0),
+            created_at=group.created_at
+        )
+        for group in page.items
+    ]
 
 @router.get(
     "/vocabulary-groups/{group_id}",
     response_model=VocabularyGroupDetail,
+    dependencies=[Depends(conditional_get(vocabulary_group_service.get_version, "group_id"))],
     summary="Get Vocabulary Group Details",
     description="Get detailed information about a vocabulary group including its vocabularies and activities",
     responses={
@@ -143,11 +170,28 @@ def get_vocabulary_group(
     group = vocabulary_group_service.get_with_relationships(db, id=group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Vocabulary group not found")
-    return group
+    counts = vocabulary_group_service.get_vocabulary_counts(db, group_ids=[group.id])
+    return VocabularyGroupDetail(
+        id=group.id,
+        name=group.name,
+        description=group.description,
+        language_pair_id=group.language_pair_id,
+        vocabulary_count=counts.get(group.id, 0),
+        created_at=group.created_at,
+        vocabularies=[
+            VocabularyBrief(id=vocab.id, word=vocab.word, translation=vocab.translation)
+            for vocab in group.vocabularies
+        ],
+        activities=[
+            ActivityBrief(id=activity.id, name=activity.name, type=activity.type)
+            for activity in group.activities
+        ]
+    )
 
 @router.get(
     "/vocabulary-groups/{group_id}/practice",
     response_model=List[PracticeItem],
+    dependencies=[Depends(conditional_get(vocabulary_group_service.get_version, "group_id"))],
     summary="Get Practice Items",
     description="""
     Get vocabulary items for practice.
@@ -0,0 +1,1377 @@
+"""Tiered response cache.
+
+Lookups go through three tiers, fastest first:
+
+1. An in-process LRU bounded by ``settings.CACHE_MEMORY_BUDGET`` bytes.
+2. A local file tier of hash-named ``*.cache`` JSON files bounded by
+   ``settings.MAX_CACHE_SIZE`` bytes.
+3. An optional Redis tier shared between workers (``settings.REDIS_ENABLED``).
+
+Writes go through to every tier; hits in a slower tier are promoted into the
+memory tier so repeated reads are served from RAM. Every tier holds the
+payload as encoded by ``CacheCodec``, so large entries stay compressed and
+the byte budgets count what is actually stored.
+
+Invalidations are published on ``settings.REDIS_INVALIDATION_CHANNEL`` so
+every worker drops its local copies. Without Redis they stay in-process, so
+local TTLs are capped at ``settings.CACHE_LOCAL_MAX_EXPIRE``.
+"""
+import asyncio
+import functools
+import hashlib
+import heapq
+import inspect
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from redis import Redis
+from sqlalchemy.ext.asyncio import AsyncSession as AsyncDbSession
+from sqlalchemy.orm import Session as DbSession
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache_codec import CacheCodec
+from app.core.cache_store import FileStore, SegmentStore, StoreEntry, to_iso as _to_iso
+from app.core.config import settings
+from app.core.metrics import CacheMetrics
+
+logger = logging.getLogger(__name__)
+
+# Keys whose values are never written to any cache tier
+SENSITIVE_CACHE_KEYS: Set[str] = {
+    "email", "password", "token", "secret", "api_key",
+    "auth", "ip_address", "credit_card",
+}
+SENSITIVE_CACHE_SUFFIXES: Tuple[str, ...] = ("_token", "_key", "_secret", "_password")
+
+# Query parameters that are never part of a cache key
+EXCLUDED_QUERY_PARAMS: Set[str] = {
+    "user_id", "session", "session_id", "token", "key", "auth", "password", "tracking",
+}
+
+# Grace period so entries expiring close together are removed in one batch;
+# reads check deadlines themselves, so this never serves expired data
+EXPIRY_SLACK_SECONDS = 0.5
+
+# Keys longer than this have their query part hashed
+MAX_KEY_LENGTH = 256
+
+_EMAIL_PATTERN = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+
+# ---------------------------------------------------------------------------
+# Redis clients (optional shared tier)
+# ---------------------------------------------------------------------------
+
+_default_client: Optional[Redis] = None
+_test_client: Optional[Redis] = None
+_client_lock = threading.Lock()
+
+
+def _build_redis_client(db: int) -> Redis:
+    """Create a Redis client. Connections are opened lazily on first use."""
+    return Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=db,
+        decode_responses=True,
+        socket_timeout=5,
+    )
+
+
+def get_redis_client(test_mode: bool = False) -> Redis:
+    """Get the shared Redis client, verifying the connection.
+
+    Raises:
+        redis.exceptions.ConnectionError: If Redis is not reachable.
+    """
+    global _default_client, _test_client
+    with _client_lock:
+        if test_mode:
+            if _test_client is None:
+                _test_client = _build_redis_client(settings.REDIS_TEST_DB)
+            client = _test_client
+        else:
+            if _default_client is None:
+                _default_client = _build_redis_client(settings.REDIS_DB)
+            client = _default_client
+    client.ping()
+    return client
+
+
+# Module-level clients; constructing them does not open a connection
+redis_client = _build_redis_client(settings.REDIS_DB)
+test_redis_client = _build_redis_client(settings.REDIS_TEST_DB)
+
+
+class Cache:
+    """Key helpers and direct access to the shared Redis tier."""
+
+    @staticmethod
+    def key_builder(prefix: str, *args: Any, **kwargs: Any) -> str:
+        """Build a cache key from a prefix, positional args and sorted kwargs."""
+        parts = [str(prefix)]
+        parts.extend(str(arg) for arg in args)
+        for name in sorted(kwargs):
+            parts.extend((name, str(kwargs[name])))
+        return ":".join(parts)
+
+    @staticmethod
+    def client(test_mode: bool = False) -> Redis:
+        """Get the Redis client for the current mode."""
+        return test_redis_client if test_mode else redis_client
+
+    @staticmethod
+    def get(key: str, test_mode: bool = False) -> Optional[str]:
+        """Get a raw value from Redis, or None on miss or error."""
+        try:
+            return Cache.client(test_mode).get(key)
+        except RedisError as e:
+            logger.warning(f"Redis get failed: {str(e)}")
+            return None
+
+    @staticmethod
+    def set(key: str, value: Any, expire: Optional[int] = None, test_mode: bool = False) -> bool:
+        """Store a value in Redis. Non-string values are JSON encoded."""
+        try:
+            payload = value if isinstance(value, str) else json.dumps(value)
+            return bool(Cache.client(test_mode).set(key, payload, ex=expire))
+        except (RedisError, TypeError, ValueError) as e:
+            logger.warning(f"Redis set failed: {str(e)}")
+            return False
+
+    @staticmethod
+    def delete_pattern(pattern: str, test_mode: bool = False) -> bool:
+        """Delete all Redis keys matching a glob pattern."""
+        client = Cache.client(test_mode)
+        try:
+            batch: List[str] = []
+            for key in client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    client.delete(*batch)
+                    batch = []
+            if batch:
+                client.delete(*batch)
+            return True
+        except RedisError as e:
+            logger.warning(f"Redis pattern delete failed: {str(e)}")
+            return False
+
+
+# ---------------------------------------------------------------------------
+# In-process memory tier
+# ---------------------------------------------------------------------------
+
+class MemoryLRU:
+    """Thread-safe LRU that evicts by total stored bytes instead of entry count."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, int, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Return the payload for a digest, dropping it if expired."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            payload, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[digest]
+                self.current_bytes -= size
+                return None
+            self._entries.move_to_end(digest)
+            return payload
+
+    def set(self, digest: str, payload: bytes, expires_at: Optional[float]) -> None:
+        """Store a payload, evicting least recently used entries over budget."""
+        size = len(payload)
+        with self._lock:
+            old = self._entries.pop(digest, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            # Too large to keep; the previous payload is dropped all the same
+            if size > self.max_bytes:
+                return
+            self._entries[digest] = (payload, size, expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def delete(self, digest: str) -> bool:
+        """Remove a single entry."""
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if entry is None:
+                return False
+            self.current_bytes -= entry[1]
+            return True
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+# ---------------------------------------------------------------------------
+# Local cache (memory + file tiers, optional Redis)
+# ---------------------------------------------------------------------------
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _scope_hashes(key: str) -> List[str]:
+    """Hash every ':'-separated prefix of a key, used for prefix invalidation."""
+    parts = key.split(":")
+    return [_digest(":".join(parts[:i]))[:16] for i in range(1, len(parts))]
+
+
+def _tag_hash(tag: str) -> str:
+    """Hash a dependency tag into the same index as key scopes."""
+    return _digest(f"#tag:{tag}")[:16]
+
+
+class LocalCache:
+    """Privacy-focused tiered cache over a persistent local store."""
+
+    _instance: Optional["LocalCache"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._cache_dir = Path(settings.CACHE_DIR)
+        self.max_cache_size = settings.MAX_CACHE_SIZE
+        self.max_entry_size = settings.CACHE_MAX_ENTRY_SIZE
+        self.metrics = CacheMetrics()
+        self._codec = CacheCodec(
+            settings.CACHE_COMPRESSION,
+            settings.CACHE_COMPRESSION_THRESHOLD,
+            settings.CACHE_COMPRESSION_LEVEL,
+            self.metrics,
+        )
+        self._memory = MemoryLRU(settings.CACHE_MEMORY_BUDGET)
+        self._lock = threading.RLock()
+        if settings.CACHE_BACKEND == "files":
+            self._store = FileStore(self._cache_dir)
+        else:
+            self._store = SegmentStore.for_worker(
+                self._cache_dir, settings.CACHE_SEGMENT_SIZE, settings.CACHE_COMPACTION_RATIO
+            )
+        # Persistent tier index in least-recently-used order, keyed by key digest
+        self._index: "OrderedDict[str, StoreEntry]" = OrderedDict()
+        # Scope hash -> digests of entries under that key prefix
+        self._scopes: Dict[str, Set[str]] = {}
+        self._redis_retry_at = 0.0
+        # Min-heap of (expires_at, digest); entries superseded since are skipped
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._expiry_wakeup = threading.Condition(self._lock)
+        self._closed = False
+        # Identifies this instance's own messages on the invalidation channel
+        self._origin = f"{os.getpid()}:{id(self)}"
+        self._listener: Optional[threading.Thread] = None
+        # Started by get_instance; other instances expire entries lazily on read
+        self._expiry_thread: Optional[threading.Thread] = None
+        self._load_index()
+
+    @classmethod
+    def get_instance(cls) -> "LocalCache":
+        """Get the process-wide cache instance."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+                    cls._instance._start_background()
+        return cls._instance
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir
+
+    @property
+    def hit_count(self) -> int:
+        return self.metrics.hit_count
+
+    @property
+    def miss_count(self) -> int:
+        return self.metrics.miss_count
+
+    # -- public API ---------------------------------------------------------
+
+    def get(self, key: str, prefix: Optional[str] = None) -> Any:
+        """Get a cached value, or None if missing or expired.
+
+        Latency is recorded under ``prefix``, defaulting to the key's first
+        segment.
+        """
+        payload = self.get_bytes(key, prefix=prefix)
+        if payload is None:
+            return None
+        return json.loads(payload)
+
+    def get_bytes(self, key: str, prefix: Optional[str] = None) -> Optional[bytes]:
+        """Get a cached payload exactly as it was stored with ``set_bytes``."""
+        start = time.perf_counter()
+        digest = _digest(key)
+
+        data = self._memory.get(digest)
+        if data is None:
+            data = self._read_file(digest)
+            if data is not None:
+                entry = self._index.get(digest)
+                if entry is not None:
+                    self._memory.set(digest, data, entry.expires_at)
+            else:
+                shared = self._read_shared(key)
+                if shared is not None:
+                    data = shared[0]
+                    self._promote(key, digest, *shared)
+
+        payload = None
+        if data is not None:
+            try:
+                payload = self._codec.decode(data)
+            except (ValueError, zlib.error) as e:
+                logger.warning(f"Dropping undecodable cache entry: {str(e)}")
+                self._memory.delete(digest)
+                self._remove_file(digest, cleanup=True)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if prefix is None:
+            prefix = key.split(":", 1)[0]
+        if payload is None:
+            self.metrics.record_miss(elapsed_ms, prefix)
+            return None
+        self.metrics.record_hit(elapsed_ms, prefix)
+        return payload
+
+    def set(
+        self, key: str, value: Any, expire: Optional[int] = None, tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Store a value in every tier. Returns False if it cannot be cached.
+
+        ``tags`` name the tables or entities the value depends on, e.g.
+        ``table:sessions`` or ``activities:3``; see ``delete_tags``.
+
+        Raises:
+            HTTPException: 413 if the entry exceeds ``max_entry_size``.
+        """
+        try:
+            payload = json.dumps(self._sanitize(value))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Value for cache is not serializable: {str(e)}")
+            return False
+        return self.set_bytes(key, payload.encode("utf-8"), expire=expire, tags=tags)
+
+    def effective_expire(self, expire: Optional[int] = None) -> int:
+        """The TTL an entry stored with ``expire`` is actually kept for.
+
+        Without Redis, invalidations cannot reach other workers' local tiers,
+        so TTLs are capped at ``settings.CACHE_LOCAL_MAX_EXPIRE`` (0 disables
+        the cap). An ``expire`` of 0 means no expiry.
+        """
+        if expire is None:
+            expire = settings.CACHE_DEFAULT_EXPIRE
+        local_cap = settings.CACHE_LOCAL_MAX_EXPIRE
+        if local_cap and self._shared_client() is None:
+            return min(expire, local_cap) if expire else local_cap
+        return expire
+
+    def set_bytes(
+        self, key: str, payload: bytes, expire: Optional[int] = None, tags: Optional[Iterable[str]] = None,
+        stale_ttl: int = 0,
+    ) -> bool:
+        """Store an already serialized, sanitized payload in every tier.
+
+        The payload must start with JSON text. Payloads of at least
+        ``CACHE_COMPRESSION_THRESHOLD`` bytes are compressed; ``max_entry_size``
+        applies to the uncompressed size. The entry is kept for
+        ``effective_expire(expire)`` plus ``stale_ttl`` seconds, the latter for
+        callers that serve stale entries while refreshing them.
+
+        Raises:
+            HTTPException: 413 if the entry exceeds ``max_entry_size``.
+        """
+        expire = self.effective_expire(expire)
+        if expire and stale_ttl:
+            expire += stale_ttl
+        if len(payload) > self.max_entry_size:
+            self.metrics.record_privacy_violation()
+            raise HTTPException(status_code=413, detail="Cache entry too large")
+
+        digest = _digest(key)
+        now = time.time()
+        expires_at = now + expire if expire else None
+        tags = list(tags or ())
+        scopes = _scope_hashes(key) + [_tag_hash(tag) for tag in tags]
+
+        data = self._codec.encode(payload)
+        self._memory.set(digest, data, expires_at)
+        if not self._write_file(digest, data, now, expires_at, scopes):
+            return False
+        self._write_shared(key, CacheCodec.to_text(data), expire, tags)
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Delete a key from every tier, and from other workers' local tiers."""
+        digest = _digest(key)
+        self._memory.delete(digest)
+        removed = self._remove_file(digest)
+        client = self._shared_client()
+        if client is not None:
+            try:
+                client.delete(key, f"cache-tags:{key}")
+                self._publish(client, {"keys": [key]})
+            except RedisError as e:
+                self._mark_shared_down(e)
+        return removed
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Delete all keys under a prefix pattern such as ``dashboard:stats:*``.
+
+        Local tiers are resolved through the scope index, so no directory scan
+        is needed. Returns the number of local entries removed.
+        """
+        removed = self._delete_local_pattern(pattern)
+        client = self._shared_client()
+        if client is not None:
+            if not Cache.delete_pattern(pattern):
+                self._mark_shared_down(RedisError("pattern delete failed"))
+                return removed
+            try:
+                self._publish(client, {"patterns": [pattern]})
+            except RedisError as e:
+                self._mark_shared_down(e)
+        return removed
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry tagged with any of ``tags``.
+
+        Cost is proportional to the number of tags and tagged entries, not to
+        the size of the cache. Returns the number of local entries removed.
+        """
+        tags = list(tags)
+        removed = self._delete_local_tags(tags)
+        client = self._shared_client()
+        if client is not None:
+            try:
+                for tag in tags:
+                    members = client.smembers(f"cache-tag:{tag}")
+                    client.delete(f"cache-tag:{tag}", *members, *(f"cache-tags:{member}" for member in members))
+                self._publish(client, {"tags": tags})
+            except RedisError as e:
+                self._mark_shared_down(e)
+        return removed
+
+    def clear(self) -> bool:
+        """Remove all entries from the local tiers."""
+        self._memory.clear()
+        with self._lock:
+            self._index.clear()
+            self._scopes.clear()
+            self._expiry_heap.clear()
+            self.metrics.total_size = 0
+            self.metrics.entry_count = 0
+        self._store.clear()
+        # Pick up files left by the per-file layout
+        FileStore(self._cache_dir).clear()
+        return True
+
+    def cache_activity(self, activity_id: int, data: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """Cache activity data with activity-specific sanitization."""
+        sanitized = dict(data)
+        if isinstance(sanitized.get("description"), str):
+            sanitized["description"] = _EMAIL_PATTERN.sub("[REDACTED]", sanitized["description"])
+        if isinstance(sanitized.get("metadata"), dict):
+            sanitized["metadata"] = {
+                k: v for k, v in sanitized["metadata"].items()
+                if k not in {"user_id", "ip_address", "session_id", "device_info"}
+            }
+        return self.set(f"activity:{activity_id}", sanitized, expire=expire)
+
+    def get_activity(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        """Get cached activity data."""
+        return self.get(f"activity:{activity_id}")
+
+    def list_entries(self, limit: int = 100, pattern: str = "*") -> List[Dict[str, Any]]:
+        """Describe up to ``limit`` stored entries from the index, most recent first.
+
+        ``pattern`` is a key prefix pattern such as ``dashboard:stats:*``,
+        resolved through the scope index like ``delete_pattern``.
+        """
+        prefix = pattern.rstrip("*").rstrip(":")
+        with self._lock:
+            if prefix:
+                members = self._scopes.get(_digest(prefix)[:16], set())
+                items = [(digest, entry) for digest, entry in self._index.items() if digest in members]
+            else:
+                items = list(self._index.items())
+            items = items[-limit:] if limit > 0 else []
+        return [
+            {
+                "key": digest[:16],
+                "created_at": _to_iso(entry.created_at),
+                "expires_at": _to_iso(entry.expires_at),
+                "size_bytes": entry.size,
+            }
+            for digest, entry in reversed(items)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize tier usage without touching the filesystem."""
+        return {
+            "compression": self._codec.algorithm,
+            "memory": {
+                "entries": len(self._memory),
+                "bytes": self._memory.current_bytes,
+                "budget_bytes": self._memory.max_bytes,
+            },
+            "store": {
+                "backend": settings.CACHE_BACKEND,
+                "entries": len(self._index),
+                "bytes": self.metrics.total_size,
+                "budget_bytes": self.max_cache_size,
+                **self._store.stats(),
+            },
+            "redis_enabled": self._shared_client() is not None,
+        }
+
+    def expire_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """Remove up to ``limit`` entries whose deadline has passed.
+
+        Returns the number of entries removed. Superseded heap items are
+        discarded without counting against the limit.
+        """
+        now = time.time() if now is None else now
+        limit = settings.CACHE_EXPIRY_BATCH if limit is None else limit
+        expired: List[Tuple[str, StoreEntry]] = []
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now and len(expired) < limit:
+                deadline, digest = heapq.heappop(heap)
+                entry = self._index.get(digest)
+                if entry is None or entry.expires_at != deadline:
+                    continue
+                del self._index[digest]
+                self._unindex_scopes(digest, entry)
+                # Under the lock so a concurrent write of the same key is not removed
+                self._store.remove(digest)
+                expired.append((digest, entry))
+
+        for digest, _ in expired:
+            self._memory.delete(digest)
+        if expired:
+            self.metrics.record_cleanup(len(expired), sum(entry.size for _, entry in expired))
+        return len(expired)
+
+    def close(self) -> None:
+        """Stop the background threads and release the persistent store."""
+        with self._lock:
+            self._closed = True
+            self._expiry_wakeup.notify_all()
+        for thread in (self._expiry_thread, self._listener):
+            if thread is not None:
+                thread.join(timeout=5)
+        self._store.close()
+
+    # -- expiry -------------------------------------------------------------------
+
+    def _start_background(self) -> None:
+        """Start the expiry thread and, with Redis, the invalidation listener."""
+        if self._expiry_thread is None:
+            self._expiry_thread = threading.Thread(target=self._expiry_loop, name="cache-expiry", daemon=True)
+            self._expiry_thread.start()
+        self._start_listener()
+
+    def _expiry_loop(self) -> None:
+        """Sleep until the earliest deadline, then expire due entries in batches."""
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                delay = settings.CACHE_EXPIRY_MAX_SLEEP
+                if self._expiry_heap:
+                    delay = min(delay, self._expiry_heap[0][0] + EXPIRY_SLACK_SECONDS - time.time())
+                if delay > 0:
+                    self._expiry_wakeup.wait(delay)
+                    continue
+            try:
+                self.expire_due()
+            except Exception as e:
+                logger.error(f"Cache expiry failed: {str(e)}")
+                time.sleep(1)
+            # Let writers in between batches
+            time.sleep(0)
+
+    def _schedule_expiry(self, digest: str, expires_at: float) -> None:
+        heap = self._expiry_heap
+        wake = not heap or expires_at < heap[0][0]
+        heapq.heappush(heap, (expires_at, digest))
+        if len(heap) > 2 * len(self._index) + 1024:
+            # Too many superseded items; rebuild from the live index
+            self._expiry_heap = [
+                (entry.expires_at, key) for key, entry in self._index.items() if entry.expires_at is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+        if wake:
+            self._expiry_wakeup.notify()
+
+    # -- persistent tier --------------------------------------------------------
+
+    def _get_cache_path(self, key: str) -> Optional[Path]:
+        """Get the file holding a key's entry."""
+        return self._store.path_for(_digest(key))
+
+    def _get_all_keys(self) -> List[str]:
+        """List the digests of all entries in the persistent tier."""
+        with self._lock:
+            return list(self._index)
+
+    def _load_index(self) -> None:
+        """Index the persistent store once at startup."""
+        result = self._store.load(time.time())
+        for digest, entry in result.entries:
+            self._index_entry(digest, entry)
+        if result.cleaned_entries:
+            self.metrics.record_cleanup(result.cleaned_entries, result.cleaned_size)
+
+    def _sync_index(self) -> None:
+        """Index entries other processes added to the store, drop those they removed."""
+        with self._lock:
+            result = self._store.rescan(time.time(), self._index)
+            if result is None:
+                return
+            for digest in result.missing:
+                entry = self._index.pop(digest)
+                self._unindex_scopes(digest, entry)
+                self.metrics.total_size = max(0, self.metrics.total_size - entry.size)
+                self.metrics.entry_count = max(0, self.metrics.entry_count - 1)
+                self._memory.delete(digest)
+            for digest, entry in result.entries:
+                self._index_entry(digest, entry)
+        if result.cleaned_entries:
+            self.metrics.record_cleanup(result.cleaned_entries, result.cleaned_size)
+        self._enforce_quota()
+
+    def _index_entry(self, digest: str, entry: StoreEntry) -> None:
+        with self._lock:
+            old = self._index.pop(digest, None)
+            if old is not None:
+                self._unindex_scopes(digest, old)
+                self.metrics.total_size -= old.size
+                self.metrics.entry_count -= 1
+            self._index[digest] = entry
+            for scope in entry.scopes:
+                self._scopes.setdefault(scope, set()).add(digest)
+            self.metrics.total_size += entry.size
+            self.metrics.entry_count += 1
+            if entry.expires_at is not None:
+                self._schedule_expiry(digest, entry.expires_at)
+
+    def _delete_local_pattern(self, pattern: str) -> int:
+        prefix = pattern.rstrip("*").rstrip(":")
+        if not prefix:
+            count = len(self._index)
+            self.clear()
+            return count
+        scope = _digest(prefix)[:16]
+        with self._lock:
+            digests = list(self._scopes.get(scope, ()))
+        for digest in digests:
+            self._memory.delete(digest)
+            self._remove_file(digest)
+        return len(digests)
+
+    def _delete_local_tags(self, tags: List[str]) -> int:
+        with self._lock:
+            digests = set()
+            for tag in tags:
+                digests.update(self._scopes.get(_tag_hash(tag), ()))
+        for digest in digests:
+            self._memory.delete(digest)
+            self._remove_file(digest)
+        return len(digests)
+
+    def _unindex_scopes(self, digest: str, entry: StoreEntry) -> None:
+        for scope in entry.scopes:
+            members = self._scopes.get(scope)
+            if members is not None:
+                members.discard(digest)
+                if not members:
+                    del self._scopes[scope]
+
+    def _read_file(self, digest: str) -> Optional[bytes]:
+        entry = self._index.get(digest)
+        if entry is None:
+            self._sync_index()
+            entry = self._index.get(digest)
+            if entry is None:
+                return None
+        if entry.is_expired(time.time()):
+            self._remove_file(digest, cleanup=True)
+            return None
+        payload = self._store.read(digest)
+        if payload is None:
+            self._remove_file(digest, cleanup=True)
+            return None
+        with self._lock:
+            if digest in self._index:
+                self._index.move_to_end(digest)
+        return payload
+
+    def _write_file(
+        self, digest: str, payload: bytes, now: float, expires_at: Optional[float], scopes: List[str]
+    ) -> bool:
+        with self._lock:
+            entry = self._store.write(digest, payload, now, expires_at, scopes)
+            if entry is None:
+                return False
+            self._index_entry(digest, entry)
+        self._enforce_quota()
+        return True
+
+    def _remove_file(self, digest: str, cleanup: bool = False) -> bool:
+        with self._lock:
+            entry = self._index.pop(digest, None)
+            if entry is None:
+                return False
+            self._unindex_scopes(digest, entry)
+            self._store.remove(digest)
+        if cleanup:
+            self.metrics.record_cleanup(1, entry.size)
+        else:
+            with self._lock:
+                self.metrics.total_size = max(0, self.metrics.total_size - entry.size)
+                self.metrics.entry_count = max(0, self.metrics.entry_count - 1)
+        return True
+
+    def _enforce_quota(self) -> None:
+        """Evict least recently used entries once the quota is exceeded, to below 80%."""
+        if self.metrics.total_size <= self.max_cache_size:
+            return
+        target = int(self.max_cache_size * 0.8)
+        evicted_entries = 0
+        evicted_size = 0
+        while self.metrics.total_size - evicted_size >= target:
+            with self._lock:
+                if not self._index:
+                    break
+                digest, entry = self._index.popitem(last=False)
+                self._unindex_scopes(digest, entry)
+                self._store.remove(digest)
+            self._memory.delete(digest)
+            evicted_entries += 1
+            evicted_size += entry.size
+        if evicted_entries:
+            self.metrics.record_cleanup(evicted_entries, evicted_size)
+
+    # -- shared tier ------------------------------------------------------------
+
+    def _shared_client(self) -> Optional[Redis]:
+        if not settings.REDIS_ENABLED or time.monotonic() < self._redis_retry_at:
+            return None
+        return Cache.client()
+
+    def _mark_shared_down(self, error: Exception) -> None:
+        logger.warning(f"Redis tier unavailable, retrying in {settings.REDIS_RETRY_INTERVAL}s: {str(error)}")
+        self._redis_retry_at = time.monotonic() + settings.REDIS_RETRY_INTERVAL
+
+    def _publish(self, client: Redis, invalidation: Dict[str, List[str]]) -> None:
+        """Announce an invalidation to the other workers' local tiers."""
+        message = dict(invalidation, origin=self._origin)
+        client.publish(settings.REDIS_INVALIDATION_CHANNEL, json.dumps(message))
+
+    def _apply_invalidation(self, data: str) -> None:
+        """Drop the entries another worker invalidated from the local tiers."""
+        try:
+            message = json.loads(data)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation message")
+            return
+        if not isinstance(message, dict) or message.get("origin") == self._origin:
+            return
+        for key in message.get("keys", ()):
+            digest = _digest(key)
+            self._memory.delete(digest)
+            self._remove_file(digest)
+        for pattern in message.get("patterns", ()):
+            self._delete_local_pattern(pattern)
+        if message.get("tags"):
+            self._delete_local_tags(message["tags"])
+
+    def _start_listener(self) -> None:
+        """Subscribe to other workers' invalidations when Redis is configured."""
+        if not settings.REDIS_ENABLED or self._listener is not None:
+            return
+        self._listener = threading.Thread(target=self._listen, name="cache-invalidations", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        """Apply invalidations published by other workers until closed.
+
+        Messages published while disconnected are lost, so the local tiers
+        are cleared whenever the subscription is re-established.
+        """
+        subscribed = False
+        while not self._closed:
+            client = self._shared_client()
+            if client is None:
+                with self._lock:
+                    if not self._closed:
+                        self._expiry_wakeup.wait(settings.REDIS_RETRY_INTERVAL)
+                continue
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(settings.REDIS_INVALIDATION_CHANNEL)
+                if subscribed:
+                    self.clear()
+                subscribed = True
+                while not self._closed:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._apply_invalidation(message["data"])
+            except RedisError as e:
+                self._mark_shared_down(e)
+            except Exception:
+                logger.exception("Cache invalidation listener failed")
+                time.sleep(1)
+            finally:
+                pubsub.close()
+
+    def _read_shared(self, key: str) -> Optional[Tuple[bytes, Optional[float], List[str]]]:
+        """Get a payload from Redis with its deadline (from ``PTTL``) and tags."""
+        client = self._shared_client()
+        if client is None:
+            return None
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.pttl(key)
+            pipe.get(f"cache-tags:{key}")
+            text, ttl_ms, tags = pipe.execute()
+        except RedisError as e:
+            self._mark_shared_down(e)
+            return None
+        if text is None:
+            return None
+        # PTTL is -1 for keys without expiry
+        expires_at = time.time() + ttl_ms / 1000 if ttl_ms is not None and ttl_ms > 0 else None
+        try:
+            tags = json.loads(tags) if tags else []
+        except ValueError:
+            tags = []
+        return CacheCodec.from_text(text), expires_at, tags
+
+    def _promote(self, key: str, digest: str, data: bytes, expires_at: Optional[float], tags: List[str]) -> None:
+        """Keep a Redis hit locally for the rest of its TTL, indexed under its key prefixes and tags."""
+        scopes = _scope_hashes(key) + [_tag_hash(tag) for tag in tags]
+        self._memory.set(digest, data, expires_at)
+        self._write_file(digest, data, time.time(), expires_at, scopes)
+
+    def _write_shared(self, key: str, payload: str, expire: Optional[int], tags: List[str]) -> None:
+        client = self._shared_client()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(key, payload, ex=expire or None)
+            if tags:
+                # Lets other workers index a promoted entry under its tags
+                pipe.set(f"cache-tags:{key}", json.dumps(tags), ex=expire or None)
+            for tag in tags:
+                # A tag set lives as long as its longest-lived member
+                pipe.sadd(f"cache-tag:{tag}", key)
+                if expire:
+                    pipe.expire(f"cache-tag:{tag}", expire, nx=True)
+                    pipe.expire(f"cache-tag:{tag}", expire, gt=True)
+            pipe.execute()
+        except RedisError as e:
+            self._mark_shared_down(e)
+
+    # -- privacy ----------------------------------------------------------------
+
+    def _sanitize(self, value: Any) -> Any:
+        """Redact sensitive keys recursively before a value enters any tier."""
+        redacted = [False]
+
+        def walk(node: Any) -> Any:
+            if isinstance(node, dict):
+                result = {}
+                for k, v in node.items():
+                    name = str(k).lower()
+                    if name in SENSITIVE_CACHE_KEYS or name.endswith(SENSITIVE_CACHE_SUFFIXES):
+                        result[k] = "[REDACTED]"
+                        redacted[0] = True
+                    else:
+                        result[k] = walk(v)
+                return result
+            if isinstance(node, (list, tuple)):
+                return [walk(v) for v in node]
+            return node
+
+        sanitized = walk(value)
+        if redacted[0]:
+            self.metrics.record_sanitization()
+        return sanitized
+
+
+# Process-wide cache instance used by endpoints and metrics
+cache = LocalCache.get_instance()
+
+
+# ---------------------------------------------------------------------------
+# Invalidation helpers
+# ---------------------------------------------------------------------------
+
+def invalidate_cache_pattern(pattern: str, test_mode: bool = False) -> bool:
+    """Invalidate all entries under a key prefix pattern in every tier."""
+    LocalCache.get_instance().delete_pattern(pattern)
+    if test_mode:
+        return Cache.delete_pattern(pattern, test_mode=True)
+    return True
+
+
+def invalidate_tags(tags: Iterable[str]) -> int:
+    """Invalidate all entries depending on any of the given tags."""
+    return LocalCache.get_instance().delete_tags(tags)
+
+
+def invalidate_dashboard_cache(test_mode: bool = False) -> bool:
+    """Invalidate all dashboard entries."""
+    return invalidate_cache_pattern("dashboard:*", test_mode=test_mode)
+
+
+def invalidate_stats_cache(test_mode: bool = False) -> bool:
+    """Invalidate dashboard statistics entries."""
+    return invalidate_cache_pattern("dashboard:stats:*", test_mode=test_mode)
+
+
+# ---------------------------------------------------------------------------
+# Endpoint decorator
+# ---------------------------------------------------------------------------
+
+_REQUEST_PARAM = "_cache_request"
+_RESPONSE_PARAM = "_cache_response"
+
+
+def _with_injected_params(func: Callable) -> Tuple[inspect.Signature, Optional[str], Optional[str]]:
+    """Add Request/Response parameters to an endpoint signature if it lacks them.
+
+    Returns the new signature and the names of any parameters the endpoint
+    declared itself.
+    """
+    signature = inspect.signature(func)
+    params = list(signature.parameters.values())
+    own_request = next((p.name for p in params if p.annotation is Request), None)
+    own_response = next((p.name for p in params if p.annotation is Response), None)
+
+    extra = []
+    if own_request is None:
+        extra.append(inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+    if own_response is None:
+        extra.append(inspect.Parameter(_RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+
+    var_keyword = [p for p in params if p.kind is inspect.Parameter.VAR_KEYWORD]
+    regular = [p for p in params if p.kind is not inspect.Parameter.VAR_KEYWORD]
+    return signature.replace(parameters=regular + extra + var_keyword), own_request, own_response
+
+
+def _build_key(prefix: str, request: Optional[Request], include_query_params: bool, kwargs: Dict[str, Any]) -> str:
+    """Build a cache key for an endpoint call without sensitive parameters."""
+    if request is None:
+        simple = {
+            k: v for k, v in kwargs.items()
+            if isinstance(v, (str, int, float, bool)) and k not in EXCLUDED_QUERY_PARAMS
+        }
+        return Cache.key_builder(prefix, **simple)
+
+    key = f"{prefix}:{request.url.path}"
+    if include_query_params and request.query_params:
+        params = sorted(
+            (k, v) for k, v in request.query_params.items()
+            if k.lower() not in EXCLUDED_QUERY_PARAMS
+        )
+        query = str(params)
+        if len(key) + len(query) > MAX_KEY_LENGTH:
+            query = _digest(query)[:32]
+        key = f"{key}:{query}"
+    return key
+
+
+def _format_tags(templates: Optional[List[str]], kwargs: Dict[str, Any]) -> List[str]:
+    """Fill tag templates from endpoint arguments, skipping unresolvable ones."""
+    tags = []
+    for template in templates or ():
+        try:
+            tags.append(template.format(**kwargs))
+        except (KeyError, IndexError):
+            logger.warning(f"Cache tag template {template!r} does not match endpoint arguments")
+    return tags
+
+
+def _apply_cache_headers(
+    response: Response, status: str, key: str, expire: int, monitor: bool, local: LocalCache
+) -> None:
+    response.headers["X-Cache-Status"] = status
+    response.headers["Cache-Control"] = f"private, max-age={expire}"
+    response.headers["X-Cache-Expires"] = _to_iso(time.time() + expire)
+    if monitor:
+        response.headers["X-Cache-Key"] = _digest(key)[:16]
+        response.headers["X-Cache-Stats"] = json.dumps({
+            "total_size": local.metrics.total_size,
+            "entry_count": local.metrics.entry_count,
+            "hit_ratio": local.metrics.hit_ratio,
+        })
+
+
+# Response headers that are never stored with a cached response
+_UNCACHED_HEADERS: Set[str] = {"content-length", "set-cookie"}
+
+
+class _CachedResponse:
+    """A rendered endpoint response as stored in the cache.
+
+    Stored as a JSON header line followed by the exact response body, so a
+    hit is served without validating or encoding the content again.
+    """
+
+    __slots__ = ("status_code", "headers", "body", "fresh_until")
+
+    def __init__(
+        self, status_code: int, headers: List[Tuple[str, str]], body: bytes, fresh_until: Optional[float] = None
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.fresh_until = fresh_until
+
+    def to_bytes(self) -> bytes:
+        meta: Dict[str, Any] = {"status": self.status_code, "headers": self.headers}
+        if self.fresh_until is not None:
+            meta["fresh_until"] = self.fresh_until
+        return json.dumps(meta).encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> Optional["_CachedResponse"]:
+        """Parse a stored entry, or return None for entries in another format."""
+        meta_end = payload.find(b"\n")
+        if meta_end < 0:
+            return None
+        try:
+            meta = json.loads(payload[:meta_end])
+        except ValueError:
+            return None
+        if not isinstance(meta, dict) or "status" not in meta:
+            return None
+        headers = [(name, value) for name, value in meta.get("headers", [])]
+        return cls(meta["status"], headers, payload[meta_end + 1:], meta.get("fresh_until"))
+
+    def to_response(self) -> Response:
+        return Response(content=self.body, status_code=self.status_code, headers=dict(self.headers))
+
+
+async def _render(
+    result: Any, route: Optional[APIRoute], call_response: Optional[Response], is_coroutine: bool
+) -> Tuple[Any, int, List[Tuple[str, str]], Callable[[Any], bytes]]:
+    """Serialize an endpoint result the way FastAPI would for its route.
+
+    Returns the content, status code, headers and a function that renders
+    content to the response body.
+    """
+    response_class: Any = JSONResponse
+    status_code = 200
+    if route is not None:
+        content = await serialize_response(
+            field=route.response_field,
+            response_content=result,
+            include=route.response_model_include,
+            exclude=route.response_model_exclude,
+            by_alias=route.response_model_by_alias,
+            exclude_unset=route.response_model_exclude_unset,
+            exclude_defaults=route.response_model_exclude_defaults,
+            exclude_none=route.response_model_exclude_none,
+            is_coroutine=is_coroutine,
+        )
+        response_class = route.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        status_code = route.status_code or status_code
+    else:
+        content = jsonable_encoder(result)
+    if call_response is not None and call_response.status_code:
+        status_code = call_response.status_code
+
+    def render(value: Any) -> bytes:
+        return response_class(value).body
+
+    rendered = response_class(content, status_code=status_code)
+    headers = [(k, v) for k, v in rendered.headers.items() if k not in _UNCACHED_HEADERS]
+    if call_response is not None:
+        headers.extend((k, v) for k, v in call_response.headers.items() if k not in _UNCACHED_HEADERS)
+    return content, status_code, headers, render
+
+
+class _LeaderFailed(Exception):
+    """Raised to coalesced callers when the computing request went away."""
+
+
+# Marks an in-flight result that waiters cannot share, e.g. a raw Response
+_NOT_SHARED = object()
+
+# Cache key -> future of the computation currently running for that key
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    # Keeps asyncio from logging exceptions nobody was waiting for
+    if not future.cancelled():
+        future.exception()
+
+
+async def _single_flight(key: str, compute: Callable, timeout: float, local: LocalCache) -> Tuple[Any, bool]:
+    """Run ``compute`` once per key, letting concurrent callers await the same result.
+
+    Returns the result and whether this caller was coalesced onto another
+    caller's computation. Waiters that exceed ``timeout`` compute on their own.
+    """
+    loop = asyncio.get_running_loop()
+    future = _inflight.get(key)
+    if future is not None and future.get_loop() is loop:
+        local.metrics.record_coalesced()
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+            if result is not _NOT_SHARED:
+                return result, True
+        except asyncio.TimeoutError:
+            local.metrics.record_coalesce_timeout()
+            logger.warning(f"Timed out after {timeout}s waiting for in-flight cache fill, recomputing")
+        except _LeaderFailed:
+            pass
+        return await compute(), False
+
+    future = loop.create_future()
+    future.add_done_callback(_retrieve_exception)
+    _inflight[key] = future
+    try:
+        result = await compute()
+        future.set_result(_NOT_SHARED if isinstance(result, Response) else result)
+        return result, False
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        if not future.done():
+            future.set_exception(_LeaderFailed())
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+# Keys with a background refresh scheduled, and the tasks running them
+_refreshing: Set[str] = set()
+_refresh_tasks: Set[asyncio.Task] = set()
+
+
+def _schedule_refresh(key: str, refresh: Callable, local: LocalCache) -> None:
+    """Recompute a key in the background unless a computation is already running."""
+    if key in _refreshing or key in _inflight:
+        return
+    _refreshing.add(key)
+
+    async def run() -> None:
+        start = time.perf_counter()
+        try:
+            await _single_flight(key, refresh, settings.CACHE_COALESCE_TIMEOUT, local)
+            local.metrics.record_refresh((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            local.metrics.record_refresh_failure()
+            logger.warning(f"Background cache refresh failed: {str(e)}")
+        finally:
+            _refreshing.discard(key)
+
+    task = asyncio.get_running_loop().create_task(run())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+def cache_response(
+    prefix: str,
+    expire: int = settings.CACHE_DEFAULT_EXPIRE,
+    include_query_params: bool = False,
+    monitor: bool = False,
+    coalesce_timeout: float = settings.CACHE_COALESCE_TIMEOUT,
+    stale_ttl: int = 0,
+    refresh_ahead: Optional[float] = None,
+    tags: Optional[List[str]] = None,
+) -> Callable:
+    """Cache the JSON result of an endpoint in the tiered cache.
+
+    The response is stored as the exact body FastAPI would send, after
+    ``response_model`` validation, together with its headers. Hits on a route
+    are returned as a raw ``Response`` without validating or encoding again.
+
+    Concurrent misses for the same key are coalesced: one request computes the
+    value while the others await its result.
+
+    ``expire`` is capped by ``LocalCache.effective_expire`` when Redis is not
+    configured (``settings.CACHE_LOCAL_MAX_EXPIRE``); ``Cache-Control`` and
+    ``X-Cache-Expires`` report the effective TTL.
+
+    With ``stale_ttl`` an expired entry is still served for that many seconds
+    while a single background task recomputes it. With ``refresh_ahead`` a hit
+    past that fraction of ``expire`` schedules the refresh before expiry.
+    Background refreshes run with their own database sessions.
+
+    ``tags`` are templates formatted with the endpoint's arguments, e.g.
+    ``activities:{activity_id}``. Entries are invalidated when a commit
+    touches a tagged table or entity (see ``app.db.cache_events``).
+
+    Args:
+        prefix: Key prefix, e.g. ``dashboard:stats``; used for invalidation
+        expire: Time to live in seconds, before the cap without Redis
+        include_query_params: Whether non-sensitive query params are part of the key
+        monitor: Whether to expose key digest and cache stats in response headers
+        coalesce_timeout: Seconds a coalesced request waits before computing itself
+        stale_ttl: Seconds an expired entry may be served while it is refreshed
+        refresh_ahead: Fraction of ``expire`` after which hits trigger a refresh
+        tags: Dependency tag templates used for write-driven invalidation
+    """
+    revalidate = stale_ttl > 0 or refresh_ahead is not None
+
+    def decorator(func: Callable) -> Callable:
+        signature, own_request, own_response = _with_injected_params(func)
+        is_coroutine = inspect.iscoroutinefunction(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if own_request is None:
+                request = kwargs.pop(_REQUEST_PARAM, None)
+            else:
+                request = kwargs.get(own_request)
+            if own_response is None:
+                response = kwargs.pop(_RESPONSE_PARAM, None)
+            else:
+                response = kwargs.get(own_response)
+            if not isinstance(request, Request):
+                request = next((a for a in args if isinstance(a, Request)), None)
+            # Called through a FastAPI route, hits are served as raw responses
+            route = request.scope.get("route") if request is not None else None
+            if not isinstance(route, APIRoute):
+                route = None
+
+            local = LocalCache.get_instance()
+            key = _build_key(prefix, request, include_query_params, kwargs)
+            entry_tags = _format_tags(tags, kwargs)
+
+            def make_compute(call_args: tuple, call_kwargs: Dict[str, Any], call_response: Optional[Response]) -> Callable:
+                async def compute() -> Any:
+                    if is_coroutine:
+                        result = await func(*call_args, **call_kwargs)
+                    else:
+                        result = await run_in_threadpool(func, *call_args, **call_kwargs)
+                    if isinstance(result, Response):
+                        # Raw responses are passed through uncached
+                        return result
+                    content, status_code, headers, render = await _render(
+                        result, route, call_response, is_coroutine
+                    )
+                    # Misses serve exactly what later hits will: the sanitized body
+                    sanitized = local._sanitize(content)
+                    body = render(sanitized)
+                    served = _CachedResponse(status_code, headers, body)
+                    try:
+                        if revalidate:
+                            # Fresh for the TTL the store really keeps, then stale for stale_ttl
+                            fresh = local.effective_expire(expire)
+                            entry = _CachedResponse(status_code, headers, body, time.time() + fresh)
+                            local.set_bytes(key, entry.to_bytes(), expire=fresh, tags=entry_tags, stale_ttl=stale_ttl)
+                        else:
+                            entry = _CachedResponse(status_code, headers, body)
+                            local.set_bytes(key, entry.to_bytes(), expire=expire, tags=entry_tags)
+                    except HTTPException:
+                        logger.warning(f"Response for {prefix} exceeds maximum entry size, not cached")
+                    return served, sanitized
+                return compute
+
+            async def refresh() -> Any:
+                # The request's session and response are gone once it finishes
+                sessions = []
+                refresh_kwargs = dict(kwargs)
+                refresh_response = None
+                for name, value in kwargs.items():
+                    if isinstance(value, AsyncDbSession):
+                        refresh_kwargs[name] = AsyncDbSession(bind=value.bind, expire_on_commit=False)
+                        sessions.append(refresh_kwargs[name])
+                    elif isinstance(value, DbSession):
+                        refresh_kwargs[name] = DbSession(bind=value.get_bind())
+                        sessions.append(refresh_kwargs[name])
+                    elif isinstance(value, Response):
+                        refresh_response = refresh_kwargs[name] = Response()
+                        refresh_response.status_code = None
+                try:
+                    return await make_compute(args, refresh_kwargs, refresh_response)()
+                finally:
+                    for session in sessions:
+                        if isinstance(session, AsyncDbSession):
+                            await session.close()
+                        else:
+                            session.close()
+
+            def respond(entry: _CachedResponse, content: Callable[[], Any], status: str) -> Any:
+                if route is not None:
+                    raw = entry.to_response()
+                    if response is not None:
+                        # Headers set by dependencies for this request, e.g. ETag on a miss
+                        for name, value in response.headers.items():
+                            if name not in raw.headers and name != "content-length":
+                                raw.headers[name] = value
+                    _apply_cache_headers(raw, status, key, local.effective_expire(expire), monitor, local)
+                    return raw
+                if response is not None:
+                    _apply_cache_headers(response, status, key, local.effective_expire(expire), monitor, local)
+                return content()
+
+            payload = local.get_bytes(key, prefix=prefix)
+            cached = _CachedResponse.from_bytes(payload) if payload is not None else None
+            if cached is not None:
+                status = "HIT"
+                if revalidate and cached.fresh_until is not None:
+                    fresh = local.effective_expire(expire)
+                    refresh_after = fresh * refresh_ahead if refresh_ahead is not None else fresh
+                    remaining = cached.fresh_until - time.time()
+                    if remaining <= 0:
+                        status = "STALE"
+                        _schedule_refresh(key, refresh, local)
+                    elif fresh - remaining >= refresh_after:
+                        _schedule_refresh(key, refresh, local)
+                return respond(cached, lambda: json.loads(cached.body), status)
+
+            compute = make_compute(args, kwargs, response)
+
+            result, coalesced = await _single_flight(key, compute, coalesce_timeout, local)
+            if isinstance(result, Response):
+                return result
+            served, content = result
+            return respond(served, lambda: content, "COALESCED" if coalesced else "MISS")
+
+        wrapper.__signature__ = signature
+        return wrapper
+    return decorator
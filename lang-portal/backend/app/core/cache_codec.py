@@ -0,0 +1,104 @@
+"""Value codec for the local cache tiers.
+
+Cached payloads are UTF-8 JSON, or a JSON header line followed by a response
+body. Payloads at or above a size threshold are compressed with zstd when the
+``zstandard`` package is installed, otherwise with zlib. Compressed payloads
+start with a one-byte marker; uncompressed ones are stored as-is, since they
+always start with JSON text and never with a marker byte.
+"""
+import base64
+import logging
+import time
+import zlib
+from typing import Optional
+
+from app.core.metrics import CacheMetrics
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_ZLIB = b"\x01"
+_ZSTD = b"\x02"
+
+# Prefix of compressed payloads in text form (Redis); JSON never starts with it
+_TEXT_MARKER = "~"
+
+
+class CacheCodec:
+    """Encode payloads to stored bytes, compressing large ones."""
+
+    def __init__(self, algorithm: str, threshold: int, level: int, metrics: CacheMetrics):
+        if algorithm == "auto":
+            algorithm = "zstd" if zstandard is not None else "zlib"
+        elif algorithm == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, falling back to zlib cache compression")
+            algorithm = "zlib"
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.level = level
+        self.metrics = metrics
+        self._zstd_compressor = None
+        self._zstd_decompressor = None
+        if zstandard is not None:
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+            if algorithm == "zstd":
+                self._zstd_compressor = zstandard.ZstdCompressor(level=level)
+
+    def encode(self, raw: bytes) -> bytes:
+        """Encode a payload, compressing it when it reaches the threshold."""
+        if self.algorithm == "none" or len(raw) < self.threshold:
+            return raw
+
+        start = time.perf_counter()
+        if self._zstd_compressor is not None:
+            data = _ZSTD + self._zstd_compressor.compress(raw)
+        else:
+            data = _ZLIB + zlib.compress(raw, self.level)
+        cpu_ms = (time.perf_counter() - start) * 1000
+
+        if len(data) >= len(raw):
+            # Incompressible; storing it compressed would only cost CPU on reads
+            self.metrics.record_compression(len(raw), len(raw), cpu_ms)
+            return raw
+        self.metrics.record_compression(len(raw), len(data), cpu_ms)
+        return data
+
+    def decode(self, data: bytes) -> bytes:
+        """Decode stored bytes back to the payload."""
+        marker = data[:1]
+        if marker not in (_ZLIB, _ZSTD):
+            return data
+
+        start = time.perf_counter()
+        if marker == _ZLIB:
+            raw = zlib.decompress(data[1:])
+        elif self._zstd_decompressor is not None:
+            raw = self._zstd_decompressor.decompress(data[1:])
+        else:
+            raise ValueError("Cache entry is zstd compressed but zstandard is not installed")
+        self.metrics.record_decompression((time.perf_counter() - start) * 1000)
+        return raw
+
+    @staticmethod
+    def is_compressed(data: bytes) -> bool:
+        return data[:1] in (_ZLIB, _ZSTD)
+
+    @staticmethod
+    def to_text(data: bytes) -> str:
+        """Represent stored bytes as text for text-only tiers such as Redis."""
+        if data[:1] in (_ZLIB, _ZSTD):
+            return _TEXT_MARKER + base64.b64encode(data).decode("ascii")
+        return data.decode("utf-8")
+
+    @staticmethod
+    def from_text(text: Optional[str]) -> Optional[bytes]:
+        """Inverse of ``to_text``."""
+        if text is None:
+            return None
+        if text.startswith(_TEXT_MARKER):
+            return base64.b64decode(text[1:])
+        return text.encode("utf-8")
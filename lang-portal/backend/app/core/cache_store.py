@@ -0,0 +1,540 @@
+"""Persistent storage backends for the local cache tier.
+
+Both backends store opaque encoded payloads (see ``cache_codec``) under a key digest and report what
+they hold at startup; the LRU index, scope index and quota live in
+``LocalCache``.
+
+``SegmentStore`` (default) appends records to a few memory-mapped segment
+files and keeps their locations in memory, so reads and writes never touch the
+directory. ``FileStore`` keeps the original one JSON file per key layout.
+"""
+import base64
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache_codec import CacheCodec
+
+logger = logging.getLogger(__name__)
+
+
+class StoreEntry:
+    """Index record for a persisted cache entry."""
+
+    __slots__ = ("size", "created_at", "expires_at", "scopes")
+
+    def __init__(self, size: int, created_at: float, expires_at: Optional[float], scopes: List[str]):
+        self.size = size
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.scopes = scopes
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+
+class LoadResult:
+    """Entries recovered at startup, oldest first, plus what was discarded."""
+
+    def __init__(self):
+        self.entries: List[Tuple[str, StoreEntry]] = []
+        self.cleaned_entries = 0
+        self.cleaned_size = 0
+        # Known digests whose entries are gone from the store (rescans only)
+        self.missing: List[str] = []
+
+
+def _to_timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed.timestamp()
+
+
+def to_iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _secure_dir(path: Path) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    os.chmod(path, 0o700)
+
+
+class FileStore:
+    """One hash-named ``*.cache`` JSON file per entry."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        # Directory mtime after our own last change; anything else changed it
+        self._dir_mtime: Optional[int] = None
+        _secure_dir(cache_dir)
+
+    def path_for(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.cache"
+
+    def load(self, now: float) -> LoadResult:
+        """Read every cache file once, dropping expired or invalid ones."""
+        result = self._scan(now, {})
+        self._dir_mtime = self._mtime()
+        return result
+
+    def rescan(self, now: float, known: Dict[str, StoreEntry]) -> Optional[LoadResult]:
+        """Pick up files added or removed by others since the last change we made.
+
+        Returns None, after a single ``stat``, if the directory is unchanged.
+        New files are read like at startup; digests in ``known`` whose file is
+        gone are reported as missing.
+        """
+        if self._mtime() == self._dir_mtime:
+            return None
+        result = self._scan(now, known)
+        self._dir_mtime = self._mtime()
+        return result
+
+    def _scan(self, now: float, known: Dict[str, StoreEntry]) -> LoadResult:
+        result = LoadResult()
+        present = set()
+        for path in self.cache_dir.glob("*.cache"):
+            present.add(path.stem)
+            if path.stem in known:
+                continue
+            try:
+                size = path.stat().st_size
+                with path.open("r") as f:
+                    content = json.load(f)
+                expires_at = _to_timestamp(content.get("expires_at"))
+                created_at = _to_timestamp(content.get("created_at")) or now
+                scopes = list(content.get("scopes", []))
+            except (OSError, ValueError, AttributeError, TypeError):
+                expires_at, created_at, scopes, size = now, now, [], 0
+            if expires_at is not None and expires_at <= now:
+                self._unlink(path)
+                result.cleaned_entries += 1
+                result.cleaned_size += size
+                continue
+            result.entries.append((path.stem, StoreEntry(size, created_at, expires_at, scopes)))
+        result.entries.sort(key=lambda item: item[1].created_at)
+        result.missing = [digest for digest in known if digest not in present]
+        return result
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return self.cache_dir.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def read(self, digest: str) -> Optional[bytes]:
+        try:
+            with self.path_for(digest).open("r") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if "encoded" in content:
+            return base64.b64decode(content["encoded"])
+        return json.dumps(content.get("value")).encode("utf-8")
+
+    def write(
+        self, digest: str, payload: bytes, created_at: float, expires_at: Optional[float], scopes: List[str]
+    ) -> Optional[StoreEntry]:
+        if self._is_json(payload):
+            # Uncompressed JSON stays readable in the file
+            value = '"value": ' + payload.decode("utf-8")
+        else:
+            # Compressed payloads and framed responses (header line + body)
+            value = '"encoded": "' + base64.b64encode(payload).decode("ascii") + '"'
+        content = (
+            "{" + value
+            + ', "created_at": ' + json.dumps(to_iso(created_at))
+            + ', "expires_at": ' + json.dumps(to_iso(expires_at))
+            + ', "scopes": ' + json.dumps(scopes) + "}"
+        )
+        path = self.path_for(digest)
+        tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+        data = content.encode("utf-8")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to write cache file: {str(e)}")
+            self._unlink(tmp_path)
+            return None
+        self._dir_mtime = self._mtime()
+        return StoreEntry(len(data), created_at, expires_at, scopes)
+
+    @staticmethod
+    def _is_json(payload: bytes) -> bool:
+        if CacheCodec.is_compressed(payload):
+            return False
+        try:
+            json.loads(payload)
+        except ValueError:
+            return False
+        return True
+
+    def remove(self, digest: str) -> None:
+        self._unlink(self.path_for(digest))
+        self._dir_mtime = self._mtime()
+
+    def clear(self) -> None:
+        for path in self.cache_dir.glob("*.cache"):
+            self._unlink(path)
+        self._dir_mtime = self._mtime()
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+# Record header: magic, crc32 of the rest, flags, digest length, meta length,
+# payload length, created_at, expires_at (0 = never)
+_HEADER = struct.Struct("<4sIBxxxIIIdd")
+_MAGIC = b"LPC1"
+_FLAG_TOMBSTONE = 1
+
+
+class _Location:
+    __slots__ = ("segment", "offset", "length", "record_size")
+
+    def __init__(self, segment: int, offset: int, length: int, record_size: int):
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+        self.record_size = record_size
+
+
+class SegmentStore:
+    """Append-only, memory-mapped segment files with an in-memory location index.
+
+    Every write appends a CRC-checked record to the active segment; deletes
+    append a tombstone. Segments are rotated at ``segment_size`` bytes. Once
+    the share of superseded bytes exceeds ``compaction_ratio`` the live
+    records are copied into a fresh segment and the old ones are removed.
+
+    Recovery replays segments in order and truncates a segment at its first
+    torn or corrupt record, so a crash loses at most the last writes. Reads
+    re-check the CRC and digest of the record, and a mismatch is a miss.
+
+    A directory belongs to one process at a time: ``load`` takes an exclusive
+    ``flock`` on it, so appends and compaction never race another worker.
+    Use ``for_worker`` to claim the first free per-worker directory.
+    """
+
+    def __init__(self, cache_dir: Path, segment_size: int, compaction_ratio: float):
+        self.cache_dir = cache_dir
+        self.segment_size = segment_size
+        self.compaction_ratio = compaction_ratio
+        self._lock = threading.RLock()
+        self._locations: Dict[str, _Location] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._segment_sizes: Dict[int, int] = {}
+        self._active_id = 0
+        self._active = None
+        self.total_bytes = 0
+        self.dead_bytes = 0
+        self.compactions = 0
+        self._lock_fd: Optional[int] = None
+        _secure_dir(cache_dir)
+
+    @classmethod
+    def for_worker(cls, base_dir: Path, segment_size: int, compaction_ratio: float) -> "SegmentStore":
+        """Create a store in the first ``worker-<n>`` directory no live process holds.
+
+        Slots are reused across restarts, so a restarted worker picks up the
+        segments a previous worker left behind.
+        """
+        slot = 0
+        while True:
+            store = cls(base_dir / f"worker-{slot}", segment_size, compaction_ratio)
+            if store._claim():
+                return store
+            slot += 1
+
+    def _claim(self) -> bool:
+        """Take the exclusive lock on the directory; False if another process holds it."""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self.cache_dir / ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.cache_dir / f"segment-{segment:08d}.seg"
+
+    def path_for(self, digest: str) -> Optional[Path]:
+        location = self._locations.get(digest)
+        return self._segment_path(location.segment) if location else None
+
+    # -- recovery ---------------------------------------------------------------
+
+    def load(self, now: float) -> LoadResult:
+        """Replay all segments and rebuild the location index."""
+        if not self._claim():
+            raise OSError(f"Cache directory {self.cache_dir} is in use by another process")
+        for tmp in self.cache_dir.glob("*.seg.tmp"):
+            # Compaction did not finish; the old segments are still complete
+            tmp.unlink()
+
+        entries: Dict[str, StoreEntry] = {}
+        segments = sorted(int(p.stem.split("-")[1]) for p in self.cache_dir.glob("segment-*.seg"))
+        for segment in segments:
+            self._replay_segment(segment, entries)
+
+        result = LoadResult()
+        for digest, entry in list(entries.items()):
+            if entry.is_expired(now):
+                self._drop_location(digest)
+                result.cleaned_entries += 1
+                result.cleaned_size += entry.size
+                del entries[digest]
+        result.entries = sorted(entries.items(), key=lambda item: item[1].created_at)
+
+        self._active_id = segments[-1] if segments else 1
+        self._open_active()
+        if result.cleaned_entries:
+            self._maybe_compact()
+        return result
+
+    def rescan(self, now: float, known: Dict[str, StoreEntry]) -> Optional[LoadResult]:
+        """Segments are only written by the process holding the lock, so there is nothing to pick up."""
+        return None
+
+    def _replay_segment(self, segment: int, entries: Dict[str, StoreEntry]) -> None:
+        path = self._segment_path(segment)
+        data = path.read_bytes()
+        offset = 0
+        while offset < len(data):
+            record = self._parse(data, offset)
+            if record is None:
+                logger.warning(f"Truncating cache segment {path.name} at corrupt record offset {offset}")
+                with path.open("r+b") as f:
+                    f.truncate(offset)
+                break
+            flags, digest, scopes, payload_offset, payload_len, created_at, expires_at, size = record
+            self._drop_location(digest)
+            entries.pop(digest, None)
+            if flags & _FLAG_TOMBSTONE:
+                self.dead_bytes += size
+            else:
+                self._locations[digest] = _Location(segment, payload_offset, payload_len, size)
+                entries[digest] = StoreEntry(size, created_at, expires_at, scopes)
+            self.total_bytes += size
+            offset += size
+        self._segment_sizes[segment] = offset
+
+    @staticmethod
+    def _parse(data, offset: int):
+        if offset + _HEADER.size > len(data):
+            return None
+        magic, crc, flags, digest_len, meta_len, payload_len, created_at, expires_at = _HEADER.unpack_from(data, offset)
+        size = _HEADER.size + digest_len + meta_len + payload_len
+        if magic != _MAGIC or offset + size > len(data):
+            return None
+        body = data[offset + 8:offset + size]
+        if zlib.crc32(body) != crc:
+            return None
+        start = offset + _HEADER.size
+        digest = bytes(data[start:start + digest_len]).decode("ascii")
+        scopes = json.loads(bytes(data[start + digest_len:start + digest_len + meta_len]) or b"[]")
+        payload_offset = start + digest_len + meta_len
+        return flags, digest, scopes, payload_offset, payload_len, created_at, expires_at or None, size
+
+    # -- reads and writes ----------------------------------------------------------
+
+    def read(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            location = self._locations.get(digest)
+            if location is None:
+                return None
+            start = location.offset - (location.record_size - location.length)
+            view = self._map(location.segment, start + location.record_size)
+            record = self._parse(view, start)
+            if record is None or record[1] != digest or record[0] & _FLAG_TOMBSTONE:
+                logger.warning(f"Dropping corrupt cache record in segment {location.segment} at offset {start}")
+                self._drop_location(digest)
+                return None
+            return view[location.offset:location.offset + location.length]
+
+    def write(
+        self, digest: str, payload: bytes, created_at: float, expires_at: Optional[float], scopes: List[str]
+    ) -> Optional[StoreEntry]:
+        record, payload_len = self._encode(0, digest, scopes, payload, created_at, expires_at)
+        with self._lock:
+            try:
+                segment, offset = self._append(record)
+            except OSError as e:
+                logger.error(f"Failed to append cache record: {str(e)}")
+                return None
+            self._drop_location(digest)
+            self._locations[digest] = _Location(segment, offset + len(record) - payload_len, payload_len, len(record))
+            self._maybe_compact()
+        return StoreEntry(len(record), created_at, expires_at, scopes)
+
+    def remove(self, digest: str) -> None:
+        with self._lock:
+            if digest not in self._locations:
+                return
+            record, _ = self._encode(_FLAG_TOMBSTONE, digest, [], b"", time.time(), None)
+            try:
+                self._append(record)
+            except OSError as e:
+                logger.error(f"Failed to append cache tombstone: {str(e)}")
+            self._drop_location(digest)
+            self.dead_bytes += len(record)
+            self._maybe_compact()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._close_files()
+            for path in self.cache_dir.glob("segment-*.seg"):
+                path.unlink()
+            self._locations.clear()
+            self._segment_sizes.clear()
+            self.total_bytes = 0
+            self.dead_bytes = 0
+            self._active_id += 1
+            self._open_active()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_files()
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "segments": len(self._segment_sizes),
+            "segment_bytes": self.total_bytes,
+            "dead_bytes": self.dead_bytes,
+            "compactions": self.compactions,
+        }
+
+    @staticmethod
+    def _encode(
+        flags: int, digest: str, scopes: List[str], payload: bytes, created_at: float, expires_at: Optional[float]
+    ) -> Tuple[bytes, int]:
+        digest_bytes = digest.encode("ascii")
+        meta = json.dumps(scopes).encode("utf-8") if scopes else b""
+        header = _HEADER.pack(
+            _MAGIC, 0, flags, len(digest_bytes), len(meta), len(payload), created_at, expires_at or 0.0
+        )
+        body = header[8:] + digest_bytes + meta + payload
+        return _MAGIC + struct.pack("<I", zlib.crc32(body)) + body, len(payload)
+
+    # -- segment files --------------------------------------------------------------
+
+    def _open_active(self) -> None:
+        path = self._segment_path(self._active_id)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        self._active = os.fdopen(fd, "ab")
+        self._segment_sizes.setdefault(self._active_id, path.stat().st_size)
+
+    def _append(self, record: bytes) -> Tuple[int, int]:
+        if self._segment_sizes[self._active_id] + len(record) > self.segment_size and self._segment_sizes[self._active_id]:
+            self._active.close()
+            self._active_id += 1
+            self._open_active()
+        offset = self._segment_sizes[self._active_id]
+        self._active.write(record)
+        self._active.flush()
+        self._segment_sizes[self._active_id] = offset + len(record)
+        self.total_bytes += len(record)
+        return self._active_id, offset
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        view = self._maps.get(segment)
+        if view is None or len(view) < end:
+            if view is not None:
+                view.close()
+            with self._segment_path(segment).open("rb") as f:
+                view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = view
+        return view
+
+    def _drop_location(self, digest: str) -> None:
+        location = self._locations.pop(digest, None)
+        if location is not None:
+            self.dead_bytes += location.record_size
+
+    def _close_files(self) -> None:
+        for view in self._maps.values():
+            view.close()
+        self._maps.clear()
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+
+    # -- compaction -------------------------------------------------------------------
+
+    def _maybe_compact(self) -> None:
+        if self.total_bytes < self.segment_size // 4:
+            return
+        if self.dead_bytes <= self.total_bytes * self.compaction_ratio:
+            return
+        self.compact()
+
+    def compact(self) -> None:
+        """Copy live records into a new segment and drop all older segments."""
+        with self._lock:
+            old_segments = sorted(self._segment_sizes)
+            target = self._active_id + 1
+            tmp_path = self._segment_path(target).with_suffix(".seg.tmp")
+            new_locations: Dict[str, _Location] = {}
+            offset = 0
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as out:
+                for digest, location in self._locations.items():
+                    start = location.offset - (location.record_size - location.length)
+                    view = self._map(location.segment, start + location.record_size)
+                    out.write(view[start:start + location.record_size])
+                    new_locations[digest] = _Location(
+                        target, offset + location.record_size - location.length,
+                        location.length, location.record_size,
+                    )
+                    offset += location.record_size
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, self._segment_path(target))
+
+            self._close_files()
+            for segment in old_segments:
+                try:
+                    self._segment_path(segment).unlink()
+                except OSError:
+                    pass
+            self._locations = new_locations
+            self._segment_sizes = {target: offset}
+            self._active_id = target
+            self.total_bytes = offset
+            self.dead_bytes = 0
+            self.compactions += 1
+            self._open_active()
@@ -0,0 +1,117 @@
+"""Conditional GET (ETag / Last-Modified) for read-mostly resources.
+
+A resource's version is read with one small aggregate query over the
+``updated_at`` columns and membership of the rows it is built from. When the
+client already holds that version the request is answered with 304 from a
+route dependency, before the endpoint runs its queries or serializes anything.
+"""
+import hashlib
+import inspect
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db, get_read_db
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceVersion:
+    """Last modification time of a resource plus a fingerprint of its membership."""
+
+    __slots__ = ("last_modified", "parts")
+
+    def __init__(self, timestamps: Sequence[Optional[datetime]], parts: Sequence[Any]):
+        known = [_as_utc(ts) for ts in timestamps if ts is not None]
+        self.last_modified: Optional[datetime] = max(known) if known else None
+        self.parts = tuple(ts.isoformat() if ts is not None else None for ts in timestamps) + tuple(parts)
+
+    def etag(self, path: str, query: str = "") -> str:
+        """Strong ETag for one representation (path and query) of this version."""
+        fingerprint = repr((path, query, self.parts)).encode("utf-8")
+        return f'"{hashlib.sha256(fingerprint).hexdigest()[:32]}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; CURRENT_TIMESTAMP is UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as required for If-None-Match
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _apply_version(request: Request, response: Response, version: Optional[ResourceVersion]) -> None:
+    """Answer 304 for a current client copy, otherwise set the validators."""
+    if version is None:
+        return
+    headers = {"ETag": version.etag(request.url.path, request.url.query)}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(version.last_modified, usegmt=True)
+    if is_not_modified(request, headers["ETag"], version.last_modified):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def _resource_id(request: Request, param: str) -> Optional[int]:
+    try:
+        return int(request.path_params[param])
+    except (KeyError, ValueError):
+        return None
+
+
+def conditional_get(loader: Callable[..., Optional[ResourceVersion]], param: str) -> Callable:
+    """Route dependency answering 304 when the client holds the current version.
+
+    ``loader(db, id=...)`` returns the version of the resource identified by
+    the path parameter ``param``, or None if it does not exist, in which case
+    the endpoint runs and reports the error. Otherwise ``ETag`` and
+    ``Last-Modified`` are set on the response. Coroutine loaders are given an
+    ``AsyncSession``, plain ones a ``Session``.
+
+    Usage::
+
+        @router.get("/items/{item_id}", dependencies=[Depends(conditional_get(service.get_version, "item_id"))])
+    """
+    if inspect.iscoroutinefunction(loader):
+        async def async_dependency(
+            request: Request, response: Response, db: AsyncSession = Depends(get_read_db)
+        ) -> None:
+            resource_id = _resource_id(request, param)
+            if resource_id is not None:
+                _apply_version(request, response, await loader(db, id=resource_id))
+
+        return async_dependency
+
+    def dependency(request: Request, response: Response, db: Session = Depends(get_db)) -> None:
+        resource_id = _resource_id(request, param)
+        if resource_id is not None:
+            _apply_version(request, response, loader(db, id=resource_id))
+
+    return dependency
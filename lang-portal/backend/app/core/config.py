@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Any, Dict
 import os
 
 class Settings(BaseSettings):
@@ -17,11 +18,162 @@ class Settings(BaseSettings):
     DATABASE_URL: str = f"sqlite:///{BACKEND_DIR}/data/app.db"
     TEST_DATABASE_URL: str = f"sqlite:///{BACKEND_DIR}/data/test.db"
     
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """DATABASE_URL with the aiosqlite driver, for the write queue's engine."""
+        return self.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    
+    @property
+    def ASYNC_READ_ONLY_DATABASE_URL(self) -> str:
+        """Async URL opening the DATABASE_URL file read-only."""
+        path = self.DATABASE_URL.split(":///", 1)[1]
+        return f"sqlite+aiosqlite:///file:{path}?mode=ro&uri=true"
+    
     # Database configuration
     DB_ECHO: bool = False  # SQL query logging
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_TIMEOUT: int = 30
+    DB_READ_POOL_SIZE: int = 5  # Read-only connections used by async routes
+    DB_METRICS_INTERVAL: float = 60.0  # Seconds between background samples of database metrics
+    
+    # SQLite pragma profiles applied to every connection (see app.db.pragmas);
+    # scripts/benchmark_sqlite_profiles.py compares them on the app's workloads
+    SQLITE_PROFILE: str = "balanced"
+    SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+        # Smallest footprint: 2MB page cache, no memory mapping, temp tables on disk
+        "low_memory": {
+            "busy_timeout": 5000, "journal_mode": "WAL", "synchronous": "NORMAL",
+            "cache_size": -2000, "mmap_size": 0, "temp_store": "FILE",
+        },
+        "balanced": {
+            "busy_timeout": 5000, "journal_mode": "WAL", "synchronous": "NORMAL",
+            "cache_size": -16000, "mmap_size": 64 * 1024 * 1024, "temp_store": "MEMORY",
+        },
+        # Large cache and mapping; checkpoints less often so bursts of writes append to the WAL
+        "throughput": {
+            "busy_timeout": 5000, "journal_mode": "WAL", "synchronous": "NORMAL",
+            "cache_size": -64000, "mmap_size": 256 * 1024 * 1024, "temp_store": "MEMORY",
+            "wal_autocheckpoint": 4000,
+        },
+    }
+    SQLITE_OPTIMIZE_ON_CLOSE: bool = True  # Run PRAGMA optimize when a connection closes
+    
+    # Single writer: queued write transactions are group-committed on one connection
+    DB_WRITE_QUEUE_SIZE: int = 1024  # Pending transactions before submitters wait
+    DB_WRITE_MAX_BATCH: int = 64  # Transactions per commit
+    DB_WRITE_BATCH_WINDOW_MS: float = 0.0  # Extra wait for a batch to fill; 0 takes what queued up meanwhile
+    
+    # Cache configuration
+    CACHE_DIR: str = str(BACKEND_DIR / "data" / "cache")
+    CACHE_DEFAULT_EXPIRE: int = 300  # seconds
+    CACHE_MEMORY_BUDGET: int = 32 * 1024 * 1024  # RAM budget of the in-process LRU tier (stored bytes)
+    MAX_CACHE_SIZE: int = 100 * 1024 * 1024  # Disk budget of the persistent tier (stored bytes)
+    CACHE_MAX_ENTRY_SIZE: int = 1024 * 1024  # Largest single entry before compression (bytes)
+    CACHE_COMPRESSION: str = "auto"  # "auto" (zstd if installed, else zlib), "zstd", "zlib" or "none"
+    CACHE_COMPRESSION_THRESHOLD: int = 4096  # Compress payloads of at least this many bytes
+    CACHE_COMPRESSION_LEVEL: int = 3
+    CACHE_BACKEND: str = "segment"  # "segment" or "files" (one JSON file per key)
+    CACHE_SEGMENT_SIZE: int = 16 * 1024 * 1024  # Segment rotation size (bytes)
+    CACHE_COMPACTION_RATIO: float = 0.5  # Compact once this share of segment bytes is dead
+    CACHE_EXPIRY_BATCH: int = 256  # Max entries removed per expiry pass
+    CACHE_EXPIRY_MAX_SLEEP: float = 60.0  # Longest idle wait of the expiry thread (seconds)
+    CACHE_COALESCE_TIMEOUT: float = 30.0  # seconds to await an in-flight computation
+    # Without Redis, invalidations stay in-process, so cache TTLs (including
+    # cache_response(expire=...)) are capped at this many seconds; 0 disables
+    CACHE_LOCAL_MAX_EXPIRE: int = 60
+    
+    # Redis configuration (optional shared cache tier)
+    REDIS_ENABLED: bool = False
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_TEST_DB: int = 1
+    REDIS_RETRY_INTERVAL: int = 30  # seconds to skip Redis after a failure
+    REDIS_INVALIDATION_CHANNEL: str = "cache-invalidations"  # Pub/sub channel broadcasting invalidations to workers
+    
+    # Route privacy rules by path template ("{name}" is one segment, a final
+    # "**" the rest of the path); set as JSON to add or override routes
+    PRIVACY_ROUTE_RULES: Dict[str, Dict[str, Any]] = {
+        "/api/v1/dashboard/**": {
+            "cache_control": "no-store, max-age=0",
+            "sanitize_response": True,
+            "allow_query_params": ["limit", "offset"]
+        },
+        "/api/v1/vocabulary/**": {
+            "cache_control": "private, max-age=300",
+            "sanitize_response": True,
+            "allow_query_params": ["limit", "offset", "sort", "filter"]
+        },
+        "/api/v1/sessions/**": {
+            "cache_control": "no-store, no-cache, must-revalidate",
+            "sanitize_response": True,
+            "allow_query_params": ["limit"]
+        },
+        "/api/v1/vocabulary-groups/**": {
+            # Revalidate on every use; conditional GETs answer 304 cheaply
+            "cache_control": "private, no-cache",
+            "sanitize_response": True,
+            "allow_query_params": ["limit", "skip", "cursor", "sort", "reverse", "language_pair_id"]
+        },
+        "/api/v1/activities/**": {
+            "cache_control": "private, max-age=300",
+            "sanitize_response": True,
+            "allow_query_params": ["limit", "offset", "skip", "cursor", "sort", "type"]
+        },
+        "/api/v1/activities/activities/{activity_id}/practice": {
+            # Revalidate on every use; conditional GETs answer 304 cheaply
+            "cache_control": "private, no-cache",
+            "sanitize_response": True,
+            "allow_query_params": []
+        },
+        "/api/v1/export/**": {
+            "cache_control": "no-store",
+            "sanitize_response": False,
+            "allow_query_params": [
+                "format", "after_id", "language_pair_id", "group_id", "mastered",
+                "session_id", "activity_id", "since"
+            ]
+        },
+        "/api/v1/vocabularies/import": {
+            "cache_control": "no-store",
+            "sanitize_response": True,
+            "allow_query_params": ["format", "language_pair_id", "group_id", "on_conflict", "batch_size"]
+        }
+    }
+    PRIVACY_RULE_CACHE_SIZE: int = 1024  # Memoized path-to-rule lookups
+    
+    # Rate limiting with token buckets per client and route class; routes
+    # are path templates as in PRIVACY_ROUTE_RULES, unlisted routes are not limited
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_RULES: Dict[str, Dict[str, Any]] = {
+        "/api/v1/dashboard/**": {"name": "dashboard", "requests": 60, "window": 60},
+        "/api/v1/export/**": {"name": "export", "requests": 10, "window": 60}
+    }
+    RATE_LIMIT_MAX_BUCKETS: int = 10000  # Least recently used buckets beyond this are evicted
+    
+    # Response compression; brotli is used when the ``brotli`` package is installed
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 500  # Smaller bodies are sent uncompressed (bytes)
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_VARIANT_BUDGET: int = 16 * 1024 * 1024  # RAM budget of compressed variants of cached responses
+    
+    # Bulk vocabulary import (see app.services.vocabulary_import)
+    VOCABULARY_IMPORT_BATCH_SIZE: int = 1000  # Rows per transaction
+    VOCABULARY_IMPORT_MAX_ERRORS: int = 100  # Invalid rows reported individually
+    
+    # Keyset pagination of list endpoints (see app.core.pagination)
+    PAGINATION_COUNT_TTL: int = 300  # Seconds a list total is reused unless its table changes
+    
+    # Streaming exports (see app.services.export)
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched and encoded per chunk
+    
+    # Request performance monitoring
+    SLOW_REQUEST_THRESHOLD_MS: float = 500.0  # Requests slower than this are logged
+    DB_INSTRUMENTATION_ENABLED: bool = True  # Attribute SQL statements and database time to requests
+    DB_N_PLUS_ONE_THRESHOLD: int = 5  # Executions of one statement per request reported as N+1
+    SERVER_TIMING_ENABLED: bool = True  # Report database time in a Server-Timing header
     
     # Test configuration
     TEST_DB_ECHO: bool = False  # Disable SQL logging in tests
@@ -1,10 +1,84 @@
-"""Cache metrics collection and monitoring."""
+"""Cache, API and database metrics collection and monitoring."""
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import threading
-import statistics
 from app.core.config import settings
 
+class LatencyHistogram:
+    """Fixed-memory log-bucketed latency histogram (HDR style).
+    
+    Values are recorded in microseconds. Each power of two is split into
+    ``2 ** SUB_BITS`` linear sub-buckets, so any reported percentile is
+    within about 1.6% of the true value. Recording is O(1) and a percentile
+    query walks a fixed number of buckets.
+    """
+    
+    SUB_BITS = 5
+    MAX_BITS = 36  # ~19 hours in microseconds; larger values are clamped
+    PERCENTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("p999", 0.999))
+    
+    def __init__(self):
+        self._sub_count = 1 << self.SUB_BITS
+        self._max_value = (1 << self.MAX_BITS) - 1
+        self._counts: List[int] = [0] * ((self.MAX_BITS - self.SUB_BITS + 1) * self._sub_count)
+        self.count: int = 0
+        self._sum: int = 0
+        self._min: int = 0
+        self._max: int = 0
+    
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.SUB_BITS - 1
+        return (shift + 1) * self._sub_count + (value >> shift) - self._sub_count
+    
+    def _midpoint(self, index: int) -> float:
+        if index < self._sub_count:
+            return float(index)
+        shift = index // self._sub_count - 1
+        low = (index % self._sub_count + self._sub_count) << shift
+        return low + ((1 << shift) - 1) / 2
+    
+    def record(self, value_ms: float) -> None:
+        """Record a latency in milliseconds."""
+        value = min(max(int(value_ms * 1000), 0), self._max_value)
+        self._counts[self._index(value)] += 1
+        if self.count == 0 or value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+        self.count += 1
+        self._sum += value
+    
+    def percentile(self, fraction: float) -> float:
+        """Get the latency in milliseconds at or below which ``fraction`` of values fall."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(fraction * self.count + 0.999999))
+        seen = 0
+        for index, bucket in enumerate(self._counts):
+            seen += bucket
+            if seen >= rank:
+                value = min(max(self._midpoint(index), self._min), self._max)
+                return value / 1000
+        return self._max / 1000
+    
+    def summary(self) -> Dict[str, float]:
+        """Summarize the histogram in milliseconds."""
+        if self.count == 0:
+            return {"avg": 0.0, "min": 0.0, "max": 0.0, "median": 0.0,
+                    "p50": 0.0, "p95": 0.0, "p99": 0.0, "p999": 0.0, "count": 0}
+        result = {
+            "avg": self._sum / self.count / 1000,
+            "min": self._min / 1000,
+            "max": self._max / 1000,
+            "count": self.count
+        }
+        for name, fraction in self.PERCENTILES:
+            result[name] = self.percentile(fraction)
+        result["median"] = result["p50"]
+        return result
+
 class CacheMetrics:
     """Collects and manages cache performance metrics."""
     
@@ -16,6 +90,23 @@ class CacheMetrics:
         self.total_size: int = 0
         self.entry_count: int = 0
         
+        # Single-flight metrics
+        self.coalesced_count: int = 0
+        self.coalesce_timeouts: int = 0
+        
+        # Background refresh metrics
+        self.refresh_count: int = 0
+        self.refresh_failures: int = 0
+        self._refresh_latency = LatencyHistogram()
+        
+        # Compression metrics
+        self.compressed_entries: int = 0
+        self.compression_bytes_in: int = 0
+        self.compression_bytes_out: int = 0
+        self._compression_ratio_sum: float = 0.0
+        self._compress_cpu = LatencyHistogram()
+        self._decompress_cpu = LatencyHistogram()
+        
         # Privacy metrics
         self.privacy_violations: int = 0
         self.sanitization_count: int = 0
@@ -26,21 +117,57 @@ class CacheMetrics:
         self.cleaned_entries: int = 0
         self.cleaned_size: int = 0
         
-        # Response time tracking
-        self._response_times: List[float] = []
-        self._max_response_times: int = 1000  # Keep last 1000 times
+        # Response time histograms, overall and per key prefix
+        self._response_times = LatencyHistogram()
+        self._prefix_times: Dict[str, LatencyHistogram] = {}
+        self._max_prefixes: int = 64  # Further prefixes are grouped under "other"
     
-    def record_hit(self, response_time_ms: float) -> None:
+    def record_hit(self, response_time_ms: float, prefix: Optional[str] = None) -> None:
         """Record a cache hit with response time."""
         with self._lock:
             self.hit_count += 1
-            self._record_response_time(response_time_ms)
+            self._record_response_time(response_time_ms, prefix)
     
-    def record_miss(self, response_time_ms: float) -> None:
+    def record_miss(self, response_time_ms: float, prefix: Optional[str] = None) -> None:
         """Record a cache miss with response time."""
         with self._lock:
             self.miss_count += 1
-            self._record_response_time(response_time_ms)
+            self._record_response_time(response_time_ms, prefix)
+    
+    def record_coalesced(self) -> None:
+        """Record a caller that awaited an in-flight computation instead of recomputing."""
+        with self._lock:
+            self.coalesced_count += 1
+    
+    def record_coalesce_timeout(self) -> None:
+        """Record a coalesced caller that gave up waiting and recomputed."""
+        with self._lock:
+            self.coalesce_timeouts += 1
+    
+    def record_refresh(self, latency_ms: float) -> None:
+        """Record a completed background refresh with its latency."""
+        with self._lock:
+            self.refresh_count += 1
+            self._refresh_latency.record(latency_ms)
+    
+    def record_refresh_failure(self) -> None:
+        """Record a background refresh that raised."""
+        with self._lock:
+            self.refresh_failures += 1
+    
+    def record_compression(self, original_bytes: int, stored_bytes: int, cpu_ms: float) -> None:
+        """Record one compressed entry with its sizes and compression CPU time."""
+        with self._lock:
+            self.compressed_entries += 1
+            self.compression_bytes_in += original_bytes
+            self.compression_bytes_out += stored_bytes
+            self._compression_ratio_sum += stored_bytes / original_bytes if original_bytes else 1.0
+            self._compress_cpu.record(cpu_ms)
+    
+    def record_decompression(self, cpu_ms: float) -> None:
+        """Record CPU time spent decompressing an entry on read."""
+        with self._lock:
+            self._decompress_cpu.record(cpu_ms)
     
     def record_cleanup(self, cleaned_entries: int, cleaned_size: int) -> None:
         """Record cache cleanup operation."""
@@ -62,11 +189,19 @@ class CacheMetrics:
         with self._lock:
             self.sanitization_count += 1
     
-    def _record_response_time(self, response_time_ms: float) -> None:
-        """Record response time with rolling window."""
-        self._response_times.append(response_time_ms)
-        if len(self._response_times) > self._max_response_times:
-            self._response_times.pop(0)
+    def _record_response_time(self, response_time_ms: float, prefix: Optional[str]) -> None:
+        """Record response time in the overall and per-prefix histograms."""
+        self._response_times.record(response_time_ms)
+        if prefix is None:
+            return
+        histogram = self._prefix_times.get(prefix)
+        if histogram is None:
+            if len(self._prefix_times) >= self._max_prefixes:
+                prefix = "other"
+                histogram = self._prefix_times.get(prefix)
+            if histogram is None:
+                histogram = self._prefix_times[prefix] = LatencyHistogram()
+        histogram.record(response_time_ms)
     
     @property
     def hit_ratio(self) -> float:
@@ -77,18 +212,42 @@ class CacheMetrics:
     @property
     def storage_utilization(self) -> float:
         """Calculate storage utilization ratio."""
-        return self.total_size / settings.MAX_CACHE_SIZE if settings.MAX_CACHE_SIZE > 0 else 0.0
+        if settings.MAX_CACHE_SIZE <= 0:
+            return 0.0
+        # Capped at 1.0: eviction runs after the write that crosses the quota
+        return min(self.total_size / settings.MAX_CACHE_SIZE, 1.0)
     
     def get_response_times(self) -> Dict[str, float]:
         """Get response time statistics."""
-        if not self._response_times:
-            return {"avg": 0.0, "min": 0.0, "max": 0.0, "median": 0.0}
-        
+        with self._lock:
+            return self._response_times.summary()
+    
+    def get_prefix_response_times(self) -> Dict[str, Dict[str, float]]:
+        """Get response time statistics per cache key prefix."""
+        with self._lock:
+            return {prefix: histogram.summary() for prefix, histogram in self._prefix_times.items()}
+    
+    def get_compression_stats(self) -> Dict[str, any]:
+        """Get compression statistics; ratios are stored bytes over original bytes."""
+        with self._lock:
+            entries = self.compressed_entries
+            return {
+                "entries": entries,
+                "bytes_in": self.compression_bytes_in,
+                "bytes_out": self.compression_bytes_out,
+                "overall_ratio": (self.compression_bytes_out / self.compression_bytes_in
+                                  if self.compression_bytes_in else 1.0),
+                "mean_entry_ratio": self._compression_ratio_sum / entries if entries else 1.0,
+                "compress_cpu": self._compress_cpu.summary(),
+                "decompress_cpu": self._decompress_cpu.summary()
+            }
+    
+    def get_refresh_stats(self) -> Dict[str, any]:
+        """Get background refresh statistics."""
         return {
-            "avg": statistics.mean(self._response_times),
-            "min": min(self._response_times),
-            "max": max(self._response_times),
-            "median": statistics.median(self._response_times)
+            "count": self.refresh_count,
+            "failures": self.refresh_failures,
+            "latency": self._refresh_latency.summary()
         }
     
     def get_sanitization_rate(self) -> float:
@@ -111,7 +270,10 @@ class CacheMetrics:
             "performance": {
                 "hit_ratio": self.hit_ratio,
                 "response_times": self.get_response_times(),
-                "entry_count": self.entry_count
+                "prefixes": self.get_prefix_response_times(),
+                "entry_count": self.entry_count,
+                "coalesced_requests": self.coalesced_count,
+                "coalesce_timeouts": self.coalesce_timeouts
             },
             "privacy": {
                 "sanitization_rate": self.get_sanitization_rate(),
@@ -122,5 +284,251 @@ class CacheMetrics:
                 "total_size": self.total_size,
                 "utilization": self.storage_utilization,
                 "cleanup": self.get_cleanup_stats()
+            },
+            "refresh": self.get_refresh_stats(),
+            "compression": self.get_compression_stats()
+        }
+
+
+class RouteStats:
+    """Latency and error statistics of one route template."""
+    
+    __slots__ = ("latency", "errors_4xx", "errors_5xx")
+    
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors_4xx: int = 0
+        self.errors_5xx: int = 0
+
+
+class ApiMetrics:
+    """Request latency, error, concurrency and rate limit metrics.
+    
+    All updates happen on the event loop thread, which serializes them, so
+    no lock is taken on the request path. Routes are keyed by method and
+    path template, which keeps the number of histograms bounded.
+    """
+    
+    UNMATCHED = "unmatched"
+    
+    def __init__(self):
+        self.total_requests: int = 0
+        self.error_counts: Dict[str, int] = {"4xx": 0, "5xx": 0}
+        self.slow_requests: int = 0
+        self.rate_limited: Dict[str, int] = {}
+        self.in_flight: int = 0
+        self.peak_in_flight: int = 0
+        self._response_times = LatencyHistogram()
+        self._routes: Dict[str, RouteStats] = {}
+    
+    def request_started(self) -> None:
+        """Record a request entering the application."""
+        self.in_flight += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+    
+    def request_finished(self, route: str, status_code: int, duration_ms: float, slow: bool = False) -> None:
+        """Record a finished request under its route template."""
+        self.in_flight -= 1
+        self.total_requests += 1
+        self._response_times.record(duration_ms)
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = RouteStats()
+        stats.latency.record(duration_ms)
+        if status_code >= 500:
+            self.error_counts["5xx"] += 1
+            stats.errors_5xx += 1
+        elif status_code >= 400:
+            self.error_counts["4xx"] += 1
+            stats.errors_4xx += 1
+        if slow:
+            self.slow_requests += 1
+    
+    def record_rate_limited(self, route_class: str) -> None:
+        """Record a request rejected by the rate limiter."""
+        self.rate_limited[route_class] = self.rate_limited.get(route_class, 0) + 1
+    
+    def get_response_times(self) -> Dict[str, float]:
+        """Get response time statistics over all routes."""
+        return self._response_times.summary()
+    
+    def get_route_stats(self) -> Dict[str, Dict[str, any]]:
+        """Get latency and error statistics per route template."""
+        return {
+            route: {
+                "response_times": stats.latency.summary(),
+                "errors": {"4xx": stats.errors_4xx, "5xx": stats.errors_5xx}
+            }
+            for route, stats in list(self._routes.items())
+        }
+
+
+# Process-wide API metrics fed by PerformanceMiddleware
+api_metrics = ApiMetrics()
+
+
+class WriteQueueMetrics:
+    """Depth, batching and commit latency of the database write queue.
+    
+    Updated on the event loop thread only, like ``ApiMetrics``. Batch sizes
+    are bounded by ``DB_WRITE_MAX_BATCH``, so their distribution is kept as
+    exact counts per size.
+    """
+    
+    def __init__(self):
+        self.depth: int = 0
+        self.peak_depth: int = 0
+        self.batches: int = 0
+        self.transactions: int = 0
+        self.failed_transactions: int = 0
+        self.failed_commits: int = 0
+        self._batch_sizes: Dict[int, int] = {}
+        self._commit_times = LatencyHistogram()
+    
+    def job_enqueued(self) -> None:
+        """Record a write transaction waiting for the writer."""
+        self.depth += 1
+        if self.depth > self.peak_depth:
+            self.peak_depth = self.depth
+    
+    def jobs_dequeued(self, count: int) -> None:
+        """Record write transactions taken by the writer."""
+        self.depth -= count
+    
+    def record_batch(self, size: int, commit_ms: float) -> None:
+        """Record a group commit of ``size`` transactions."""
+        self.batches += 1
+        self.transactions += size
+        self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+        self._commit_times.record(commit_ms)
+    
+    def record_failed_transaction(self) -> None:
+        """Record a transaction rolled back to its savepoint."""
+        self.failed_transactions += 1
+    
+    def record_failed_commit(self, size: int) -> None:
+        """Record a group commit that failed for all of its transactions."""
+        self.failed_commits += 1
+        self.failed_transactions += size
+    
+    def to_dict(self) -> Dict:
+        """Summarize the write queue metrics."""
+        return {
+            "depth": self.depth,
+            "peak_depth": self.peak_depth,
+            "batches": self.batches,
+            "transactions": self.transactions,
+            "failed_transactions": self.failed_transactions,
+            "failed_commits": self.failed_commits,
+            "avg_batch_size": round(self.transactions / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": max(self._batch_sizes, default=0),
+            "batch_sizes": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            "commit_times": self._commit_times.summary()
+        }
+
+
+# Process-wide write queue metrics fed by app.db.writer
+write_queue_metrics = WriteQueueMetrics()
+
+
+class RouteQueryStats:
+    """Statement statistics of one route template."""
+    
+    __slots__ = ("requests", "statements", "max_statements", "db_time", "n_plus_one_requests", "n_plus_one")
+    
+    def __init__(self):
+        self.requests: int = 0
+        self.statements: int = 0
+        self.max_statements: int = 0
+        self.db_time = LatencyHistogram()
+        self.n_plus_one_requests: int = 0
+        self.n_plus_one: Dict[str, int] = {}  # fingerprint -> requests it repeated in
+
+
+class QueryMetrics:
+    """Statements and database time per request, with N+1 detections.
+    
+    Fed once per request by ``PerformanceMiddleware`` on the event loop
+    thread, so no lock is taken. Fingerprints are bounded: statements first
+    seen after ``MAX_FINGERPRINTS`` distinct ones are not tracked
+    individually, and each route keeps ``MAX_ROUTE_N_PLUS_ONE`` N+1
+    fingerprints.
+    """
+    
+    MAX_FINGERPRINTS = 500
+    MAX_ROUTE_N_PLUS_ONE = 10
+    
+    def __init__(self):
+        self.requests: int = 0
+        self.statements: int = 0
+        self.n_plus_one_requests: int = 0
+        self._db_time = LatencyHistogram()
+        self._routes: Dict[str, RouteQueryStats] = {}
+        # fingerprint -> [executions, total milliseconds]
+        self._fingerprints: Dict[str, List[float]] = {}
+    
+    def record_request(self, route: str, statements: int, db_time_ms: float,
+                       fingerprints: Dict[str, List[float]], n_plus_one: Dict[str, int]) -> None:
+        """Record the statements one request executed."""
+        self.requests += 1
+        self.statements += statements
+        self._db_time.record(db_time_ms)
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = RouteQueryStats()
+        stats.requests += 1
+        stats.statements += statements
+        stats.max_statements = max(stats.max_statements, statements)
+        stats.db_time.record(db_time_ms)
+        if n_plus_one:
+            self.n_plus_one_requests += 1
+            stats.n_plus_one_requests += 1
+            for statement in n_plus_one:
+                if statement in stats.n_plus_one or len(stats.n_plus_one) < self.MAX_ROUTE_N_PLUS_ONE:
+                    stats.n_plus_one[statement] = stats.n_plus_one.get(statement, 0) + 1
+        for statement, (count, total_ms) in fingerprints.items():
+            entry = self._fingerprints.get(statement)
+            if entry is not None:
+                entry[0] += count
+                entry[1] += total_ms
+            elif len(self._fingerprints) < self.MAX_FINGERPRINTS:
+                self._fingerprints[statement] = [count, total_ms]
+    
+    def get_route_stats(self) -> Dict[str, Dict[str, any]]:
+        """Get statement statistics per route template."""
+        return {
+            route: {
+                "requests": stats.requests,
+                "avg_statements": round(stats.statements / stats.requests, 2),
+                "max_statements": stats.max_statements,
+                "db_time": stats.db_time.summary(),
+                "n_plus_one_requests": stats.n_plus_one_requests,
+                "n_plus_one": dict(stats.n_plus_one)
             }
-        } 
\ No newline at end of file
+            for route, stats in list(self._routes.items())
+        }
+    
+    def get_top_statements(self, limit: int = 10) -> List[Dict[str, any]]:
+        """Get the fingerprints with the most total database time."""
+        top = sorted(self._fingerprints.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"statement": statement, "executions": int(count), "total_ms": round(total_ms, 3)}
+            for statement, (count, total_ms) in top
+        ]
+    
+    def to_dict(self) -> Dict:
+        """Summarize the query metrics."""
+        return {
+            "requests": self.requests,
+            "statements": self.statements,
+            "avg_statements": round(self.statements / self.requests, 2) if self.requests else 0.0,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "db_time": self._db_time.summary(),
+            "routes": self.get_route_stats(),
+            "top_statements": self.get_top_statements()
+        }
+
+
+# Process-wide query metrics fed by PerformanceMiddleware
+query_metrics = QueryMetrics()
@@ -0,0 +1,128 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered by a sort key and the primary key, and the next page is
+selected with ``(sort_key, id) > (last_sort_key, last_id)`` instead of
+``OFFSET``, so every page costs an index seek however deep it is, and
+rows inserted or deleted meanwhile do not shift later pages.
+
+Cursors are opaque URL-safe tokens holding the sort name and the last
+row's ``(sort_key, id)``. A cursor is only valid for the sort it was
+issued for; anything else is rejected with 400.
+
+Totals are counted once per filter and kept in the cache, tagged with the
+table, until a commit touches the table or ``PAGINATION_COUNT_TTL``
+expires, so paging through a list does not run ``COUNT(*)`` per request.
+Writes that bypass the ORM are reflected after the TTL; the total is an
+estimate in that window.
+"""
+import base64
+import binascii
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, TypeVar
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import ColumnElement, tuple_
+
+from app.core.cache import LocalCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Page(Generic[T]):
+    """One page of a list, the cursor of the next page and the total."""
+
+    __slots__ = ("items", "next_cursor", "total")
+
+    def __init__(self, items: List[T], next_cursor: Optional[str], total: int):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Opaque cursor for the row with the given ``(sort_key, id)`` values."""
+    payload = json.dumps({"s": sort, "v": list(values)}, default=_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str, columns: Sequence[Any]) -> List[Any]:
+    """Values of a cursor issued for ``sort``, typed like ``columns``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or from another sort.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort or len(payload["v"]) != len(columns):
+            raise ValueError("cursor does not match the sort order")
+        return [_coerce(column, value) for column, value in zip(columns, payload["v"])]
+    except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _coerce(column: Any, value: Any) -> Any:
+    python_type = column.type.python_type
+    if value is None:
+        raise ValueError("cursor values cannot be null")
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if type(value) is not python_type:
+        raise ValueError(f"expected {python_type.__name__}")
+    return value
+
+
+def after(columns: Sequence[Any], values: Sequence[Any], descending: bool) -> ColumnElement:
+    """Rows after ``values`` in ``(sort_key, id)`` order."""
+    if descending:
+        return tuple_(*columns) < tuple(values)
+    return tuple_(*columns) > tuple(values)
+
+
+def count_key(database: Optional[str], table: str, filters: Dict[str, Any]) -> str:
+    """Cache key of the total of a table of a database under equality filters."""
+    parts = "&".join(f"{name}={value}" for name, value in sorted(filters.items()))
+    return f"count:{database}:{table}:{parts}"
+
+
+def cached_count(key: str) -> Optional[int]:
+    """A stored total, or None on a miss."""
+    try:
+        return LocalCache.get_instance().get(key, prefix="count")
+    except Exception as e:
+        logger.warning(f"Count cache read failed: {str(e)}")
+        return None
+
+
+def store_count(key: str, table: str, total: int) -> None:
+    """Keep a total until the table changes or the TTL expires."""
+    try:
+        LocalCache.get_instance().set(key, total, expire=settings.PAGINATION_COUNT_TTL, tags=[f"table:{table}"])
+    except Exception as e:
+        logger.warning(f"Count cache write failed: {str(e)}")
+
+
+def set_page_headers(response: Response, request: Request, page: Page) -> None:
+    """Report the total and the next page in response headers.
+
+    The body stays a plain list; ``X-Total-Count`` holds the total,
+    ``X-Next-Cursor`` and a ``Link: rel="next"`` URL the next page.
+    """
+    response.headers["X-Total-Count"] = str(page.total)
+    if page.next_cursor is None:
+        return
+    response.headers["X-Next-Cursor"] = page.next_cursor
+    params = [(name, value) for name, value in request.query_params.multi_items() if name not in ("cursor", "skip")]
+    params.append(("cursor", page.next_cursor))
+    response.headers["Link"] = f'<{request.url.path}?{urlencode(params)}>; rel="next"'
@@ -0,0 +1,70 @@
+"""Write-driven cache invalidation.
+
+Changes flushed through any ORM session are collected as cache tags and the
+matching cache entries are invalidated once the transaction commits. Rolled
+back changes invalidate nothing.
+
+Tags have two forms: ``table:<table>`` for any change to a table and
+``<table>:<id>`` for a change to a single row. Endpoints declare the tags they
+depend on via ``cache_response(tags=[...])``.
+"""
+import logging
+from itertools import chain
+from typing import Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.cache import invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+_PENDING_TAGS = "cache_tags"
+
+
+def _pending(session: Session) -> Set[str]:
+    return session.info.setdefault(_PENDING_TAGS, set())
+
+
+@event.listens_for(Session, "after_flush")
+def collect_flushed_tags(session: Session, flush_context) -> None:
+    """Record tags for every row inserted, updated or deleted by a flush."""
+    tags = _pending(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table is None:
+            continue
+        tags.add(f"table:{table}")
+        identity = inspect(obj).identity
+        if identity:
+            tags.add(f"{table}:{':'.join(str(part) for part in identity)}")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def collect_bulk_tags(orm_execute_state: ORMExecuteState) -> None:
+    """Record table tags for ORM-enabled bulk insert, update and delete statements."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        _pending(orm_execute_state.session).add(f"table:{mapper.local_table.name}")
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_tags(session: Session) -> None:
+    """Invalidate cache entries depending on the committed changes."""
+    tags = session.info.pop(_PENDING_TAGS, None)
+    if not tags:
+        return
+    try:
+        removed = invalidate_tags(tags)
+        logger.debug(f"Invalidated {removed} cache entries for {len(tags)} tags")
+    except Exception as e:
+        # A cache failure must never fail a committed write
+        logger.error(f"Cache invalidation failed: {str(e)}")
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_rolled_back_tags(session: Session) -> None:
+    """Forget tags collected for a transaction that was rolled back."""
+    session.info.pop(_PENDING_TAGS, None)
@@ -1,7 +1,13 @@
+from typing import AsyncIterator
+
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
+from app.db import cache_events  # noqa: F401  Registers write-driven cache invalidation
+from app.db.instrumentation import instrument_engine
+from app.db.pragmas import configure_sqlite
 
 # Create the SQLAlchemy engine with optimized settings
 engine = create_engine(
@@ -14,15 +20,54 @@ engine = create_engine(
     echo=settings.DB_ECHO
 )
 
-# Enable SQLite optimizations
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging
-    cursor.execute("PRAGMA synchronous=NORMAL")  # Faster writes with reasonable safety
-    cursor.execute("PRAGMA cache_size=-2000")  # 2MB cache
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
+# Read-only WAL connections for async routes; readers never take the write
+# lock, so they run concurrently with the writer
+read_engine = create_async_engine(
+    settings.ASYNC_READ_ONLY_DATABASE_URL,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=0,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    echo=settings.DB_ECHO
+)
+
+# The single connection behind the write queue (see app.db.writer)
+writer_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    echo=settings.DB_ECHO
+)
+
+# Apply the SQLite pragma profile to every connection
+configure_sqlite(engine)
+configure_sqlite(writer_engine.sync_engine)
+configure_sqlite(read_engine.sync_engine, read_only=True)
+
+# Attribute statements and database time to the current request
+for target in (engine, writer_engine.sync_engine, read_engine.sync_engine):
+    instrument_engine(target)
+
+def use_immediate_transactions(target: AsyncEngine) -> None:
+    """Begin transactions with BEGIN IMMEDIATE and keep SAVEPOINTs working.
+
+    The sqlite3 driver's own transaction handling breaks SAVEPOINT, so it
+    is turned off and SQLAlchemy emits BEGIN. IMMEDIATE takes the write
+    lock up front instead of failing to upgrade a read lock mid-batch.
+    """
+    @event.listens_for(target.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(target.sync_engine, "begin")
+    def begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+use_immediate_transactions(writer_engine)
 
 # Create a SessionLocal class with optimized settings
 SessionLocal = sessionmaker(
@@ -32,6 +77,18 @@ SessionLocal = sessionmaker(
     expire_on_commit=False  # Prevent detached instance errors
 )
 
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+WriterSessionLocal = async_sessionmaker(
+    bind=writer_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create a Base class using the new style
 class Base(DeclarativeBase):
     pass
@@ -43,3 +100,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get a read-only async DB session
+async def get_read_db() -> AsyncIterator[AsyncSession]:
+    async with ReadSessionLocal() as db:
+        yield db
+
+# Dependency to get the read-only async engine, for streamed responses that
+# outlive the request's dependencies and open their own connection
+def get_read_engine() -> AsyncEngine:
+    return read_engine
+
+async def dispose_async_engines() -> None:
+    """Close pooled connections of the async engines."""
+    for target in (read_engine, writer_engine):
+        await target.dispose()
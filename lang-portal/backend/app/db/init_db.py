@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.db.base_class import Base
+from app.db.pragmas import configure_sqlite
 
 # Import all models to ensure they are registered with SQLAlchemy
 from app.models.language import Language
@@ -14,14 +15,7 @@ from app.models.progress import VocabularyProgress
 def init_db(db_url: str = settings.DATABASE_URL):
     """Initialize the database connection."""
     engine = create_engine(db_url)
-    
-    # Enable foreign key support for SQLite
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
-    
+    configure_sqlite(engine)
     return engine
 
 if __name__ == "__main__":
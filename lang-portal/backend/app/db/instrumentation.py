@@ -0,0 +1,116 @@
+"""SQL statement instrumentation attributed to the current request.
+
+``instrument_engine`` times every cursor execution of an engine. While a
+request is tracked (``PerformanceMiddleware`` wraps each request in
+``track_queries``), the statement count, database time and a fingerprint
+of each statement are added to that request's ``QueryStats``. Sync routes
+run in worker threads and async sessions run inside the request's task;
+both see the request's context, so attribution needs no session plumbing.
+
+Fingerprints replace literals and collapse ``IN`` lists, so the same query
+with different values counts as one statement, and no values from the
+database end up in metrics or logs. A fingerprint repeated
+``DB_N_PLUS_ONE_THRESHOLD`` times within one request is reported as N+1:
+one query per row of an earlier result, usually a lazy load in a loop.
+"""
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_START_TIMES = "query_start_times"
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so executions differing only in values match."""
+    normalized = _STRING.sub("?", statement)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    __slots__ = ("statements", "db_time_ms", "fingerprints")
+
+    def __init__(self):
+        self.statements: int = 0
+        self.db_time_ms: float = 0.0
+        # fingerprint -> [executions, total milliseconds]
+        self.fingerprints: Dict[str, List[float]] = {}
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        """Record one executed statement."""
+        self.statements += 1
+        self.db_time_ms += duration_ms
+        key = fingerprint(statement)
+        entry = self.fingerprints.get(key)
+        if entry is None:
+            self.fingerprints[key] = [1, duration_ms]
+        else:
+            entry[0] += 1
+            entry[1] += duration_ms
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Fingerprints executed at least ``threshold`` times."""
+        return {
+            statement: int(entry[0])
+            for statement, entry in self.fingerprints.items()
+            if entry[0] >= threshold
+        }
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request being handled, or None outside a tracked request."""
+    return _current.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Attribute statements executed in this context to a new ``QueryStats``."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time the statements of an engine. Pass ``engine.sync_engine`` for async engines."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault(_START_TIMES, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        _finish(conn, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def record_failed_statement(exception_context):
+        if exception_context.connection is not None and exception_context.statement is not None:
+            _finish(exception_context.connection, exception_context.statement)
+
+
+def _finish(conn, statement: str) -> None:
+    stats = _current.get()
+    starts = conn.info.get(_START_TIMES)
+    if stats is None or not starts:
+        return
+    stats.record(statement, (time.perf_counter() - starts.pop()) * 1000)
@@ -0,0 +1,95 @@
+"""SQLite connection pragmas, applied from one place.
+
+Every engine on the SQLite database registers ``configure_sqlite``, which
+applies the pragma profile named by ``SQLITE_PROFILE`` (see
+``SQLITE_PROFILES`` in settings) to each new connection and runs
+``PRAGMA optimize`` when the connection is closed, so the query planner's
+statistics stay current without a scheduled ANALYZE.
+
+Usage::
+
+    engine = create_engine(settings.DATABASE_URL)
+    configure_sqlite(engine)
+    configure_sqlite(read_engine.sync_engine, read_only=True)
+"""
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pragmas a profile may set, in the order they are applied
+PROFILE_PRAGMAS = (
+    "busy_timeout", "journal_mode", "synchronous", "cache_size",
+    "mmap_size", "temp_store", "wal_autocheckpoint",
+)
+
+# Pragmas that change the database file; read-only connections skip them
+WRITE_PRAGMAS = {"journal_mode", "wal_autocheckpoint"}
+
+_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+
+def sqlite_pragmas(profile: Optional[str] = None, read_only: bool = False) -> Dict[str, Any]:
+    """Pragmas of a profile, in the order they are applied."""
+    name = profile or settings.SQLITE_PROFILE
+    if name not in settings.SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: {name}")
+    values = settings.SQLITE_PROFILES[name]
+
+    pragmas: Dict[str, Any] = {}
+    for pragma, value in values.items():
+        if pragma not in PROFILE_PRAGMAS:
+            raise ValueError(f"Unsupported pragma in SQLite profile {name}: {pragma}")
+        if not _VALUE.match(str(value)):
+            raise ValueError(f"Invalid value for PRAGMA {pragma} in SQLite profile {name}: {value}")
+    for pragma in PROFILE_PRAGMAS:
+        if pragma in values and not (read_only and pragma in WRITE_PRAGMAS):
+            pragmas[pragma] = values[pragma]
+
+    pragmas["foreign_keys"] = "ON"
+    if read_only:
+        pragmas["query_only"] = "ON"  # Reject writes even if the file is writable
+    return pragmas
+
+
+def apply_pragmas(dbapi_connection, pragmas: Dict[str, Any]) -> None:
+    """Set pragmas on a DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+
+def configure_sqlite(engine: Engine, profile: Optional[str] = None, read_only: bool = False) -> None:
+    """Apply a pragma profile to every connection of an engine.
+
+    Pass ``engine.sync_engine`` for async engines. The profile is resolved
+    once, so an unknown profile fails at startup rather than on connect.
+    """
+    pragmas = sqlite_pragmas(profile, read_only)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+    # ANALYZE writes to the database, which read-only connections cannot
+    if read_only or not settings.SQLITE_OPTIMIZE_ON_CLOSE:
+        return
+
+    @event.listens_for(engine, "close")
+    def optimize_on_close(dbapi_connection, connection_record):
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA optimize")
+            cursor.close()
+        except Exception as e:
+            # Closing must not fail because the planner statistics could not be updated
+            logger.debug(f"PRAGMA optimize failed: {str(e)}")
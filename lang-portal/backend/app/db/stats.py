@@ -0,0 +1,210 @@
+"""Database size, usage and connection pool metrics sampled in the background.
+
+``DatabaseStatsCollector`` runs the dialect's statistics queries on a
+daemon thread every ``DB_METRICS_INTERVAL`` seconds and keeps the latest
+snapshot, so ``/metrics/database`` never counts rows or walks pages while
+a request waits. Pool checkout counters are kept by pool events and read
+live; they cost no query.
+
+SQLite reports file size (``page_count * page_size``), free pages, the WAL
+file size and per-table sizes from the ``dbstat`` virtual table when the
+library is built with it. PostgreSQL reports the database size, active
+backends, the buffer cache hit ratio and per-table relation sizes.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, UTC
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import Pool
+
+from app.core.config import settings
+from app.db.database import engine, read_engine, writer_engine
+
+logger = logging.getLogger(__name__)
+
+# Row counts reported under "tables"
+COUNTED_TABLES = {"activities": "activities", "vocabularies": "vocabularies", "attempts": "session_attempts"}
+
+
+class PoolStats:
+    """Checkout counters of one connection pool, fed by pool events."""
+
+    __slots__ = ("pool", "checkouts", "checked_out", "peak_checked_out", "_lock")
+
+    def __init__(self, pool: Pool):
+        self.pool = pool
+        self.checkouts: int = 0
+        self.checked_out: int = 0
+        self.peak_checked_out: int = 0
+        # Sync routes check out connections from worker threads
+        self._lock = threading.Lock()
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            if self.checked_out > self.peak_checked_out:
+                self.peak_checked_out = self.checked_out
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        size = getattr(self.pool, "size", None)
+        overflow = getattr(self.pool, "overflow", None)
+        return {
+            "size": size() if callable(size) else None,
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "overflow": max(0, overflow()) if callable(overflow) else None,
+            "checkouts": self.checkouts,
+        }
+
+
+def _sqlite_stats(conn: Connection, database: Optional[str]) -> Dict[str, Any]:
+    page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+    page_count = conn.exec_driver_sql("PRAGMA page_count").scalar()
+    freelist_count = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+    wal_bytes = 0
+    if database and database != ":memory:" and os.path.exists(f"{database}-wal"):
+        wal_bytes = os.path.getsize(f"{database}-wal")
+
+    try:
+        table_bytes = {
+            name: int(size)
+            for name, size in conn.exec_driver_sql("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+        }
+    except OperationalError:
+        # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+        table_bytes = {}
+
+    return {
+        "size": {
+            "total_bytes": page_count * page_size,
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_count": freelist_count,
+            "free_bytes": freelist_count * page_size,
+            "wal_bytes": wal_bytes,
+            "tables": table_bytes,
+        },
+        "performance": {"cache_hit_ratio": None},
+    }
+
+
+def _postgresql_stats(conn: Connection, database: Optional[str]) -> Dict[str, Any]:
+    total_bytes = conn.execute(text("SELECT pg_database_size(current_database())")).scalar()
+    active_connections = conn.execute(text(
+        "SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database()"
+    )).scalar()
+    cache_hit_ratio = conn.execute(text(
+        "SELECT sum(heap_blks_hit) / NULLIF(sum(heap_blks_hit) + sum(heap_blks_read), 0) FROM pg_statio_user_tables"
+    )).scalar()
+    table_bytes = {
+        name: int(size)
+        for name, size in conn.execute(text(
+            "SELECT relname, pg_total_relation_size(relid) FROM pg_statio_user_tables"
+        ))
+    }
+    return {
+        "size": {"total_bytes": total_bytes, "tables": table_bytes},
+        "performance": {
+            "server_connections": active_connections,
+            "cache_hit_ratio": float(cache_hit_ratio) if cache_hit_ratio is not None else None,
+        },
+    }
+
+
+DIALECT_STATS = {
+    "sqlite": _sqlite_stats,
+    "postgresql": _postgresql_stats,
+}
+
+
+class DatabaseStatsCollector:
+    """Samples database metrics on a background thread and caches the latest result."""
+
+    def __init__(self, engine: Engine, pools: Optional[Dict[str, Pool]] = None, interval: Optional[float] = None):
+        self.engine = engine
+        self.interval = settings.DB_METRICS_INTERVAL if interval is None else interval
+        self.pools = {name: PoolStats(pool) for name, pool in (pools or {"default": engine.pool}).items()}
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> Dict[str, Any]:
+        """Run the statistics queries now and store the result."""
+        dialect = self.engine.dialect.name
+        collect = DIALECT_STATS.get(dialect)
+        if collect is None:
+            raise ValueError(f"No database metrics for dialect: {dialect}")
+
+        start = time.perf_counter()
+        with self.engine.connect() as conn:
+            counts = {
+                name: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                for name, table in COUNTED_TABLES.items()
+            }
+            stats = collect(conn, self.engine.url.database)
+        stats["size"]["total_mb"] = round(stats["size"]["total_bytes"] / (1024 * 1024), 2)
+
+        self._snapshot = {
+            "dialect": dialect,
+            "tables": counts,
+            **stats,
+            "sampled_at": datetime.now(UTC).isoformat(),
+            "sample_duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        return self._snapshot
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest sample with live pool counters, or None before the first sample."""
+        if self._snapshot is None:
+            return None
+        pools = {name: stats.to_dict() for name, stats in self.pools.items()}
+        performance = {
+            **self._snapshot["performance"],
+            "active_connections": sum(pool["checked_out"] for pool in pools.values()),
+        }
+        return {**self._snapshot, "performance": performance, "pools": pools}
+
+    def start(self) -> None:
+        """Start sampling in the background; the first sample is taken right away."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="db-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _sample_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Database metrics sampling failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+
+# Samples the application database; reports the pools of all its engines
+database_stats = DatabaseStatsCollector(engine, pools={
+    "sync": engine.pool,
+    "read": read_engine.pool,
+    "writer": writer_engine.pool,
+})
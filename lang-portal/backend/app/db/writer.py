@@ -0,0 +1,157 @@
+"""Single-writer queue with group commit.
+
+SQLite allows one writer at a time. Instead of letting every request take
+a pooled connection and contend for the write lock, async routes submit
+write transactions to one queue drained by a single task on one dedicated
+connection. The task takes every transaction queued up (up to
+``DB_WRITE_MAX_BATCH``), runs each inside its own SAVEPOINT and commits
+them together, so a burst of writes costs one commit and one WAL sync
+instead of one per request. A failing transaction rolls back to its
+savepoint and only its submitter sees the error.
+
+Usage::
+
+    async def add_attempt(db: AsyncSession) -> SessionAttempt:
+        db.add(attempt)
+        await db.flush()
+        return attempt
+
+    attempt = await writes.submit(add_attempt)
+
+A transaction must not commit or roll back the session itself. Its result
+is returned once the batch it belongs to has committed.
+
+Only async routes go through the queue. Sync routes (``get_db``) still
+commit on their own pooled connections, outside the single writer, and
+wait for the write lock through SQLite's busy timeout.
+"""
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import WriteQueueMetrics, write_queue_metrics
+
+logger = logging.getLogger(__name__)
+
+WriteJob = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class WriteQueue:
+    """Queue of write transactions group-committed by a single writer task."""
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        max_batch: Optional[int] = None,
+        batch_window_ms: Optional[float] = None,
+        max_size: Optional[int] = None,
+        metrics: Optional[WriteQueueMetrics] = None,
+    ):
+        if session_factory is None:
+            from app.db.database import WriterSessionLocal
+            session_factory = WriterSessionLocal
+        self.session_factory = session_factory
+        self.max_batch = settings.DB_WRITE_MAX_BATCH if max_batch is None else max_batch
+        self.batch_window = (settings.DB_WRITE_BATCH_WINDOW_MS if batch_window_ms is None else batch_window_ms) / 1000
+        self.max_size = settings.DB_WRITE_QUEUE_SIZE if max_size is None else max_size
+        self.metrics = write_queue_metrics if metrics is None else metrics
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    def _ensure_writer(self) -> asyncio.Queue:
+        # The writer task belongs to the running loop; a new loop gets a new one
+        loop = asyncio.get_running_loop()
+        if self._writer is None or self._writer.get_loop() is not loop or self._writer.done():
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            # An empty context, so the writer does not inherit the request that started it
+            self._writer = loop.create_task(self._run(self._queue), context=contextvars.Context())
+        return self._queue
+
+    async def submit(self, job: WriteJob) -> Any:
+        """Run a write transaction and return its result once committed."""
+        queue = self._ensure_writer()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((job, future))
+        self.metrics.job_enqueued()
+        return await future
+
+    async def close(self) -> None:
+        """Commit what is queued, then stop the writer task."""
+        writer, queue = self._writer, self._queue
+        if writer is None or writer.done() or writer.get_loop() is not asyncio.get_running_loop():
+            return
+        await queue.put(None)
+        await writer
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self.metrics.jobs_dequeued(len(batch))
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                # Never let the writer die; submitters were already failed
+                logger.error(f"Write batch failed: {str(e)}")
+            if stop:
+                return
+
+    async def _commit_batch(self, batch: List[Tuple[WriteJob, asyncio.Future]]) -> None:
+        done: List[Tuple[asyncio.Future, Any]] = []
+        async with self.session_factory() as db:
+            for job, future in batch:
+                if future.cancelled():
+                    continue
+                try:
+                    async with db.begin_nested():
+                        result = await job(db)
+                except Exception as e:
+                    self.metrics.record_failed_transaction()
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                done.append((future, result))
+            if not done:
+                await db.rollback()
+                return
+
+            start = time.perf_counter()
+            try:
+                await db.commit()
+            except Exception as e:
+                logger.error(f"Group commit of {len(done)} transactions failed: {str(e)}")
+                self.metrics.record_failed_commit(len(done))
+                for future, _ in done:
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+            self.metrics.record_batch(len(done), (time.perf_counter() - start) * 1000)
+
+        for future, result in done:
+            if not future.done():
+                future.set_result(result)
+
+
+# Process-wide write queue on the dedicated writer connection
+write_queue = WriteQueue()
+
+
+def get_write_queue() -> WriteQueue:
+    """Dependency returning the write queue, overridable in tests."""
+    return write_queue
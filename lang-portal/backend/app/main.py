@@ -4,12 +4,16 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from fastapi.openapi.utils import get_openapi
 from app.api.v1.api import api_router
-from app.middleware.security import SecurityMiddleware
-from app.middleware.privacy import PrivacyMiddleware
-from app.middleware.route_privacy import RoutePrivacyMiddleware
+from app.middleware.pipeline import PrivacyPipelineMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.performance import PerformanceMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
 import os
 from pathlib import Path
 from app.core.config import settings
+from app.db.database import dispose_async_engines
+from app.db.stats import database_stats
+from app.db.writer import write_queue
 
 # Development mode flag
 DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
@@ -30,10 +34,26 @@ def create_app() -> FastAPI:
         """Redirect root endpoint to documentation."""
         return RedirectResponse(url="/docs" if DEV_MODE else "/api/v1")
 
-    # Add security middleware
-    app.add_middleware(SecurityMiddleware)
-    app.add_middleware(PrivacyMiddleware)
-    app.add_middleware(RoutePrivacyMiddleware)
+    @app.on_event("startup")
+    async def start_database_stats():
+        """Sample database metrics in the background."""
+        database_stats.start()
+
+    @app.on_event("shutdown")
+    async def close_database():
+        """Commit queued writes, then close pooled async database connections."""
+        database_stats.stop()
+        await write_queue.close()
+        await dispose_async_engines()
+
+    # Inside the privacy pipeline, so rejected requests never take tokens
+    app.add_middleware(RateLimitMiddleware)
+    # Security, privacy and route rules in a single pass
+    app.add_middleware(PrivacyPipelineMiddleware)
+    # Outside the pipeline, so bodies are sanitized before they are compressed
+    app.add_middleware(CompressionMiddleware)
+    # Outermost, so timings cover the whole stack
+    app.add_middleware(PerformanceMiddleware)
 
     # Include API router
     app.include_router(api_router, prefix="/api/v1")
@@ -0,0 +1,235 @@
+"""Response compression with ``Accept-Encoding`` negotiation.
+
+Bodies of compressible types at or above ``COMPRESSION_MIN_SIZE`` are
+compressed with brotli when the ``brotli`` package is installed and the
+client accepts it, otherwise with gzip. Add this middleware outside the
+privacy pipeline: it must see the sanitized body, never the other way round.
+
+Responses served by ``cache_response`` (marked by ``X-Cache-Status``) repeat
+the same body until the entry is refilled, so their compressed variants are
+kept in a byte-bounded LRU keyed by encoding and body digest. Compression is
+then paid once per cache fill; a hit costs a hash of the body. Keying by
+content means a refilled or invalidated entry can never be served from a
+stale variant.
+"""
+import gzip
+import hashlib
+import logging
+import zlib
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import MemoryLRU
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+
+COMPRESSIBLE_TYPES = (
+    b"application/json", b"application/x-ndjson", b"application/javascript",
+    b"application/xml", b"text/", b"image/svg+xml",
+)
+
+# X-Cache-Status values set by cache_response
+CACHED_STATUSES = {b"HIT", b"STALE", b"MISS", b"COALESCED"}
+
+# Preferred first
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+@lru_cache(maxsize=64)
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the preferred supported encoding an ``Accept-Encoding`` value allows."""
+    qualities = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip()] = quality
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a whole body."""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor for bodies sent in several messages."""
+
+    __slots__ = ("_compressor", "_brotli")
+
+    def __init__(self, encoding: str):
+        self._brotli = encoding == "br"
+        if self._brotli:
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self._brotli:
+            return self._compressor.process(chunk)
+        return self._compressor.compress(chunk)
+
+    def finish(self) -> bytes:
+        if self._brotli:
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Pure-ASGI middleware compressing response bodies."""
+
+    def __init__(self, app: ASGIApp, min_size: Optional[int] = None, variant_budget: Optional[int] = None):
+        self.app = app
+        self.min_size = settings.COMPRESSION_MIN_SIZE if min_size is None else min_size
+        self.variants = MemoryLRU(settings.COMPRESSION_VARIANT_BUDGET if variant_budget is None else variant_budget)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = negotiate_encoding(value.decode("latin-1"))
+                break
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, self._compressing_send(send, encoding))
+
+    def _compressed_variant(self, body: bytes, encoding: str) -> bytes:
+        """Compressed body of a cached response, compressed once per distinct body."""
+        key = f"{encoding}:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+        data = self.variants.get(key)
+        if data is None:
+            data = compress(body, encoding)
+            self.variants.set(key, data, None)
+        return data
+
+    def _compressing_send(self, send: Send, encoding: str) -> Send:
+        start: Optional[Message] = None
+        cached = False
+        stream: Optional[_StreamCompressor] = None
+        passthrough = False
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, cached, stream, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                compressible = message["status"] not in (204, 304)
+                for name, value in message.get("headers", []):
+                    name = name.lower()
+                    if name == b"content-encoding":
+                        compressible = False
+                    elif name == b"content-type":
+                        compressible = compressible and value.startswith(COMPRESSIBLE_TYPES)
+                    elif name == b"x-cache-status":
+                        cached = value in CACHED_STATUSES
+                if not compressible:
+                    passthrough = True
+                    if message["status"] == 304:
+                        message = {**message, "headers": self._weak_etag(message.get("headers", []))}
+                    await send(message)
+                    return
+                # Hold the start message until the body size is known
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                held, start = start, None
+                if not more_body and len(body) < self.min_size:
+                    passthrough = True
+                    await send({**held, "headers": self._weak_etag(held["headers"])})
+                    await send(message)
+                    return
+                headers = self._encoded_headers(held["headers"], encoding)
+                if not more_body:
+                    body = self._compressed_variant(body, encoding) if cached else compress(body, encoding)
+                    headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                    await send({**held, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                # Streamed body: compress chunks as they arrive, without a length
+                stream = _StreamCompressor(encoding)
+                await send({**held, "headers": headers})
+
+            body = stream.compress(body)
+            if not more_body:
+                body += stream.finish()
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        return compressing_send
+
+    @staticmethod
+    def _weak_etag(headers: Headers) -> Headers:
+        """Headers with the ETag weakened, as for every response once an encoding was negotiated.
+
+        Small bodies stay identity encoded and a 304 has no body to judge by, so
+        they get the same weak ETag as the encoded 200 they revalidate.
+        """
+        return [
+            (name, b"W/" + value if name.lower() == b"etag" and not value.startswith(b"W/") else value)
+            for name, value in headers
+        ]
+
+    @staticmethod
+    def _encoded_headers(headers: Headers, encoding: str) -> Headers:
+        """Response headers for the encoded body, without a content-length.
+
+        A strong ETag names the exact bytes of the identity body, so it is
+        weakened for the encoded representation.
+        """
+        result: Headers = []
+        vary = b"Accept-Encoding"
+        for name, value in headers:
+            lower = name.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            if lower == b"vary":
+                if b"accept-encoding" not in value.lower():
+                    vary = value + b", Accept-Encoding"
+                else:
+                    vary = value
+                continue
+            result.append((name, value))
+        result.append((b"content-encoding", encoding.encode("latin-1")))
+        result.append((b"vary", vary))
+        return result
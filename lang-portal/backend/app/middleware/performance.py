@@ -0,0 +1,112 @@
+"""Request timing middleware feeding the API metrics."""
+import logging
+import time
+from contextlib import nullcontext
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import ApiMetrics, QueryMetrics, api_metrics
+from app.core.metrics import query_metrics as default_query_metrics
+from app.db.instrumentation import QueryStats, track_queries
+
+logger = logging.getLogger(__name__)
+
+
+class PerformanceMiddleware:
+    """Pure-ASGI middleware timing requests per route template.
+
+    Adds ``X-Process-Time-Ms`` (time until the response headers are sent)
+    to every response, records latency, status and concurrency in
+    ``ApiMetrics`` and logs requests slower than ``slow_threshold_ms``.
+    Add it last so it wraps the other middleware and its header is not
+    rewritten by them.
+
+    SQL statements executed while handling a request are tracked with
+    ``track_queries``: their count and time go into ``QueryMetrics`` and a
+    ``Server-Timing`` header, and statements repeated ``n_plus_one_threshold``
+    times are logged as a likely N+1. Statements running after the headers
+    are sent (streamed bodies) reach the metrics but not the header.
+    """
+
+    def __init__(self, app: ASGIApp, slow_threshold_ms: Optional[float] = None,
+                 metrics: Optional[ApiMetrics] = None, query_metrics: Optional[QueryMetrics] = None,
+                 n_plus_one_threshold: Optional[int] = None):
+        self.app = app
+        self.slow_threshold_ms = settings.SLOW_REQUEST_THRESHOLD_MS if slow_threshold_ms is None else slow_threshold_ms
+        self.metrics = api_metrics if metrics is None else metrics
+        self.query_metrics = default_query_metrics if query_metrics is None else query_metrics
+        self.n_plus_one_threshold = (
+            settings.DB_N_PLUS_ONE_THRESHOLD if n_plus_one_threshold is None else n_plus_one_threshold
+        )
+
+    @staticmethod
+    def _route_template(scope: Scope) -> str:
+        # Set by the router once the request has been matched
+        route = scope.get("route")
+        path = getattr(route, "path", None)
+        return f"{scope['method']} {path}" if path else ApiMetrics.UNMATCHED
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracking = track_queries() if settings.DB_INSTRUMENTATION_ENABLED else nullcontext()
+        with tracking as queries:
+            await self._timed(scope, receive, send, queries)
+
+    async def _timed(self, scope: Scope, receive: Receive, send: Send, queries: Optional[QueryStats]) -> None:
+        start = time.perf_counter()
+        status_code = 500
+        response_started = False
+        self.metrics.request_started()
+
+        async def timed_send(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time-ms", f"{elapsed_ms:.3f}".encode("latin-1")))
+                if queries is not None and settings.SERVER_TIMING_ENABLED:
+                    headers.append((b"server-timing", self._server_timing(queries, elapsed_ms)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        except Exception:
+            # Answer unhandled errors here so they are timed and counted like any other response
+            logger.exception(f"Unhandled error in {scope['method']} {scope['path']}")
+            if response_started:
+                raise
+            await timed_send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", b"21")],
+            })
+            await send({"type": "http.response.body", "body": b"Internal Server Error"})
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            route = self._route_template(scope)
+            slow = duration_ms > self.slow_threshold_ms
+            self.metrics.request_finished(route, status_code, duration_ms, slow)
+            if slow:
+                logger.warning(f"Slow request: {route} took {duration_ms:.1f}ms (status {status_code})")
+            if queries is not None and queries.statements:
+                self._record_queries(route, queries)
+
+    def _record_queries(self, route: str, queries: QueryStats) -> None:
+        repeated = queries.repeated(self.n_plus_one_threshold)
+        self.query_metrics.record_request(route, queries.statements, queries.db_time_ms, queries.fingerprints, repeated)
+        for statement, count in repeated.items():
+            logger.warning(f"Possible N+1 query in {route}: {count} executions of {statement}")
+
+    @staticmethod
+    def _server_timing(queries: QueryStats, elapsed_ms: float) -> bytes:
+        return (
+            f'db;dur={queries.db_time_ms:.3f};desc="{queries.statements} queries", app;dur={elapsed_ms:.3f}'
+        ).encode("latin-1")
@@ -0,0 +1,233 @@
+"""Single-pass privacy and security pipeline.
+
+Replaces the stacked ``SecurityMiddleware``, ``PrivacyMiddleware`` and
+``RoutePrivacyMiddleware`` with one pure-ASGI middleware. The request is
+checked once from ``scope`` (documentation endpoints, local-only access,
+query parameters) and the response headers are rewritten once on
+``http.response.start``, so a request pays for a single layer instead of
+three ``call_next`` task hops that each rewrite the same headers.
+"""
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.middleware.redaction import should_redact
+from app.middleware.rules import RouteRule, RuleRouter
+from app.middleware.sanitizer import JsonFieldSanitizer, sanitize_json
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+
+DOC_ENDPOINTS = {"/docs", "/redoc", "/openapi.json"}
+DOC_STATIC_PATTERN = re.compile(r"^/static/(swagger-ui|redoc)/.*$")
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+LOCAL_ORIGINS = ("http://localhost:", "http://127.0.0.1:")
+
+# Headers dropped from every non-documentation response
+REMOVED_HEADERS = {
+    b"set-cookie", b"cookie", b"x-analytics", b"x-tracking", b"x-real-ip",
+    b"x-forwarded-for", b"x-forwarded-proto", b"x-forwarded-host"
+}
+
+SECURITY_HEADERS: Headers = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"permissions-policy", (
+        b"camera=(), "
+        b"microphone=(), "
+        b"geolocation=(), "
+        b"payment=(), "
+        b"usb=(), "
+        b"interest-cohort=()"
+    )),
+    (b"content-security-policy", (
+        b"default-src 'self'; "
+        b"img-src 'self' data:; "
+        b"style-src 'self'; "
+        b"script-src 'self';"
+    )),
+]
+
+# Swagger UI and ReDoc need inline scripts and styles
+DOCS_CSP = (
+    b"default-src 'self'; "
+    b"img-src 'self' data:; "
+    b"style-src 'self' 'unsafe-inline'; "
+    b"script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+    b"font-src 'self' data:;"
+)
+
+OPTIONS_HEADERS: Headers = [
+    (b"allow", b"GET, POST, PUT, DELETE, OPTIONS"),
+    (b"access-control-allow-methods", b"GET, POST, PUT, DELETE, OPTIONS"),
+    (b"access-control-allow-headers", b"Content-Type"),
+    (b"access-control-max-age", b"600"),  # 10 minutes
+    (b"vary", b"Origin"),
+]
+
+
+class PrivacyPipelineMiddleware:
+    """Pure-ASGI middleware enforcing local-only access, privacy headers and route rules."""
+
+    def __init__(self, app: ASGIApp, rules: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.app = app
+        self.router = RuleRouter(rules)
+        self._route_headers: Dict[Tuple[RouteRule, bool], Headers] = {}
+
+    def _headers_for(self, rule: RouteRule, dev_mode: bool) -> Headers:
+        """Headers added to every response of a route, built once per rule."""
+        key = (rule, dev_mode)
+        headers = self._route_headers.get(key)
+        if headers is None:
+            headers = [(b"cache-control", rule.cache_control.encode("latin-1"))]
+            headers.extend(SECURITY_HEADERS)
+            if dev_mode:
+                headers.append((b"x-privacy-mode", b"development"))
+                headers.append((b"x-cache-status", b"bypass"))
+            else:
+                headers.append((b"x-privacy-mode", b"strict"))
+            self._route_headers[key] = headers
+        return headers
+
+    @staticmethod
+    def _is_local_request(scope: Scope, origin: str) -> bool:
+        """Check if the request is from localhost."""
+        client = scope.get("client")
+        return (client is not None and client[0] in LOCAL_HOSTS) or origin.startswith(LOCAL_ORIGINS)
+
+    @staticmethod
+    async def _respond(send: Send, status: int, body: bytes, headers: Headers) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + [(b"content-length", str(len(body)).encode("latin-1"))],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        dev_mode = settings.DEV_MODE
+
+        if path in DOC_ENDPOINTS or DOC_STATIC_PATTERN.match(path):
+            await self.app(scope, receive, self._docs_send(send, dev_mode))
+            return
+
+        if scope["method"] == "OPTIONS":
+            await self._respond(send, 204, b"", list(OPTIONS_HEADERS))
+            return
+
+        rule = self.router.resolve(path)
+        route_headers = self._headers_for(rule, dev_mode)
+
+        params = [
+            name for name, _ in parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+        ]
+        # Only allow-listed names pass, so sensitive-looking ones (e.g.
+        # session_id on exports) are accepted exactly where a rule lists them
+        if not rule.allows(params):
+            await self._respond(
+                send, 400, b'{"error": "Invalid query parameters"}',
+                [(b"content-type", b"application/json")]
+            )
+            return
+
+        origin = ""
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+                break
+
+        # Rejections still carry the route's privacy headers
+        if not self._is_local_request(scope, origin):
+            await self._respond(send, 403, b"This application is designed for local use only", list(route_headers))
+            return
+
+        sanitize = rule.sanitize_response and scope["method"] != "HEAD"
+        await self.app(scope, receive, self._route_send(send, route_headers, sanitize))
+
+    @staticmethod
+    def _docs_send(send: Send, dev_mode: bool) -> Send:
+        """Add minimal headers to documentation responses."""
+        extra: Headers = [(b"x-content-type-options", b"nosniff"), (b"x-frame-options", b"DENY")]
+        if dev_mode:
+            extra.append((b"content-security-policy", DOCS_CSP))
+        managed = {name for name, _ in extra}
+
+        async def docs_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() not in managed]
+                message = {**message, "headers": headers + extra}
+            await send(message)
+
+        return docs_send
+
+    @staticmethod
+    def _route_send(send: Send, route_headers: Headers, sanitize: bool) -> Send:
+        """Rewrite headers once and sanitize JSON bodies of a route response."""
+        managed = {name for name, _ in route_headers}
+        start: Optional[Message] = None
+        sanitizer: Optional[JsonFieldSanitizer] = None
+
+        async def route_send(message: Message) -> None:
+            nonlocal start, sanitizer
+            if message["type"] == "http.response.start":
+                headers: Headers = []
+                is_json = False
+                encoded = False
+                for name, value in message.get("headers", []):
+                    name = name.lower()
+                    if name in REMOVED_HEADERS or name in managed:
+                        continue
+                    if name == b"content-type":
+                        is_json = value.startswith(b"application/json")
+                    elif name == b"content-encoding":
+                        encoded = True
+                    elif should_redact(name.decode("latin-1"), value.decode("latin-1")):
+                        value = b"[REDACTED]"
+                    headers.append((name, value))
+                message = {**message, "headers": headers + route_headers}
+                # Encoded bodies cannot be rewritten; compression belongs outside this middleware
+                if sanitize and is_json and not encoded:
+                    # Hold the start message until the first body message
+                    start = message
+                    sanitizer = JsonFieldSanitizer()
+                    return
+                await send(message)
+                return
+
+            if sanitizer is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                held, start = start, None
+                headers = [(k, v) for k, v in held["headers"] if k != b"content-length"]
+                if not more_body:
+                    # Whole body in one message: keep an exact content-length
+                    body = sanitize_json(body)
+                    headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                    await send({**held, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                # Streamed body: sanitize chunks as they arrive, without a length
+                await send({**held, "headers": headers})
+
+            body = sanitizer.feed(body)
+            if not more_body:
+                body += sanitizer.close()
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        return route_send
@@ -5,16 +5,13 @@ from starlette.types import ASGIApp
 from typing import Callable
 import re
 from app.core.config import settings
+from app.middleware.redaction import is_sensitive_param, should_redact
 
 class PrivacyMiddleware(BaseHTTPMiddleware):
     """Middleware for enforcing privacy requirements and GDPR compliance."""
     
     def __init__(self, app: ASGIApp):
         super().__init__(app)
-        self.sensitive_params = [
-            "token", "key", "password", "secret", "auth",
-            "session", "tracking", "analytics", "location"
-        ]
         # Define documentation endpoints
         self.doc_endpoints = {"/docs", "/redoc", "/openapi.json"}
         self.doc_static_pattern = re.compile(r"^/static/(swagger-ui|redoc)/.*$")
@@ -38,10 +35,9 @@ class PrivacyMiddleware(BaseHTTPMiddleware):
                 status_code=403
             )
         
-        # Remove any sensitive query parameters
+        # Reject any sensitive query parameters
         if request.query_params:
-            filtered_params = self._filter_sensitive_params(dict(request.query_params))
-            if filtered_params != dict(request.query_params):
+            if any(is_sensitive_param(name) for name in request.query_params.keys()):
                 return Response(
                     content="Request contains sensitive parameters",
                     status_code=400
@@ -94,7 +90,7 @@ class PrivacyMiddleware(BaseHTTPMiddleware):
         
         # Ensure no sensitive data in response headers
         for header, value in response.headers.items():
-            if not header.lower().startswith("access-control-") and self._contains_sensitive_data(value):
+            if should_redact(header, value):
                 response.headers[header] = "[REDACTED]"
         
         return response
@@ -107,20 +103,3 @@ class PrivacyMiddleware(BaseHTTPMiddleware):
             host in ["127.0.0.1", "localhost", "::1"] or
             origin.startswith(("http://localhost:", "http://127.0.0.1:"))
         )
-    
-    def _filter_sensitive_params(self, params: dict) -> dict:
-        """Remove any sensitive parameters from the query string."""
-        return {
-            k: v for k, v in params.items()
-            if not any(sensitive in k.lower() for sensitive in self.sensitive_params)
-        }
-    
-    def _contains_sensitive_data(self, value: str) -> bool:
-        """Check if a string contains potentially sensitive data patterns."""
-        sensitive_patterns = [
-            r"[0-9]{3,}",  # Numbers that could be IDs
-            r"[a-fA-F0-9]{32,}",  # MD5/UUID-like strings
-            r"eyJ[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*",  # JWT-like tokens
-            r"[a-zA-Z0-9+/]{32,}={0,2}"  # Base64-like strings
-        ]
-        return any(re.search(pattern, str(value)) for pattern in sensitive_patterns)
\ No newline at end of file
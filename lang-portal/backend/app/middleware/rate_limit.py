@@ -0,0 +1,133 @@
+"""Token-bucket rate limiting shared by all routes.
+
+Routes are grouped into classes by path template (see ``RuleRouter``), and
+every client gets one bucket per class. A bucket holds up to ``burst``
+tokens and refills continuously at ``requests / window`` tokens per second;
+a request takes one token. Buckets are refilled lazily when touched, so a
+check is O(1) regardless of traffic, unlike a per-client timestamp list
+that is rescanned on every request.
+
+Buckets live in an ``OrderedDict`` used as an LRU: the least recently used
+bucket is evicted once ``max_buckets`` is reached. An evicted bucket was
+idle for longest and would have refilled anyway, so eviction at worst
+grants a full burst to a client returning after a long pause.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import ApiMetrics, api_metrics
+from app.middleware.rules import RuleRouter
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED_BODY = b'{"detail":"Too many requests. Please try again later."}'
+
+
+class RateLimitRule:
+    """Token-bucket parameters of a route class."""
+
+    __slots__ = ("name", "burst", "rate")
+
+    def __init__(self, name: str, requests: int, window: float, burst: Optional[int] = None):
+        if requests <= 0 or window <= 0:
+            raise ValueError(f"Rate limit '{name}' needs positive requests and window")
+        self.name = name
+        self.burst = requests if burst is None else burst
+        self.rate = requests / window  # Tokens per second
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RateLimitRule":
+        """Build a rule from its configuration mapping."""
+        return cls(
+            name=config["name"],
+            requests=config["requests"],
+            window=config["window"],
+            burst=config.get("burst"),
+        )
+
+
+class TokenBucketLimiter:
+    """Token buckets per (client, route class) with LRU eviction."""
+
+    def __init__(self, max_buckets: Optional[int] = None):
+        self.max_buckets = settings.RATE_LIMIT_MAX_BUCKETS if max_buckets is None else max_buckets
+        # (client, class) -> [tokens, last refill time]
+        self._buckets: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, client: str, rule: RateLimitRule, now: Optional[float] = None) -> float:
+        """Take a token; returns 0 if allowed, otherwise seconds until one is available."""
+        if now is None:
+            now = time.monotonic()
+        key = (client, rule.name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = [float(rule.burst), now]
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(rule.burst, bucket[0] + (now - bucket[1]) * rule.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rule.rate
+
+
+class RateLimitMiddleware:
+    """Pure-ASGI middleware answering 429 once a client's bucket is empty.
+
+    Routes without a configured class are not limited. Rejections are
+    counted per class in ``ApiMetrics`` and reported by ``/metrics/api``.
+    """
+
+    def __init__(self, app: ASGIApp, rules: Optional[Dict[str, Dict[str, Any]]] = None,
+                 max_buckets: Optional[int] = None, metrics: Optional[ApiMetrics] = None):
+        self.app = app
+        self.router = RuleRouter(
+            settings.RATE_LIMIT_RULES if rules is None else rules,
+            default=None,
+            rule_factory=RateLimitRule.from_config,
+        )
+        self.limiter = TokenBucketLimiter(max_buckets)
+        self.metrics = api_metrics if metrics is None else metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.router.resolve(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        host = client[0] if client else "unknown"
+        retry_after = self.limiter.acquire(host, rule)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        logger.warning(f"Rate limit exceeded for {host} on {rule.name}")
+        self.metrics.record_rate_limited(rule.name)
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(RATE_LIMITED_BODY)).encode("latin-1")),
+                (b"retry-after", str(math.ceil(retry_after)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": RATE_LIMITED_BODY})
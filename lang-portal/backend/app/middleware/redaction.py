@@ -0,0 +1,48 @@
+"""Precompiled checks for sensitive query parameters and header values.
+
+Each check is one combined regex, and results are memoized: most header
+values (Content-Type, Cache-Control, the security headers) and parameter
+names repeat on every request, so the scan usually costs a dict lookup.
+"""
+import re
+from functools import lru_cache
+
+# Substrings marking a query parameter name as sensitive
+SENSITIVE_PARAMS = frozenset({
+    "token", "key", "password", "secret", "auth",
+    "session", "tracking", "analytics", "location"
+})
+
+SENSITIVE_PARAM_PATTERN = re.compile("|".join(sorted(SENSITIVE_PARAMS)))
+
+SENSITIVE_VALUE_PATTERN = re.compile(
+    r"[0-9]{3,}"  # Numbers that could be IDs
+    r"|[a-fA-F0-9]{32,}"  # MD5/UUID-like strings
+    r"|eyJ[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*"  # JWT-like tokens
+    r"|[a-zA-Z0-9+/]{32,}={0,2}"  # Base64-like strings
+)
+
+# Response headers never redacted: cache validators, framing and pagination
+UNREDACTED_HEADERS = frozenset({
+    "etag", "last-modified", "content-length", "content-type",
+    "x-total-count", "x-next-cursor", "link",
+})
+
+
+@lru_cache(maxsize=256)
+def is_sensitive_param(name: str) -> bool:
+    """Check if a query parameter name looks sensitive."""
+    return SENSITIVE_PARAM_PATTERN.search(name.lower()) is not None
+
+
+@lru_cache(maxsize=512)
+def contains_sensitive_data(value: str) -> bool:
+    """Check if a header value contains potentially sensitive data patterns."""
+    return SENSITIVE_VALUE_PATTERN.search(value) is not None
+
+
+def should_redact(name: str, value: str) -> bool:
+    """Check if a response header value must be redacted; ``name`` is lower-case."""
+    if name in UNREDACTED_HEADERS or name.startswith("access-control-"):
+        return False
+    return contains_sensitive_data(value)
@@ -1,10 +1,13 @@
 """Route-specific privacy middleware for enforcing privacy rules."""
 from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
-from typing import Callable, Dict, Set
+from typing import Callable
 import re
 from app.core.config import settings
+from app.middleware.rules import RouteRule, RuleRouter
+from app.middleware.sanitizer import JsonFieldSanitizer
 
 class RoutePrivacyMiddleware(BaseHTTPMiddleware):
     """Middleware for enforcing route-specific privacy rules."""
@@ -15,67 +18,16 @@ class RoutePrivacyMiddleware(BaseHTTPMiddleware):
         self.doc_endpoints = {"/docs", "/redoc", "/openapi.json"}
         self.doc_static_pattern = re.compile(r"^/static/(swagger-ui|redoc)/.*$")
         
-        # Define route patterns and their privacy rules
-        self.route_rules: Dict[str, Set[str]] = {
-            r"/api/v1/dashboard/.*": {
-                "cache_control": "no-store, max-age=0",
-                "sanitize_response": True,
-                "allow_query_params": {"limit", "offset"}
-            },
-            r"/api/v1/vocabulary/.*": {
-                "cache_control": "private, max-age=300",
-                "sanitize_response": True,
-                "allow_query_params": {"limit", "offset", "sort", "filter"}
-            },
-            r"/api/v1/sessions/.*": {
-                "cache_control": "no-store, no-cache, must-revalidate",
-                "sanitize_response": True,
-                "allow_query_params": {"limit"}
-            },
-            r"/api/v1/activities/.*": {
-                "cache_control": "private, max-age=300",
-                "sanitize_response": True,
-                "allow_query_params": {"limit", "offset", "type"}
-            }
-        }
-        
-        # Define sensitive patterns to sanitize in responses
-        self.sensitive_patterns = [
-            (r'"id":\s*\d+', '"id": "[ID]"'),
-            (r'"created_at":\s*"[^"]*"', '"created_at": "[TIMESTAMP]"'),
-            (r'"updated_at":\s*"[^"]*"', '"updated_at": "[TIMESTAMP]"'),
-            (r'"ip":\s*"[^"]*"', '"ip": "[REDACTED]"'),
-            (r'"user_agent":\s*"[^"]*"', '"user_agent": "[REDACTED]"'),
-            (r'"session_id":\s*"[^"]*"', '"session_id": "[REDACTED]"'),
-            (r'"token":\s*"[^"]*"', '"token": "[REDACTED]"')
-        ]
+        # Route privacy rules, compiled once from the configuration
+        self.router = RuleRouter()
     
     def _is_doc_endpoint(self, path: str) -> bool:
         """Check if the path is a documentation endpoint."""
         return path in self.doc_endpoints or bool(self.doc_static_pattern.match(path))
     
-    def _get_route_rules(self, path: str) -> Dict[str, any]:
+    def _get_route_rules(self, path: str) -> RouteRule:
         """Get privacy rules for a specific route."""
-        for pattern, rules in self.route_rules.items():
-            if re.match(pattern, path):
-                return rules
-        # Default rules for unmatched routes
-        return {
-            "cache_control": "no-store",
-            "sanitize_response": True,
-            "allow_query_params": set()
-        }
-    
-    def _sanitize_query_params(self, params: Dict[str, str], allowed_params: Set[str]) -> Dict[str, str]:
-        """Remove disallowed query parameters."""
-        return {k: v for k, v in params.items() if k in allowed_params}
-    
-    def _sanitize_response_data(self, data: str) -> str:
-        """Sanitize sensitive information from response data."""
-        sanitized = data
-        for pattern, replacement in self.sensitive_patterns:
-            sanitized = re.sub(pattern, replacement, sanitized)
-        return sanitized
+        return self.router.resolve(path)
     
     async def _handle_options_request(self, request: Request) -> Response:
         """Handle OPTIONS requests with privacy-focused headers."""
@@ -91,9 +43,9 @@ class RoutePrivacyMiddleware(BaseHTTPMiddleware):
             }
         )
     
-    def _add_privacy_headers(self, response: Response, rules: Dict[str, any]) -> None:
+    def _add_privacy_headers(self, response: Response, rules: RouteRule) -> None:
         """Add privacy-focused headers to response."""
-        response.headers["Cache-Control"] = rules["cache_control"]
+        response.headers["Cache-Control"] = rules.cache_control
         response.headers["X-Content-Type-Options"] = "nosniff"
         response.headers["X-Frame-Options"] = "DENY"
         response.headers["X-XSS-Protection"] = "1; mode=block"
@@ -133,14 +85,9 @@ class RoutePrivacyMiddleware(BaseHTTPMiddleware):
         # Get privacy rules for the route
         rules = self._get_route_rules(request.url.path)
         
-        # Sanitize query parameters
+        # Reject query parameters the route does not allow
         if request.query_params:
-            allowed_params = rules["allow_query_params"]
-            sanitized_params = self._sanitize_query_params(
-                dict(request.query_params), allowed_params
-            )
-            # If any params were removed, return 400
-            if len(sanitized_params) != len(request.query_params):
+            if not rules.allows(request.query_params.keys()):
                 return Response(
                     content='{"error": "Invalid query parameters"}',
                     status_code=400,
@@ -155,35 +102,24 @@ class RoutePrivacyMiddleware(BaseHTTPMiddleware):
         
         # Skip sanitization for non-JSON responses or if sanitization is disabled
         if not (
-            rules["sanitize_response"] and
+            rules.sanitize_response and
             response.headers.get("content-type", "").startswith("application/json")
         ):
             return response
 
-        try:
-            # Get response body
-            body = b""
+        # Keep validators such as ETag and Last-Modified; the rewrite is
+        # deterministic, so they still identify the sanitized body
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        sanitizer = JsonFieldSanitizer()
+
+        async def sanitized_body():
             async for chunk in response.body_iterator:
-                body += chunk
+                yield sanitizer.feed(chunk)
+            yield sanitizer.close()
 
-            # Try to sanitize if it's JSON
-            try:
-                response_text = body.decode('utf-8')
-                sanitized_body = self._sanitize_response_data(response_text)
-                
-                # Create new response without manipulating content-length
-                return Response(
-                    content=sanitized_body,
-                    status_code=response.status_code,
-                    media_type=response.media_type
-                )
-            except UnicodeDecodeError:
-                # Not UTF-8 encoded, return as is
-                return Response(
-                    content=body,
-                    status_code=response.status_code,
-                    media_type=response.media_type
-                )
-        except Exception:
-            # If anything goes wrong, return original response
-            return response
\ No newline at end of file
+        return StreamingResponse(
+            sanitized_body(),
+            status_code=response.status_code,
+            headers=headers,
+            media_type=response.media_type
+        )
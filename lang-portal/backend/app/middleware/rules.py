@@ -0,0 +1,112 @@
+"""Compiled router for per-route rules (privacy, rate limits).
+
+Rules are keyed by path templates and compiled once into a segment trie:
+
+- ``/api/v1/dashboard/stats`` matches that path only
+- ``{name}`` matches exactly one segment
+- ``**`` as the last segment matches one or more remaining segments, so
+  ``/api/v1/dashboard/**`` matches ``/api/v1/dashboard/`` and everything
+  below it but not ``/api/v1/dashboard``. ``.*`` is accepted as an alias.
+
+Literal segments take precedence over ``{name}``, which takes precedence
+over ``**``. Resolved lookups are memoized in a bounded LRU, so a request
+costs one dictionary hit for paths seen recently and a walk of at most one
+trie node per segment otherwise.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+
+class RouteRule:
+    """Privacy rule resolved for a route."""
+
+    __slots__ = ("cache_control", "sanitize_response", "allow_query_params")
+
+    def __init__(self, cache_control: str, sanitize_response: bool = True,
+                 allow_query_params: Iterable[str] = ()):
+        self.cache_control = cache_control
+        self.sanitize_response = sanitize_response
+        self.allow_query_params = frozenset(allow_query_params)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RouteRule":
+        """Build a rule from its configuration mapping."""
+        return cls(
+            cache_control=config["cache_control"],
+            sanitize_response=config.get("sanitize_response", True),
+            allow_query_params=config.get("allow_query_params", ()),
+        )
+
+    def allows(self, params: Iterable[str]) -> bool:
+        """Check that every query parameter name is allow-listed."""
+        return self.allow_query_params.issuperset(params)
+
+
+# Rule for routes not covered by the configuration
+DEFAULT_RULE = RouteRule(cache_control="no-store")
+
+
+class _Node:
+    __slots__ = ("children", "param", "rule", "rest")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.rule: Any = None
+        self.rest: Any = None
+
+
+class RuleRouter:
+    """Resolve request paths to rules.
+
+    Rules default to privacy rules; other rule types are built from their
+    configuration with ``rule_factory``.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Dict[str, Any]]] = None,
+                 default: Any = DEFAULT_RULE, cache_size: Optional[int] = None,
+                 rule_factory: Callable[[Dict[str, Any]], Any] = RouteRule.from_config):
+        self.default = default
+        self._root = _Node()
+        for template, config in (settings.PRIVACY_ROUTE_RULES if rules is None else rules).items():
+            self.add(template, rule_factory(config) if isinstance(config, dict) else config)
+        size = settings.PRIVACY_RULE_CACHE_SIZE if cache_size is None else cache_size
+        self.resolve = lru_cache(maxsize=size)(self._resolve)
+
+    def add(self, template: str, rule: Any) -> None:
+        """Register a rule for a path template."""
+        segments = template.strip("/").split("/")
+        node = self._root
+        for index, segment in enumerate(segments):
+            if segment in ("**", ".*"):
+                if index != len(segments) - 1:
+                    raise ValueError(f"'**' must be the last segment of {template}")
+                node.rest = rule
+                return
+            if segment.startswith("{") and segment.endswith("}"):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.children.setdefault(segment, _Node())
+        node.rule = rule
+
+    def _resolve(self, path: str) -> Any:
+        rule = self._match(self._root, path[1:].split("/") if path.startswith("/") else path.split("/"), 0)
+        return self.default if rule is None else rule
+
+    def _match(self, node: _Node, segments: List[str], index: int) -> Any:
+        if index == len(segments):
+            return node.rule
+        child = node.children.get(segments[index])
+        if child is not None:
+            rule = self._match(child, segments, index + 1)
+            if rule is not None:
+                return rule
+        if node.param is not None and segments[index]:
+            rule = self._match(node.param, segments, index + 1)
+            if rule is not None:
+                return rule
+        return node.rest
@@ -0,0 +1,102 @@
+"""Streaming sanitizer for sensitive fields in JSON response bodies.
+
+Fields are redacted on the encoded bytes with precompiled patterns and
+literal replacements, so the body is never decoded and every substitution
+runs inside the regex engine. Bodies can be fed chunk by chunk: only a
+field cut off by the end of a chunk is held back, never the whole body.
+
+A field name only matches as an object key: inside a JSON string every
+quote is escaped, so ``"key":`` cannot occur there.
+"""
+import re
+from typing import Dict, List, Pattern, Tuple
+
+# Numeric fields and their placeholders
+NUMBER_FIELDS: Dict[str, str] = {
+    "id": "[ID]",
+}
+
+# String fields and their placeholders
+STRING_FIELDS: Dict[str, str] = {
+    "created_at": "[TIMESTAMP]",
+    "updated_at": "[TIMESTAMP]",
+    "ip": "[REDACTED]",
+    "user_agent": "[REDACTED]",
+    "session_id": "[REDACTED]",
+    "token": "[REDACTED]",
+}
+
+_NUMBER = rb"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?"
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# Any prefix of a value; a string may also be complete, since a closing
+# quote at the end of a chunk is indistinguishable from a key's opening quote
+_NUMBER_PREFIX = rb"-?[\d.eE+-]*"
+_STRING_PREFIX = rb'"[^"\\]*(?:\\.[^"\\]*)*[\\"]?'
+
+
+def _compile_fields() -> Tuple[List[Tuple[Pattern, bytes]], List[Tuple[bytes, Pattern]]]:
+    substitutions = []
+    partials = []
+    fields = [(name, placeholder, _NUMBER, _NUMBER_PREFIX) for name, placeholder in NUMBER_FIELDS.items()]
+    fields += [(name, placeholder, _STRING, _STRING_PREFIX) for name, placeholder in STRING_FIELDS.items()]
+    for name, placeholder, value, value_prefix in fields:
+        key = b'"' + re.escape(name).encode("ascii") + b'"'
+        substitutions.append((
+            re.compile(key + rb":\s*" + value),
+            f'"{name}": "{placeholder}"'.encode("ascii"),
+        ))
+        partials.append((key, re.compile(key + rb"(?::\s*(?:" + value_prefix + rb")?)?\Z")))
+    return substitutions, partials
+
+
+FIELD_SUBSTITUTIONS, _FIELD_PARTIALS = _compile_fields()
+
+# An object key cut off before its closing quote
+_KEY_PREFIX = re.compile(rb'"[A-Za-z_]*\Z')
+_MAX_KEY = max(len(name) for name in {**NUMBER_FIELDS, **STRING_FIELDS}) + 1
+
+
+def sanitize_json(body: bytes) -> bytes:
+    """Sanitize a complete JSON body."""
+    for pattern, replacement in FIELD_SUBSTITUTIONS:
+        body = pattern.sub(replacement, body)
+    return body
+
+
+def _safe_end(data: bytes) -> int:
+    """Length of the prefix of ``data`` that no unfinished field overlaps."""
+    end = len(data)
+    cut = end
+    for key, partial in _FIELD_PARTIALS:
+        # Only the last occurrence of a key can still be unfinished
+        start = data.rfind(key)
+        if 0 <= start < cut and partial.match(data, start):
+            cut = start
+    partial_key = _KEY_PREFIX.search(data, max(0, end - _MAX_KEY - 1))
+    if partial_key and partial_key.start() < cut:
+        cut = partial_key.start()
+    return cut
+
+
+class JsonFieldSanitizer:
+    """Incremental sanitizer; ``feed`` chunks in order, then ``close``."""
+
+    __slots__ = ("_carry",)
+
+    def __init__(self):
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Sanitize a chunk, returning the output that is safe to send."""
+        data = self._carry + chunk if self._carry else chunk
+        cut = _safe_end(data)
+        if cut == len(data):
+            self._carry = b""
+            return sanitize_json(data)
+        self._carry = data[cut:]
+        return sanitize_json(data[:cut])
+
+    def close(self) -> bytes:
+        """Sanitize and return whatever was held back from the last chunk."""
+        data, self._carry = self._carry, b""
+        return sanitize_json(data)
@@ -8,6 +8,11 @@ class ResponseTimes(BaseModel):
     min: float = Field(..., description="Minimum response time in milliseconds")
     max: float = Field(..., description="Maximum response time in milliseconds")
     median: Optional[float] = Field(None, description="Median response time in milliseconds")
+    p50: Optional[float] = Field(None, description="50th percentile in milliseconds")
+    p95: Optional[float] = Field(None, description="95th percentile in milliseconds")
+    p99: Optional[float] = Field(None, description="99th percentile in milliseconds")
+    p999: Optional[float] = Field(None, description="99.9th percentile in milliseconds")
+    count: Optional[int] = Field(None, description="Number of recorded samples")
 
 class CpuMetrics(BaseModel):
     """CPU metrics."""
@@ -39,17 +44,28 @@ class ApiRequestMetrics(BaseModel):
     """API request metrics."""
     total: int = Field(..., description="Total number of requests")
     rate_limited: int = Field(..., description="Number of rate-limited requests")
+    rate_limited_by_class: Dict[str, int] = Field(default_factory=dict, description="Rate-limited requests by route class")
     successful: int = Field(..., description="Number of successful requests")
+    in_flight: int = Field(0, ge=0, description="Requests currently being processed")
+    peak_in_flight: int = Field(0, ge=0, description="Highest number of concurrent requests")
+    slow: int = Field(0, ge=0, description="Requests slower than the slow request threshold")
+
+class ApiRouteMetrics(BaseModel):
+    """Metrics of one route template."""
+    response_times: ResponseTimes = Field(..., description="Response time statistics")
+    errors: Dict[str, int] = Field(..., description="Error counts by status code category")
 
 class ApiEndpointMetrics(BaseModel):
     """API endpoint metrics."""
     active: int = Field(..., description="Number of active endpoints")
     error_rates: Dict[str, int] = Field(..., description="Error rates by status code category")
+    routes: Dict[str, ApiRouteMetrics] = Field({}, description="Latency and errors per method and route template")
 
 class ApiPerformanceMetrics(BaseModel):
     """API performance metrics."""
     avg_response_time: float = Field(..., description="Average response time in milliseconds")
     peak_response_time: float = Field(..., description="Peak response time in milliseconds")
+    response_times: Optional[ResponseTimes] = Field(None, description="Response time statistics")
 
 class ApiMetricsResponse(BaseModel):
     """API metrics response."""
@@ -67,23 +83,85 @@ class DatabaseSizeMetrics(BaseModel):
     """Database size metrics."""
     total_bytes: int = Field(..., description="Total database size in bytes")
     total_mb: float = Field(..., description="Total database size in megabytes")
+    page_size: Optional[int] = Field(None, description="SQLite page size in bytes")
+    page_count: Optional[int] = Field(None, description="SQLite pages in the database file")
+    freelist_count: Optional[int] = Field(None, description="SQLite unused pages in the database file")
+    free_bytes: Optional[int] = Field(None, description="Bytes held by unused pages")
+    wal_bytes: Optional[int] = Field(None, description="Size of the SQLite write-ahead log in bytes")
+    tables: Dict[str, int] = Field({}, description="Size in bytes per table and index")
 
 class DatabasePerformanceMetrics(BaseModel):
     """Database performance metrics."""
-    active_connections: int = Field(..., description="Number of active connections")
-    cache_hit_ratio: float = Field(..., description="Database cache hit ratio")
+    active_connections: int = Field(..., description="Connections checked out from the application pools")
+    server_connections: Optional[int] = Field(None, description="Connections open on the database server")
+    cache_hit_ratio: Optional[float] = Field(None, description="Database cache hit ratio, where the database reports one")
+
+class DatabasePoolMetrics(BaseModel):
+    """Connection pool checkout metrics."""
+    size: Optional[int] = Field(None, description="Configured pool size")
+    checked_out: int = Field(..., description="Connections currently checked out")
+    peak_checked_out: int = Field(..., description="Most connections checked out at once")
+    overflow: Optional[int] = Field(None, description="Connections open beyond the pool size")
+    checkouts: int = Field(..., description="Total checkouts")
+
+class DatabaseWriteQueueMetrics(BaseModel):
+    """Single-writer queue metrics."""
+    depth: int = Field(..., description="Write transactions waiting in the queue")
+    peak_depth: int = Field(..., description="Highest queue depth seen")
+    batches: int = Field(..., description="Number of group commits")
+    transactions: int = Field(..., description="Number of committed write transactions")
+    failed_transactions: int = Field(..., description="Transactions rolled back to their savepoint")
+    failed_commits: int = Field(..., description="Group commits that failed")
+    avg_batch_size: float = Field(..., description="Average transactions per commit")
+    max_batch_size: int = Field(..., description="Largest number of transactions in one commit")
+    batch_sizes: Dict[str, int] = Field({}, description="Number of commits per batch size")
+    commit_times: ResponseTimes = Field(..., description="Commit latency statistics")
+
+class DatabaseRouteQueryMetrics(BaseModel):
+    """SQL statement metrics of one route."""
+    requests: int = Field(..., description="Requests that executed statements")
+    avg_statements: float = Field(..., description="Average statements per request")
+    max_statements: int = Field(..., description="Most statements executed by one request")
+    db_time: ResponseTimes = Field(..., description="Database time per request")
+    n_plus_one_requests: int = Field(..., description="Requests that repeated a statement past the N+1 threshold")
+    n_plus_one: Dict[str, int] = Field({}, description="Repeated statement fingerprints and the number of requests repeating them")
+
+class DatabaseStatementMetrics(BaseModel):
+    """Totals of one normalized statement."""
+    statement: str = Field(..., description="Statement fingerprint with literals replaced")
+    executions: int = Field(..., description="Number of executions")
+    total_ms: float = Field(..., description="Total execution time in milliseconds")
+
+class DatabaseQueryMetrics(BaseModel):
+    """SQL statement metrics attributed to requests."""
+    requests: int = Field(..., description="Requests that executed statements")
+    statements: int = Field(..., description="Statements executed by requests")
+    avg_statements: float = Field(..., description="Average statements per request")
+    n_plus_one_requests: int = Field(..., description="Requests with a likely N+1 query")
+    db_time: ResponseTimes = Field(..., description="Database time per request")
+    routes: Dict[str, DatabaseRouteQueryMetrics] = Field({}, description="Statement metrics per route template")
+    top_statements: List[DatabaseStatementMetrics] = Field([], description="Statements with the most total database time")
 
 class DatabaseMetricsResponse(BaseModel):
     """Database metrics response."""
+    dialect: str = Field(..., description="Database dialect the metrics were collected from")
     tables: DatabaseTableMetrics = Field(..., description="Table metrics")
     size: DatabaseSizeMetrics = Field(..., description="Size metrics")
     performance: DatabasePerformanceMetrics = Field(..., description="Performance metrics")
+    pools: Dict[str, DatabasePoolMetrics] = Field({}, description="Checkout metrics per connection pool")
+    sampled_at: str = Field(..., description="Time of the background sample")
+    sample_duration_ms: float = Field(..., description="Time the background sample took in milliseconds")
+    write_queue: Optional[DatabaseWriteQueueMetrics] = Field(None, description="Single-writer queue metrics")
+    queries: Optional[DatabaseQueryMetrics] = Field(None, description="SQL statement metrics per request")
 
 class CachePerformanceMetrics(BaseModel):
     """Cache performance metrics."""
     hit_ratio: float = Field(..., ge=0, le=1, description="Cache hit ratio")
     response_times: ResponseTimes = Field(..., description="Response time statistics")
+    prefixes: Dict[str, ResponseTimes] = Field({}, description="Response time statistics per cache key prefix")
     entry_count: int = Field(..., ge=0, description="Number of entries in cache")
+    coalesced_requests: int = Field(0, ge=0, description="Misses served by awaiting an in-flight computation")
+    coalesce_timeouts: int = Field(0, ge=0, description="Coalesced callers that timed out and recomputed")
 
 class CachePrivacyMetrics(BaseModel):
     """Cache privacy metrics."""
@@ -97,17 +175,35 @@ class CacheStorageMetrics(BaseModel):
     utilization: float = Field(..., ge=0, le=1, description="Cache storage utilization")
     cleanup: Dict[str, Union[int, str, None]] = Field(..., description="Cache cleanup statistics")
 
+class CacheRefreshMetrics(BaseModel):
+    """Cache background refresh metrics."""
+    count: int = Field(..., ge=0, description="Number of completed background refreshes")
+    failures: int = Field(..., ge=0, description="Number of failed background refreshes")
+    latency: ResponseTimes = Field(..., description="Refresh latency statistics")
+
+class CacheCompressionMetrics(BaseModel):
+    """Cache compression metrics."""
+    entries: int = Field(..., ge=0, description="Number of entries that went through compression")
+    bytes_in: int = Field(..., ge=0, description="Uncompressed bytes of those entries")
+    bytes_out: int = Field(..., ge=0, description="Stored bytes of those entries")
+    overall_ratio: float = Field(..., ge=0, description="Stored bytes divided by uncompressed bytes")
+    mean_entry_ratio: float = Field(..., ge=0, description="Mean per-entry compression ratio")
+    compress_cpu: ResponseTimes = Field(..., description="Compression CPU time in milliseconds")
+    decompress_cpu: ResponseTimes = Field(..., description="Decompression CPU time in milliseconds")
+
 class CacheMetricsResponse(BaseModel):
     """Cache metrics response."""
     performance: CachePerformanceMetrics = Field(..., description="Performance metrics")
     privacy: CachePrivacyMetrics = Field(..., description="Privacy metrics")
     storage: CacheStorageMetrics = Field(..., description="Storage metrics")
+    refresh: Optional[CacheRefreshMetrics] = Field(None, description="Background refresh metrics")
+    compression: Optional[CacheCompressionMetrics] = Field(None, description="Compression metrics")
 
 class FullMetricsResponse(BaseModel):
     """Complete system metrics response."""
     system: SystemMetricsResponse = Field(..., description="System metrics")
     api: ApiMetricsResponse = Field(..., description="API metrics")
-    database: DatabaseMetricsResponse = Field(..., description="Database metrics")
+    database: Optional[DatabaseMetricsResponse] = Field(None, description="Database metrics, once sampled")
     cache: CacheMetricsResponse = Field(..., description="Cache metrics")
     timestamp: str = Field(..., description="Timestamp of metrics collection")
     uptime: Optional[str] = Field(None, description="Application uptime")
\ No newline at end of file
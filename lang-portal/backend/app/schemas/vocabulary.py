@@ -60,6 +60,21 @@ class DuplicateVocabularyError(VocabularyError):
     word: str
     language_pair_id: int
 
+class VocabularyImportError(BaseModel):
+    line: int = Field(..., description="Line number of the rejected row")
+    error: str = Field(..., description="Why the row was rejected")
+
+class VocabularyImportResult(BaseModel):
+    processed: int = Field(..., description="Rows read, excluding the CSV header and blank lines")
+    written: int = Field(..., description="Rows inserted or updated")
+    unchanged: int = Field(..., description="Valid rows that were already stored as given, or skipped on conflict")
+    duplicates: int = Field(..., description="Rows superseded by a later row for the same word in the same batch")
+    invalid: int = Field(..., description="Rows rejected by validation")
+    batches: int = Field(..., description="Transactions written")
+    errors: List[VocabularyImportError] = Field([], description="First rejected rows")
+    duration_seconds: float = Field(..., description="Import duration in seconds")
+    rows_per_second: float = Field(..., description="Rows processed per second")
+
 class VocabularyResponse(BaseModel):
     word: str
     translation: str
@@ -1,12 +1,15 @@
 from typing import List, Optional, Dict
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import Row, Select, func, case, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import os
 import shutil
 
+from app.core.conditional import ResourceVersion
 from app.models.activity import Activity, Session as ActivitySession, SessionAttempt
+from app.models.associations import activity_vocabulary_group, vocabulary_group_association
 from app.models.vocabulary_group import VocabularyGroup
 from app.models.vocabulary import Vocabulary
 from app.models.progress import VocabularyProgress
@@ -17,9 +20,43 @@ from app.schemas.activity import (
     SessionResponse,
     ActivityProgressResponse
 )
-from app.services.base import BaseService
+from app.services.base import AsyncBaseService, BaseService
 from app.core.config import settings
 
+
+def _practice_version_query(activity_id: int) -> Select:
+    """Query the modification times and membership of an activity's practice vocabulary."""
+    groups = select(
+        func.max(func.coalesce(VocabularyGroup.updated_at, VocabularyGroup.created_at)).label("modified"),
+        func.count(VocabularyGroup.id).label("count"),
+        func.coalesce(func.sum(VocabularyGroup.id), 0).label("id_sum")
+    ).join(
+        activity_vocabulary_group, activity_vocabulary_group.c.group_id == VocabularyGroup.id
+    ).where(activity_vocabulary_group.c.activity_id == activity_id).subquery()
+    vocabularies = select(
+        func.max(func.coalesce(Vocabulary.updated_at, Vocabulary.created_at)).label("modified"),
+        func.count(Vocabulary.id).label("count"),
+        func.coalesce(func.sum(Vocabulary.id), 0).label("id_sum")
+    ).join(
+        vocabulary_group_association, vocabulary_group_association.c.vocabulary_id == Vocabulary.id
+    ).join(
+        activity_vocabulary_group,
+        activity_vocabulary_group.c.group_id == vocabulary_group_association.c.group_id
+    ).where(activity_vocabulary_group.c.activity_id == activity_id).subquery()
+
+    return select(
+        func.coalesce(Activity.updated_at, Activity.created_at),
+        groups.c.modified, groups.c.count, groups.c.id_sum,
+        vocabularies.c.modified, vocabularies.c.count, vocabularies.c.id_sum
+    ).select_from(Activity).join(groups, true()).join(vocabularies, true()).where(Activity.id == activity_id)
+
+
+def _practice_version(row: Optional[Row]) -> Optional[ResourceVersion]:
+    if row is None:
+        return None
+    return ResourceVersion(row[0:2] + row[4:5], row[2:4] + row[5:7])
+
+
 class ActivityService(BaseService[Activity, ActivityCreate, ActivityUpdate]):
     def __init__(self):
         super().__init__(Activity)
@@ -120,6 +157,10 @@ class ActivityService(BaseService[Activity, ActivityCreate, ActivityUpdate]):
         
         return activity.get_practice_vocabulary()
 
+    def get_practice_version(self, db: Session, *, id: int) -> Optional[ResourceVersion]:
+        """Get the version of an activity's practice vocabulary in one query."""
+        return _practice_version(db.execute(_practice_version_query(id)).first())
+
     def get_by_type(self, db: Session, type: str, skip: int = 0, limit: int = 100) -> List[Activity]:
         """Get activities by type."""
         if not type.strip():
@@ -220,4 +261,159 @@ class SessionService(BaseService[ActivitySession, SessionCreate, SessionCreate])
         return self.get_multi(db, skip=skip, limit=limit, activity_id=activity_id)
 
 # Create session service instance
-session_service = SessionService()
\ No newline at end of file
+session_service = SessionService()
+
+
+class AsyncActivityService(AsyncBaseService[Activity, ActivityCreate, ActivityUpdate]):
+    """Activity operations for async routes."""
+
+    sort_keys = {"id": ("id", False), "name": ("name", False), "recent": ("created_at", True)}
+
+    def __init__(self):
+        super().__init__(Activity)
+
+    async def _get_groups(self, db: AsyncSession, group_ids: List[int]) -> List[VocabularyGroup]:
+        """Load vocabulary groups, failing if any of them does not exist."""
+        if not group_ids:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "code": "EMPTY_GROUP_IDS",
+                    "message": "At least one vocabulary group must be specified"
+                }
+            )
+        result = await db.execute(select(VocabularyGroup).where(VocabularyGroup.id.in_(group_ids)))
+        groups = list(result.scalars().all())
+        missing = set(group_ids) - {group.id for group in groups}
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Vocabulary groups not found: {sorted(missing)}")
+        return groups
+
+    async def add_with_validation(self, db: AsyncSession, *, obj_in: ActivityCreate) -> Activity:
+        """Add activity after checking its vocabulary groups, flushed but not committed.
+
+        For write queue transactions, which must not commit themselves.
+        """
+        groups = await self._get_groups(db, obj_in.vocabulary_group_ids)
+        db_obj = Activity(**obj_in.dict(exclude={"vocabulary_group_ids"}), vocabulary_groups=groups)
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def create_with_validation(self, db: AsyncSession, *, obj_in: ActivityCreate) -> Activity:
+        """Create activity after checking its vocabulary groups."""
+        db_obj = await self.add_with_validation(db, obj_in=obj_in)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def apply_update(self, db: AsyncSession, *, db_obj: Activity, obj_in: ActivityUpdate) -> Activity:
+        """Update activity, replacing its vocabulary groups if given; flushed but not committed."""
+        obj_data = obj_in.dict(exclude_unset=True)
+        group_ids = obj_data.pop("vocabulary_group_ids", None)
+        if group_ids is not None:
+            db_obj.vocabulary_groups = await self._get_groups(db, group_ids)
+        for field, value in obj_data.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(self, db: AsyncSession, *, db_obj: Activity, obj_in: ActivityUpdate) -> Activity:
+        """Update activity, replacing its vocabulary groups if given."""
+        db_obj = await self.apply_update(db, db_obj=db_obj, obj_in=obj_in)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Activity:
+        """Delete activity, flushed but not committed."""
+        db_obj = await self.get(db, id)
+        if not db_obj:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        await db.delete(db_obj)
+        await db.flush()
+        return db_obj
+
+    async def get_practice_version(self, db: AsyncSession, *, id: int) -> Optional[ResourceVersion]:
+        """Get the version of an activity's practice vocabulary in one query."""
+        return _practice_version((await db.execute(_practice_version_query(id))).first())
+
+    async def get_progress(self, db: AsyncSession, activity_id: int) -> List[ActivityProgressResponse]:
+        """Get progress for all vocabulary items in an activity."""
+        activity = await self.get(db, activity_id)
+        if not activity:
+            raise HTTPException(status_code=404, detail="Activity not found")
+
+        # Groups and their vocabularies are eagerly loaded with the activity
+        vocabulary_ids = []
+        for group in activity.vocabulary_groups:
+            vocabulary_ids.extend([v.id for v in group.vocabularies])
+        if not vocabulary_ids:
+            return []
+
+        # Attempt statistics for this activity only, one grouped query
+        attempt_rows = await db.execute(
+            select(
+                SessionAttempt.vocabulary_id,
+                func.count(SessionAttempt.id),
+                func.sum(case((SessionAttempt.is_correct, 1), else_=0))
+            ).join(
+                ActivitySession, SessionAttempt.session_id == ActivitySession.id
+            ).where(
+                SessionAttempt.vocabulary_id.in_(vocabulary_ids),
+                ActivitySession.activity_id == activity_id
+            ).group_by(SessionAttempt.vocabulary_id)
+        )
+        attempts = {row[0]: (row[1] or 0, row[2] or 0) for row in attempt_rows}
+
+        progress_rows = await db.execute(
+            select(VocabularyProgress).where(
+                VocabularyProgress.vocabulary_id.in_(vocabulary_ids)
+            ).order_by(VocabularyProgress.id)
+        )
+        progress_by_vocabulary: Dict[int, VocabularyProgress] = {}
+        for progress in progress_rows.scalars():
+            progress_by_vocabulary.setdefault(progress.vocabulary_id, progress)
+
+        result = []
+        for vocab_id in vocabulary_ids:
+            attempt_count, correct_count = attempts.get(vocab_id, (0, 0))
+            progress = progress_by_vocabulary.get(vocab_id)
+            success_rate = correct_count / attempt_count if attempt_count > 0 else 0.0
+            result.append(ActivityProgressResponse(
+                id=progress.id if progress else None,
+                activity_id=activity_id,
+                vocabulary_id=vocab_id,
+                correct_count=int(correct_count),
+                attempt_count=int(attempt_count),
+                success_rate=float(success_rate),
+                last_attempt=progress.last_reviewed if progress else None
+            ))
+        return result
+
+    def has_vocabulary(self, activity: Activity, vocabulary_id: int) -> bool:
+        """Check if a vocabulary belongs to any of the activity's groups."""
+        return any(
+            vocab.id == vocabulary_id
+            for group in activity.vocabulary_groups
+            for vocab in group.vocabularies
+        )
+
+# Create async service instance
+async_activity_service = AsyncActivityService()
+
+
+class AsyncSessionService(AsyncBaseService[ActivitySession, SessionCreate, SessionCreate]):
+    """Practice session operations for async routes."""
+
+    sort_keys = {"recent": ("created_at", True), "id": ("id", False)}
+    default_sort = "recent"
+
+    def __init__(self):
+        super().__init__(ActivitySession)
+
+# Create async session service instance
+async_session_service = AsyncSessionService()
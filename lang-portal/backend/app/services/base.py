@@ -1,14 +1,73 @@
-from typing import Generic, TypeVar, Type, Optional, List, Any, Dict
+from typing import Generic, TypeVar, Type, Optional, List, Any, Dict, Tuple
 from fastapi import HTTPException
 from pydantic import BaseModel
+from sqlalchemy import DateTime, Select, String, func, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.pagination import Page, after, cached_count, count_key, decode_cursor, encode_cursor, store_count
 from app.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
-class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+class KeysetMixin:
+    """List queries in ``(sort_key, id)`` order with cursor pagination (see app.core.pagination)."""
+
+    model: Any
+    # Sort orders by name: (column, descending); ties are broken by id in the same direction
+    sort_keys: Dict[str, Tuple[str, bool]] = {"id": ("id", False)}
+    default_sort: str = "id"
+
+    def _filters(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            field: value for field, value in filters.items()
+            if value is not None and hasattr(self.model, field)
+        }
+
+    def _sort_columns(self, sort: Optional[str]) -> Tuple[str, List[Any], bool]:
+        sort = sort or self.default_sort
+        if sort not in self.sort_keys:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown sort order: {sort}; use one of {', '.join(self.sort_keys)}"
+            )
+        name, descending = self.sort_keys[sort]
+        if name == "id":
+            return sort, [self.model.id], descending
+        column = getattr(self.model, name)
+        if isinstance(column.type, DateTime):
+            # Compare timestamps as stored: SQLite keeps them as text, and
+            # CURRENT_TIMESTAMP defaults lack the fraction a bound datetime has
+            column = type_coerce(column, String)
+        return sort, [column, self.model.id], descending
+
+    def _list_query(
+        self, filters: Dict[str, Any], sort: Optional[str], cursor: Optional[str]
+    ) -> Tuple[Select, List[Any]]:
+        """Filtered query in sort order after the cursor, and its sort key columns."""
+        sort, columns, descending = self._sort_columns(sort)
+        query = select(self.model)
+        for field, value in self._filters(filters).items():
+            query = query.where(getattr(self.model, field) == value)
+        if cursor is not None:
+            query = query.where(after(columns, decode_cursor(cursor, sort, columns), descending))
+        return query.order_by(*(column.desc() if descending else column for column in columns)), columns
+
+    def _count_query(self, filters: Dict[str, Any]) -> Select:
+        query = select(func.count()).select_from(self.model)
+        for field, value in filters.items():
+            query = query.where(getattr(self.model, field) == value)
+        return query
+
+    def _page(self, rows: List[Any], limit: int, sort: Optional[str], total: int) -> Page:
+        """Page of ``(item, *sort_key)`` rows; a row beyond ``limit`` means there is a next page."""
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(sort or self.default_sort, list(rows[limit - 1][1:]))
+        return Page([row[0] for row in rows[:limit]], next_cursor, total)
+
+class BaseService(KeysetMixin, Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
@@ -17,14 +76,39 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db.get(self.model, id)
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100, **filters
+        self, db: Session, *, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, sort: Optional[str] = None, **filters
     ) -> List[ModelType]:
-        """Get multiple records with optional filtering."""
-        query = db.query(self.model)
-        for field, value in filters.items():
-            if value is not None and hasattr(self.model, field):
-                query = query.filter(getattr(self.model, field) == value)
-        return query.offset(skip).limit(limit).all()
+        """Get multiple records with optional filtering.
+
+        With a ``cursor`` from a previous page the records after it are
+        returned and ``skip`` is ignored.
+        """
+        query, _ = self._list_query(filters, sort, cursor)
+        if cursor is None and skip:
+            query = query.offset(skip)
+        return list(db.execute(query.limit(limit)).unique().scalars().all())
+
+    def get_page(
+        self, db: Session, *, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, sort: Optional[str] = None, **filters
+    ) -> Page[ModelType]:
+        """Get a page of records, the cursor of the next page and the total."""
+        query, columns = self._list_query(filters, sort, cursor)
+        if cursor is None and skip:
+            query = query.offset(skip)
+        rows = db.execute(query.add_columns(*(column.label(f"sort_key_{i}") for i, column in enumerate(columns))).limit(limit + 1)).unique().all()
+        return self._page(rows, limit, sort, self.count(db, **filters))
+
+    def count(self, db: Session, **filters) -> int:
+        """Count records with optional filtering, reusing a cached total."""
+        filters = self._filters(filters)
+        key = count_key(db.get_bind().engine.url.database, self.model.__tablename__, filters)
+        total = cached_count(key)
+        if total is None:
+            total = db.execute(self._count_query(filters)).scalar()
+            store_count(key, self.model.__tablename__, total)
+        return total
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         """Create a new record."""
@@ -59,4 +143,85 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def exists(self, db: Session, id: int) -> bool:
         """Check if a record exists."""
         obj = db.get(self.model, id)
-        return obj is not None
\ No newline at end of file
+        return obj is not None
+
+class AsyncBaseService(KeysetMixin, Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """``BaseService`` for ``AsyncSession``; queries do not block the event loop."""
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """Get a single record by id."""
+        return await db.get(self.model, id)
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, sort: Optional[str] = None, **filters
+    ) -> List[ModelType]:
+        """Get multiple records with optional filtering.
+
+        With a ``cursor`` from a previous page the records after it are
+        returned and ``skip`` is ignored.
+        """
+        query, _ = self._list_query(filters, sort, cursor)
+        if cursor is None and skip:
+            query = query.offset(skip)
+        result = await db.execute(query.limit(limit))
+        return list(result.unique().scalars().all())
+
+    async def get_page(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None, sort: Optional[str] = None, **filters
+    ) -> Page[ModelType]:
+        """Get a page of records, the cursor of the next page and the total."""
+        query, columns = self._list_query(filters, sort, cursor)
+        if cursor is None and skip:
+            query = query.offset(skip)
+        result = await db.execute(query.add_columns(*(column.label(f"sort_key_{i}") for i, column in enumerate(columns))).limit(limit + 1))
+        return self._page(result.unique().all(), limit, sort, await self.count(db, **filters))
+
+    async def count(self, db: AsyncSession, **filters) -> int:
+        """Count records with optional filtering, reusing a cached total."""
+        filters = self._filters(filters)
+        key = count_key(db.get_bind().engine.url.database, self.model.__tablename__, filters)
+        total = cached_count(key)
+        if total is None:
+            total = (await db.execute(self._count_query(filters))).scalar()
+            store_count(key, self.model.__tablename__, total)
+        return total
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        """Create a new record."""
+        obj_in_data = obj_in.dict()
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: ModelType, obj_in: UpdateSchemaType
+    ) -> ModelType:
+        """Update a record."""
+        obj_data = obj_in.dict(exclude_unset=True)
+        for field, value in obj_data.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def delete(self, db: AsyncSession, *, id: int) -> ModelType:
+        """Delete a record."""
+        obj = await db.get(self.model, id)
+        if not obj:
+            raise HTTPException(status_code=404, detail=f"{self.model.__name__} not found")
+        await db.delete(obj)
+        await db.commit()
+        return obj
+
+    async def exists(self, db: AsyncSession, id: int) -> bool:
+        """Check if a record exists."""
+        result = await db.execute(select(self.model.id).where(self.model.id == id))
+        return result.first() is not None
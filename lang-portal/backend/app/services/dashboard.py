@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta, date, UTC
 from typing import Dict, List, Optional
 from sqlalchemy import func, distinct, and_, case, select, Index, text
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.declarative import declared_attr
 import logging
 
@@ -27,12 +28,14 @@ def __table_args__(cls):
     )
 
 class DashboardService:
+    """Dashboard statistics, queried through an ``AsyncSession``."""
+
     @staticmethod
-    def get_stats(db: Session) -> DashboardStats:
+    async def get_stats(db: AsyncSession) -> DashboardStats:
         """Get dashboard statistics."""
         try:
             # First check if we have any sessions at all
-            session_count = db.query(func.count(ActivitySession.id)).scalar() or 0
+            session_count = (await db.execute(select(func.count(ActivitySession.id)))).scalar() or 0
             
             # Get success rate from attempts
             success_rate_query = text("""
@@ -47,7 +50,7 @@ class DashboardService:
                 FROM session_attempts
                 WHERE is_correct IS NOT NULL
             """)
-            success_rate = float(db.execute(success_rate_query).scalar() or 0.0)
+            success_rate = float((await db.execute(success_rate_query)).scalar() or 0.0)
             success_rate = max(0.0, min(1.0, success_rate))  # Ensure between 0 and 1
 
             # Get activity and group counts
@@ -59,10 +62,10 @@ class DashboardService:
                 LEFT JOIN activity_vocabulary_group avg ON a.id = avg.activity_id
                 LEFT JOIN vocabulary_groups vg ON avg.group_id = vg.id
             """)
-            counts = db.execute(counts_query).first()
+            counts = (await db.execute(counts_query)).first()
             
             # Calculate study streak
-            streak = DashboardService._calculate_study_streak(db)
+            streak = await DashboardService._calculate_study_streak(db)
 
             stats = DashboardStats(
                 success_rate=success_rate,
@@ -86,7 +89,7 @@ class DashboardService:
             )
 
     @staticmethod
-    def get_progress(db: Session) -> DashboardProgress:
+    async def get_progress(db: AsyncSession) -> DashboardProgress:
         """Get learning progress statistics."""
         try:
             # Get total and studied items counts
@@ -122,7 +125,7 @@ class DashboardService:
                     COALESCE((SELECT mastered FROM mastered_items), 0) as mastered_items
             """)
             
-            result = db.execute(counts_query).first()
+            result = (await db.execute(counts_query)).first()
             
             total_items = max(0, int(result.total_items))
             studied_items = max(0, min(total_items, int(result.studied_items)))
@@ -153,8 +156,8 @@ class DashboardService:
             )
 
     @staticmethod
-    def get_latest_sessions(
-        db: Session,
+    async def get_latest_sessions(
+        db: AsyncSession,
         limit: int = 5
     ) -> List[LatestSession]:
         """Get the most recent study sessions."""
@@ -195,7 +198,7 @@ class DashboardService:
                 LIMIT :limit
             """)
 
-            result = db.execute(query, {"limit": limit})
+            result = await db.execute(query, {"limit": limit})
             
             sessions = []
             for row in result:
@@ -234,7 +237,7 @@ class DashboardService:
             return []
 
     @staticmethod
-    def _calculate_study_streak(db: Session) -> StudyStreak:
+    async def _calculate_study_streak(db: AsyncSession) -> StudyStreak:
         """Calculate the current and longest study streaks."""
         try:
             today = datetime.now(UTC).date()
@@ -284,7 +287,7 @@ class DashboardService:
                 FROM streak_calc
             """)
             
-            result = db.execute(streak_query).first()
+            result = (await db.execute(streak_query)).first()
             
             streak = StudyStreak(
                 current_streak=max(0, int(result.current_streak)),
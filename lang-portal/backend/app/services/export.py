@@ -0,0 +1,168 @@
+"""Streaming exports of vocabularies, progress and session attempts.
+
+Exports select flat column projections with Core ``select()``, so no ORM
+objects or relationships are loaded. ``stream_export`` runs the statement
+on a server-side cursor (``yield_per``) and encodes each partition of
+``EXPORT_BATCH_SIZE`` rows to NDJSON or CSV as it is fetched, so memory
+stays flat however large the table is. Rows are ordered by id; pass the
+last exported id as ``after_id`` to resume an interrupted export.
+
+The whole export reads one snapshot of the database.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import Select, exists, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.models.activity import Session, SessionAttempt
+from app.models.associations import vocabulary_group_association
+from app.models.progress import VocabularyProgress
+from app.models.vocabulary import Vocabulary
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def vocabulary_export(
+    language_pair_id: Optional[int] = None,
+    group_id: Optional[int] = None,
+    after_id: Optional[int] = None
+) -> Select:
+    """Vocabulary rows, optionally of one language pair or group."""
+    stmt = select(
+        Vocabulary.id,
+        Vocabulary.word,
+        Vocabulary.translation,
+        Vocabulary.language_pair_id,
+        Vocabulary.created_at,
+        Vocabulary.updated_at,
+    )
+    if language_pair_id is not None:
+        stmt = stmt.where(Vocabulary.language_pair_id == language_pair_id)
+    if group_id is not None:
+        stmt = stmt.where(exists().where(
+            vocabulary_group_association.c.vocabulary_id == Vocabulary.id,
+            vocabulary_group_association.c.group_id == group_id,
+        ))
+    if after_id is not None:
+        stmt = stmt.where(Vocabulary.id > after_id)
+    return stmt.order_by(Vocabulary.id)
+
+
+def progress_export(
+    language_pair_id: Optional[int] = None,
+    mastered: Optional[bool] = None,
+    after_id: Optional[int] = None
+) -> Select:
+    """Progress rows with the word they belong to."""
+    stmt = select(
+        VocabularyProgress.id,
+        VocabularyProgress.vocabulary_id,
+        Vocabulary.word,
+        Vocabulary.language_pair_id,
+        VocabularyProgress.correct_attempts,
+        VocabularyProgress.incorrect_attempts,
+        VocabularyProgress.mastered,
+        VocabularyProgress.last_reviewed,
+    ).join(Vocabulary, Vocabulary.id == VocabularyProgress.vocabulary_id)
+    if language_pair_id is not None:
+        stmt = stmt.where(Vocabulary.language_pair_id == language_pair_id)
+    if mastered is not None:
+        stmt = stmt.where(VocabularyProgress.mastered == mastered)
+    if after_id is not None:
+        stmt = stmt.where(VocabularyProgress.id > after_id)
+    return stmt.order_by(VocabularyProgress.id)
+
+
+def attempts_export(
+    session_id: Optional[int] = None,
+    activity_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    after_id: Optional[int] = None
+) -> Select:
+    """Session attempt rows with the activity they were made in."""
+    stmt = select(
+        SessionAttempt.id,
+        SessionAttempt.session_id,
+        Session.activity_id,
+        SessionAttempt.vocabulary_id,
+        SessionAttempt.is_correct,
+        SessionAttempt.response_time_ms,
+        SessionAttempt.created_at,
+    ).join(Session, Session.id == SessionAttempt.session_id)
+    if session_id is not None:
+        stmt = stmt.where(SessionAttempt.session_id == session_id)
+    if activity_id is not None:
+        stmt = stmt.where(Session.activity_id == activity_id)
+    if since is not None:
+        stmt = stmt.where(SessionAttempt.created_at >= since)
+    if after_id is not None:
+        stmt = stmt.where(SessionAttempt.id > after_id)
+    return stmt.order_by(SessionAttempt.id)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def encode_ndjson(columns: List[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """One JSON object per row."""
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+class _CsvEncoder:
+    """Encodes batches of rows as CSV, reusing one buffer."""
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        self._writer.writerows([_csv_value(value) for value in row] for row in rows)
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+async def stream_export(
+    engine: AsyncEngine,
+    stmt: Select,
+    export_format: str,
+    batch_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """Run an export statement on a server-side cursor and yield encoded batches."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    columns: List[str] = [column.key for column in stmt.selected_columns]
+    csv_encoder: Optional[_CsvEncoder] = None
+    if export_format == "csv":
+        csv_encoder = _CsvEncoder()
+        yield csv_encoder.encode([columns])
+
+    async with engine.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield csv_encoder.encode(rows) if csv_encoder else encode_ndjson(columns, rows)
+
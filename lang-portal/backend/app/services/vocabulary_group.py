@@ -1,9 +1,11 @@
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, true
 from sqlalchemy.exc import IntegrityError
 
+from app.core.conditional import ResourceVersion
+from app.models.associations import activity_vocabulary_group, vocabulary_group_association
 from app.models.vocabulary_group import VocabularyGroup
 from app.models.vocabulary import Vocabulary
 from app.models.activity import Activity
@@ -11,6 +13,8 @@ from app.schemas.vocabulary_group import VocabularyGroupCreate, VocabularyGroupU
 from app.services.base import BaseService
 
 class VocabularyGroupService(BaseService[VocabularyGroup, VocabularyGroupCreate, VocabularyGroupUpdate]):
+    sort_keys = {"id": ("id", False), "name": ("name", False), "recent": ("created_at", True)}
+
     def __init__(self):
         super().__init__(VocabularyGroup)
 
@@ -44,6 +48,45 @@ class VocabularyGroupService(BaseService[VocabularyGroup, VocabularyGroupCreate,
             .filter(VocabularyGroup.id == id)\
             .first()
 
+    def get_vocabulary_counts(self, db: Session, *, group_ids: List[int]) -> Dict[int, int]:
+        """Count the vocabularies of several groups in one query."""
+        if not group_ids:
+            return {}
+        rows = db.execute(
+            select(vocabulary_group_association.c.group_id, func.count())
+            .where(vocabulary_group_association.c.group_id.in_(group_ids))
+            .group_by(vocabulary_group_association.c.group_id)
+        )
+        return {group_id: count for group_id, count in rows}
+
+    def get_version(self, db: Session, *, id: int) -> Optional[ResourceVersion]:
+        """Get a group's version from its own, its vocabularies' and its activities' rows in one query."""
+        vocabularies = select(
+            func.max(func.coalesce(Vocabulary.updated_at, Vocabulary.created_at)).label("modified"),
+            func.count(Vocabulary.id).label("count"),
+            func.coalesce(func.sum(Vocabulary.id), 0).label("id_sum")
+        ).join(
+            vocabulary_group_association, vocabulary_group_association.c.vocabulary_id == Vocabulary.id
+        ).where(vocabulary_group_association.c.group_id == id).subquery()
+        activities = select(
+            func.max(func.coalesce(Activity.updated_at, Activity.created_at)).label("modified"),
+            func.count(Activity.id).label("count"),
+            func.coalesce(func.sum(Activity.id), 0).label("id_sum")
+        ).join(
+            activity_vocabulary_group, activity_vocabulary_group.c.activity_id == Activity.id
+        ).where(activity_vocabulary_group.c.group_id == id).subquery()
+
+        row = db.execute(
+            select(
+                func.coalesce(VocabularyGroup.updated_at, VocabularyGroup.created_at),
+                vocabularies.c.modified, vocabularies.c.count, vocabularies.c.id_sum,
+                activities.c.modified, activities.c.count, activities.c.id_sum
+            ).select_from(VocabularyGroup).join(vocabularies, true()).join(activities, true()).where(VocabularyGroup.id == id)
+        ).first()
+        if row is None:
+            return None
+        return ResourceVersion(row[0:2] + row[4:5], row[2:4] + row[5:7])
+
     def get_practice_items(
         self, db: Session, *, group_id: int, reverse: bool = False
     ) -> List[Dict[str, Any]]:
@@ -0,0 +1,260 @@
+"""Streaming bulk vocabulary import with upsert semantics.
+
+Rows are read line by line from CSV (with a ``word,translation[,language_pair_id]``
+header) or JSON Lines, validated with ``VocabularyCreate`` in batches of
+``VOCABULARY_IMPORT_BATCH_SIZE`` and written one batch per transaction
+through the write queue. Each batch is a single ``executemany`` of
+``INSERT ... ON CONFLICT (word, language_pair_id)`` against
+``uix_word_language_pair``: new words are inserted, existing ones get the
+new translation (``on_conflict="update"``) or are left alone
+(``on_conflict="skip"``). With a ``group_id`` the batch's words are added
+to that group in the same transaction.
+
+Invalid rows are skipped and reported with their line number; they never
+fail the rest of the import. Records must fit on one line.
+
+Usage::
+
+    importer = VocabularyImporter(db, writes, "csv", language_pair_id=1)
+    result = await importer.run(lines)
+"""
+import csv
+import json
+import logging
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Set
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import exists, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_tags
+from app.core.config import settings
+from app.db.writer import WriteQueue
+from app.models.associations import vocabulary_group_association
+from app.models.language_pair import LanguagePair
+from app.models.vocabulary import Vocabulary
+from app.models.vocabulary_group import VocabularyGroup
+from app.schemas.vocabulary import VocabularyCreate
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+CSV_FIELDS = ("word", "translation", "language_pair_id")
+
+_vocabularies = Vocabulary.__table__
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+
+def _upsert_statement(dialect: str, on_conflict: str):
+    """executemany-ready upsert of vocabulary rows for the dialect."""
+    stmt = (postgresql if dialect == "postgresql" else sqlite).insert(_vocabularies)
+    if on_conflict == "skip":
+        return stmt.on_conflict_do_nothing(index_elements=["word", "language_pair_id"])
+    return stmt.on_conflict_do_update(
+        index_elements=["word", "language_pair_id"],
+        set_={"translation": stmt.excluded.translation, "updated_at": func.now()},
+        # Rows with an unchanged translation are not rewritten
+        where=_vocabularies.c.translation != stmt.excluded.translation,
+    )
+
+
+def _attach_statement(group_id: int, language_pair_id: int, words: List[str]):
+    """Add the given words to a group, skipping words already in it."""
+    association = vocabulary_group_association
+    vocabulary_ids = select(_vocabularies.c.id, literal(group_id)).where(
+        _vocabularies.c.language_pair_id == language_pair_id,
+        _vocabularies.c.word.in_(words),
+        ~exists().where(
+            association.c.vocabulary_id == _vocabularies.c.id,
+            association.c.group_id == group_id,
+        ),
+    )
+    return insert(association).from_select(["vocabulary_id", "group_id"], vocabulary_ids)
+
+
+class VocabularyImporter:
+    """Imports vocabulary rows streamed from CSV or JSON Lines."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        writes: WriteQueue,
+        import_format: str,
+        language_pair_id: Optional[int] = None,
+        group_id: Optional[int] = None,
+        on_conflict: str = "update",
+        batch_size: Optional[int] = None,
+        max_errors: Optional[int] = None,
+    ):
+        if import_format not in IMPORT_FORMATS:
+            raise ValueError(f"Unknown import format: {import_format}")
+        if on_conflict not in ("update", "skip"):
+            raise ValueError(f"Unknown conflict handling: {on_conflict}")
+        self.db = db
+        self.writes = writes
+        self.import_format = import_format
+        self.language_pair_id = language_pair_id
+        self.group_id = group_id
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size or settings.VOCABULARY_IMPORT_BATCH_SIZE
+        self.max_errors = settings.VOCABULARY_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+        self._fieldnames: Optional[List[str]] = None
+        self._known_pairs: Dict[int, bool] = {}
+        self._group_pair_id: Optional[int] = None
+        self._result = {
+            "processed": 0, "written": 0, "unchanged": 0, "duplicates": 0, "invalid": 0,
+            "batches": 0, "errors": [], "duration_seconds": 0.0, "rows_per_second": 0.0,
+        }
+
+    async def run(self, lines: AsyncIterable[str]) -> Dict[str, Any]:
+        """Import all rows and return the counts, errors and throughput."""
+        await self._check_target()
+        start = time.perf_counter()
+        batch: List[tuple] = []
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            if self.import_format == "csv" and self._fieldnames is None:
+                self._read_header(line)
+                continue
+            batch.append((line_number, line))
+            if len(batch) >= self.batch_size:
+                await self._import_batch(batch)
+                batch = []
+        if batch:
+            await self._import_batch(batch)
+
+        if self.import_format == "csv" and self._fieldnames is None:
+            raise HTTPException(status_code=400, detail="CSV import is missing its header line")
+
+        elapsed = time.perf_counter() - start
+        self._result["duration_seconds"] = round(elapsed, 3)
+        self._result["rows_per_second"] = round(self._result["processed"] / elapsed, 1) if elapsed else 0.0
+        logger.info(
+            f"Imported {self._result['written']} of {self._result['processed']} vocabulary rows "
+            f"in {elapsed:.2f}s ({self._result['rows_per_second']} rows/s)"
+        )
+        return self._result
+
+    async def _check_target(self) -> None:
+        """Validate the group and default language pair before reading any rows."""
+        if self.group_id is not None:
+            # Only the pair; loading the group would load its whole vocabulary
+            group_pair_id = (await self.db.execute(
+                select(VocabularyGroup.language_pair_id).where(VocabularyGroup.id == self.group_id)
+            )).scalar()
+            if group_pair_id is None:
+                raise HTTPException(status_code=404, detail="Vocabulary group not found")
+            if self.language_pair_id not in (None, group_pair_id):
+                raise HTTPException(
+                    status_code=400,
+                    detail="Language pair does not match the vocabulary group's language pair"
+                )
+            self._group_pair_id = self.language_pair_id = group_pair_id
+        if self.language_pair_id is not None and not await self._pair_exists(self.language_pair_id):
+            raise HTTPException(status_code=404, detail="Language pair not found")
+
+    def _read_header(self, line: str) -> None:
+        fieldnames = [name.strip().lower() for name in next(csv.reader([line]))]
+        missing = {"word", "translation"} - set(fieldnames)
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"CSV header is missing columns: {', '.join(sorted(missing))}"
+            )
+        self._fieldnames = fieldnames
+
+    def _parse(self, line: str) -> Dict[str, Any]:
+        if self.import_format == "jsonl":
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("Expected a JSON object")
+            return row
+        values = next(csv.reader([line]))
+        if len(values) != len(self._fieldnames):
+            raise ValueError(f"Expected {len(self._fieldnames)} columns, got {len(values)}")
+        return {name: value for name, value in zip(self._fieldnames, values) if name in CSV_FIELDS}
+
+    async def _pair_exists(self, language_pair_id: int) -> bool:
+        if language_pair_id not in self._known_pairs:
+            result = await self.db.execute(select(LanguagePair.id).where(LanguagePair.id == language_pair_id))
+            self._known_pairs[language_pair_id] = result.first() is not None
+        return self._known_pairs[language_pair_id]
+
+    def _error(self, line_number: int, message: str) -> None:
+        self._result["invalid"] += 1
+        if len(self._result["errors"]) < self.max_errors:
+            self._result["errors"].append({"line": line_number, "error": message})
+
+    async def _validate(self, batch: List[tuple]) -> List[Dict[str, Any]]:
+        """Valid rows of a batch, the last occurrence winning for repeated words."""
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        for line_number, line in batch:
+            self._result["processed"] += 1
+            try:
+                raw = self._parse(line)
+                for field in ("word", "translation"):
+                    if isinstance(raw.get(field), str):
+                        raw[field] = raw[field].strip()
+                if raw.get("language_pair_id") in (None, ""):
+                    raw["language_pair_id"] = self.language_pair_id
+                row = VocabularyCreate.model_validate(raw)
+            except ValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"])
+                self._error(line_number, f"{field}: {error['msg']}" if field else error["msg"])
+                continue
+            except (ValueError, csv.Error) as e:
+                self._error(line_number, str(e))
+                continue
+            if self._group_pair_id is not None and row.language_pair_id != self._group_pair_id:
+                self._error(line_number, "language_pair_id: does not match the vocabulary group")
+                continue
+            if not await self._pair_exists(row.language_pair_id):
+                self._error(line_number, "language_pair_id: language pair not found")
+                continue
+            key = (row.word, row.language_pair_id)
+            if key in rows:
+                self._result["duplicates"] += 1
+            rows[key] = row.model_dump()
+        return list(rows.values())
+
+    async def _import_batch(self, batch: List[tuple]) -> None:
+        rows = await self._validate(batch)
+        if not rows:
+            return
+        group_id, pair_id = self.group_id, self._group_pair_id
+        on_conflict = self.on_conflict
+
+        async def write_batch(db: AsyncSession) -> int:
+            result = await db.execute(_upsert_statement(db.get_bind().dialect.name, on_conflict), rows)
+            if group_id is not None:
+                await db.execute(_attach_statement(group_id, pair_id, [row["word"] for row in rows]))
+            return result.rowcount
+
+        written = await self.writes.submit(write_batch)
+        self._result["batches"] += 1
+        self._result["written"] += written
+        self._result["unchanged"] += len(rows) - written
+
+        # Core statements bypass the ORM flush that collects cache tags
+        tags: Set[str] = {"table:vocabularies"}
+        if group_id is not None:
+            tags.update({"table:vocabulary_groups", f"vocabulary_groups:{group_id}"})
+        invalidate_tags(tags)
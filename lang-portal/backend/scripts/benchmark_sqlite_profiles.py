@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""Compare the SQLite pragma profiles in SQLITE_PROFILES on the app's workloads.
+
+Each profile gets its own copy of a seeded database and runs:
+
+- dashboard:  stats, progress and latest sessions on read-only connections
+- statistics: vocabulary group statistics on a synchronous session
+- attempts:   concurrent attempt inserts through the single-writer queue
+
+Usage:
+    python scripts/benchmark_sqlite_profiles.py [--profiles balanced throughput]
+        [--iterations 200] [--concurrency 8] [--scale 1]
+"""
+import argparse
+import asyncio
+import logging
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import app.models  # noqa: E402,F401  Registers all mappers
+from app.api.v1.endpoints.statistics import get_vocabulary_group_statistics  # noqa: E402
+from app.core.config import Settings, settings  # noqa: E402
+from app.core.metrics import WriteQueueMetrics  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+from app.db.database import use_immediate_transactions  # noqa: E402
+from app.db.pragmas import configure_sqlite  # noqa: E402
+from app.db.writer import WriteQueue  # noqa: E402
+from app.models.activity import SessionAttempt  # noqa: E402
+from app.services.dashboard import dashboard_service  # noqa: E402
+
+GROUPS = 20
+WORDS_PER_GROUP = 100
+SESSIONS = 500
+ATTEMPTS_PER_SESSION = 40
+
+
+def seed(path: Path, scale: int) -> None:
+    """Create the schema and a realistic amount of learning history."""
+    engine = create_engine(f"sqlite:///{path}")
+    configure_sqlite(engine, profile="throughput")
+    Base.metadata.create_all(engine)
+    tables = Base.metadata.tables
+    groups, words, sessions = GROUPS * scale, WORDS_PER_GROUP, SESSIONS * scale
+    now = datetime.now(UTC)
+
+    with engine.begin() as conn:
+        conn.execute(insert(tables["languages"]), [
+            {"id": 1, "code": "en", "name": "English"}, {"id": 2, "code": "de", "name": "German"},
+        ])
+        conn.execute(insert(tables["language_pairs"]), [
+            {"id": 1, "source_language_id": 1, "target_language_id": 2},
+        ])
+        conn.execute(insert(tables["vocabulary_groups"]), [
+            {"id": g, "name": f"Group {g}", "language_pair_id": 1} for g in range(1, groups + 1)
+        ])
+        conn.execute(insert(tables["vocabularies"]), [
+            {"id": v, "word": f"word{v}", "translation": f"wort{v}", "language_pair_id": 1}
+            for v in range(1, groups * words + 1)
+        ])
+        conn.execute(insert(tables["vocabulary_group_association"]), [
+            {"vocabulary_id": v, "group_id": (v - 1) // words + 1} for v in range(1, groups * words + 1)
+        ])
+        conn.execute(insert(tables["vocabulary_progress"]), [
+            {"vocabulary_id": v, "correct_attempts": v % 7, "incorrect_attempts": v % 3,
+             "mastered": v % 5 == 0, "last_reviewed": now}
+            for v in range(1, groups * words + 1)
+        ])
+        conn.execute(insert(tables["activities"]), [
+            {"id": g, "type": "flashcard", "name": f"Activity {g}", "practice_direction": "forward"}
+            for g in range(1, groups + 1)
+        ])
+        conn.execute(insert(tables["activity_vocabulary_group"]), [
+            {"activity_id": g, "group_id": g} for g in range(1, groups + 1)
+        ])
+        conn.execute(insert(tables["sessions"]), [
+            {"id": s, "activity_id": s % groups + 1, "start_time": now - timedelta(hours=s),
+             "end_time": now - timedelta(hours=s) + timedelta(minutes=10), "created_at": now - timedelta(hours=s)}
+            for s in range(1, sessions + 1)
+        ])
+        conn.execute(insert(tables["session_attempts"]), [
+            {"session_id": s, "vocabulary_id": (s % groups) * words + a % words + 1,
+             "is_correct": (s + a) % 3 != 0, "response_time_ms": 500 + a * 10}
+            for s in range(1, sessions + 1) for a in range(ATTEMPTS_PER_SESSION)
+        ])
+    engine.dispose()
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles in milliseconds."""
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "ops_per_sec": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+    }
+
+
+async def run_concurrent(operation: Callable[[int], Awaitable[None]], iterations: int, concurrency: int) -> Dict[str, float]:
+    """Run an async operation ``iterations`` times, ``concurrency`` at a time."""
+    latencies: List[float] = []
+    counter = iter(range(iterations))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            await operation(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def benchmark_async(path: Path, profile: str, iterations: int, concurrency: int, scale: int) -> Dict[str, Dict]:
+    read_engine = create_async_engine(
+        Settings(DATABASE_URL=f"sqlite:///{path}").ASYNC_READ_ONLY_DATABASE_URL,
+        pool_size=concurrency, max_overflow=0
+    )
+    configure_sqlite(read_engine.sync_engine, profile=profile, read_only=True)
+    ReadSession = async_sessionmaker(bind=read_engine, expire_on_commit=False)
+
+    writer_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=1, max_overflow=0)
+    configure_sqlite(writer_engine.sync_engine, profile=profile)
+    use_immediate_transactions(writer_engine)
+    metrics = WriteQueueMetrics()
+    writes = WriteQueue(async_sessionmaker(bind=writer_engine, expire_on_commit=False), metrics=metrics)
+
+    async def dashboard(i: int) -> None:
+        async with ReadSession() as db:
+            await dashboard_service.get_stats(db)
+            await dashboard_service.get_progress(db)
+            await dashboard_service.get_latest_sessions(db, limit=10)
+
+    async def attempt(i: int) -> None:
+        async def add_attempt(db):
+            db.add(SessionAttempt(
+                session_id=i % (SESSIONS * scale) + 1,
+                vocabulary_id=i % (GROUPS * scale * WORDS_PER_GROUP) + 1,
+                is_correct=i % 2 == 0,
+                response_time_ms=800
+            ))
+            await db.flush()
+        await writes.submit(add_attempt)
+
+    results = {
+        "dashboard": await run_concurrent(dashboard, iterations, concurrency),
+        "attempts": await run_concurrent(attempt, iterations * 5, concurrency * 4),
+    }
+    results["attempts"]["avg_batch"] = metrics.to_dict()["avg_batch_size"]
+    await writes.close()
+    await read_engine.dispose()
+    await writer_engine.dispose()
+    return results
+
+
+def benchmark_statistics(path: Path, profile: str, iterations: int, scale: int) -> Dict[str, float]:
+    engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+    configure_sqlite(engine, profile=profile)
+    SyncSession = sessionmaker(bind=engine, expire_on_commit=False)
+    latencies: List[float] = []
+    start = time.perf_counter()
+    with SyncSession() as db:
+        for i in range(iterations):
+            began = time.perf_counter()
+            get_vocabulary_group_statistics(i % (GROUPS * scale) + 1, db)
+            db.expunge_all()
+            latencies.append(time.perf_counter() - began)
+    result = summarize(latencies, time.perf_counter() - start)
+    engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=sorted(settings.SQLITE_PROFILES))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scale", type=int, default=1, help="Multiplier for the seeded data volume")
+    args = parser.parse_args()
+
+    # The dashboard streak query logs errors on SQLite; keep the report readable
+    logging.basicConfig(level=logging.CRITICAL)
+
+    workdir = Path(tempfile.mkdtemp(prefix="sqlite-bench-"))
+    try:
+        template = workdir / "template.db"
+        print(f"Seeding benchmark database (scale {args.scale})...")
+        seed(template, args.scale)
+
+        print(f"\n{'profile':<12} {'workload':<11} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for profile in args.profiles:
+            path = workdir / f"{profile}.db"
+            shutil.copy(template, path)
+            results = asyncio.run(benchmark_async(path, profile, args.iterations, args.concurrency, args.scale))
+            results["statistics"] = benchmark_statistics(path, profile, args.iterations, args.scale)
+            for workload in ("dashboard", "statistics", "attempts"):
+                r = results[workload]
+                line = f"{profile:<12} {workload:<11} {r['ops_per_sec']:>9.1f} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f}"
+                if "avg_batch" in r:
+                    line += f"  (avg {r['avg_batch']} writes/commit)"
+                print(line)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Bulk import vocabulary from a CSV or JSON Lines file into the app database.
+
+CSV files need a ``word,translation[,language_pair_id]`` header; JSON Lines
+files hold one object with the same fields per line. Existing words are
+updated (or kept with ``--on-conflict skip``) and invalid rows are reported
+without stopping the import.
+
+Usage:
+    python scripts/import_vocabulary.py words.csv --language-pair-id 1
+        [--group-id 3] [--on-conflict update|skip] [--batch-size 1000]
+        [--format csv|jsonl]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import app.models  # noqa: E402,F401  Registers all mappers
+from app.db.database import ReadSessionLocal, dispose_async_engines  # noqa: E402
+from app.db.writer import write_queue  # noqa: E402
+from app.services.vocabulary_import import VocabularyImporter  # noqa: E402
+
+EXTENSION_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+async def read_lines(path: Path) -> AsyncIterator[str]:
+    """Lines of the file, without loading it into memory."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+async def run(args: argparse.Namespace, import_format: str) -> Optional[dict]:
+    try:
+        async with ReadSessionLocal() as db:
+            importer = VocabularyImporter(
+                db, write_queue, import_format,
+                language_pair_id=args.language_pair_id,
+                group_id=args.group_id,
+                on_conflict=args.on_conflict,
+                batch_size=args.batch_size,
+                max_errors=args.max_errors,
+            )
+            return await importer.run(read_lines(args.path))
+    except HTTPException as e:
+        print(f"Import failed: {e.detail}", file=sys.stderr)
+        return None
+    finally:
+        await write_queue.close()
+        await dispose_async_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+    parser.add_argument("--language-pair-id", type=int, help="Used for rows without a language_pair_id")
+    parser.add_argument("--group-id", type=int, help="Add the imported words to this vocabulary group")
+    parser.add_argument("--on-conflict", choices=["update", "skip"], default="update")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--max-errors", type=int, help="Number of rejected rows to list")
+    args = parser.parse_args()
+
+    import_format = args.format or EXTENSION_FORMATS.get(args.path.suffix.lower())
+    if import_format is None:
+        parser.error("cannot tell the format from the file extension; pass --format")
+
+    result = asyncio.run(run(args, import_format))
+    if result is None:
+        sys.exit(1)
+
+    print(
+        f"Processed {result['processed']} rows in {result['duration_seconds']}s "
+        f"({result['rows_per_second']} rows/s)"
+    )
+    print(
+        f"  written: {result['written']}  unchanged: {result['unchanged']}  "
+        f"duplicates: {result['duplicates']}  invalid: {result['invalid']}  batches: {result['batches']}"
+    )
+    for error in result["errors"]:
+        print(f"  line {error['line']}: {error['error']}")
+    if result["invalid"] > len(result["errors"]):
+        print(f"  ... and {result['invalid'] - len(result['errors'])} more invalid rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ def test_cache():
     cache._cache_dir = cache_dir
     yield cache
     # Cleanup
+    cache.close()
     for file in cache_dir.glob("*.cache"):
         try:
             file.unlink()
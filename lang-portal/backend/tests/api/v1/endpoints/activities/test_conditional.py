@@ -0,0 +1,41 @@
+"""Tests for conditional GETs on activity practice items."""
+from app.models.activity import Activity
+from app.models.language import Language
+from app.models.language_pair import LanguagePair
+from app.models.vocabulary import Vocabulary
+from app.models.vocabulary_group import VocabularyGroup
+
+
+def _seed_activity(SessionFactory) -> int:
+    with SessionFactory() as db:
+        source, target = Language(code="en", name="English"), Language(code="de", name="German")
+        db.add_all([source, target])
+        db.flush()
+        pair = LanguagePair(source_language_id=source.id, target_language_id=target.id)
+        db.add(pair)
+        db.flush()
+        group = VocabularyGroup(name="Verbs", description="Verbs", language_pair_id=pair.id)
+        group.vocabularies = [Vocabulary(word="run", translation="laufen", language_pair_id=pair.id)]
+        activity = Activity(type="flashcard", name="Daily", practice_direction="forward")
+        activity.vocabulary_groups = [group]
+        db.add(activity)
+        db.commit()
+        return activity.id
+
+
+def test_practice_etag_and_not_modified(app_client):
+    """Test that practice items revalidate every time and answer 304 for a current ETag."""
+    client, SessionFactory = app_client
+    activity_id = _seed_activity(SessionFactory)
+    url = f"/api/v1/activities/activities/{activity_id}/practice"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert [item["word"] for item in response.json()["items"]] == ["run"]
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
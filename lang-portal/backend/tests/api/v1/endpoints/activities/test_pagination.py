@@ -0,0 +1,21 @@
+"""Tests for activity list pagination through the full application."""
+from app.models.activity import Activity
+
+
+def test_skip_and_cursor_pass_privacy_pipeline(app_client):
+    """Test that the list's skip and cursor parameters are allowed by the route rule."""
+    client, SessionFactory = app_client
+    with SessionFactory() as db:
+        db.add_all([
+            Activity(type="flashcard", name=f"Activity {i}", practice_direction="forward")
+            for i in range(3)
+        ])
+        db.commit()
+
+    response = client.get("/api/v1/activities/activities?skip=1&limit=1")
+    assert response.status_code == 200
+    assert [activity["name"] for activity in response.json()] == ["Activity 1"]
+
+    response = client.get(f"/api/v1/activities/activities?limit=1&cursor={response.headers['x-next-cursor']}")
+    assert response.status_code == 200
+    assert [activity["name"] for activity in response.json()] == ["Activity 2"]
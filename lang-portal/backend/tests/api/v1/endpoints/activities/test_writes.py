@@ -0,0 +1,55 @@
+"""Tests for activity writes going through the single writer."""
+from app.db.writer import get_write_queue
+from app.main import app
+from app.models.activity import Activity
+from app.models.language import Language
+from app.models.language_pair import LanguagePair
+from app.models.vocabulary_group import VocabularyGroup
+
+
+def _seed_group(SessionFactory) -> int:
+    with SessionFactory() as db:
+        source, target = Language(code="en", name="English"), Language(code="de", name="German")
+        db.add_all([source, target])
+        db.flush()
+        pair = LanguagePair(source_language_id=source.id, target_language_id=target.id)
+        db.add(pair)
+        db.flush()
+        group = VocabularyGroup(name="Verbs", description="Verbs", language_pair_id=pair.id)
+        db.add(group)
+        db.commit()
+        return group.id
+
+
+def test_activity_writes_use_write_queue(app_client):
+    """Test that creating, updating and deleting an activity are queued writes."""
+    client, SessionFactory = app_client
+    group_id = _seed_group(SessionFactory)
+    queue = app.dependency_overrides[get_write_queue]()
+    submitted = []
+    submit = queue.submit
+
+    async def counting_submit(job):
+        submitted.append(job.__name__)
+        return await submit(job)
+
+    queue.submit = counting_submit
+
+    created = client.post("/api/v1/activities/activities", json={
+        "type": "flashcard", "name": "Verbs", "practice_direction": "forward",
+        "vocabulary_group_ids": [group_id],
+    })
+    assert created.status_code == 200
+    with SessionFactory() as db:
+        activity_id = db.query(Activity.id).filter_by(name="Verbs").scalar()
+
+    updated = client.put(f"/api/v1/activities/activities/{activity_id}", json={"name": "All verbs"})
+    assert updated.status_code == 200
+    assert updated.json()["name"] == "All verbs"
+    assert client.put("/api/v1/activities/activities/999", json={"name": "Missing"}).status_code == 404
+
+    assert client.delete(f"/api/v1/activities/activities/{activity_id}").status_code == 200
+    with SessionFactory() as db:
+        assert db.get(Activity, activity_id) is None
+
+    assert submitted == ["add_activity", "change_activity", "change_activity", "remove_activity"]
@@ -0,0 +1,40 @@
+"""Tests for the export endpoints through the full application."""
+import json
+from datetime import datetime, UTC
+
+from app.models.activity import Activity, Session as ActivitySession, SessionAttempt
+from app.models.language import Language
+from app.models.language_pair import LanguagePair
+from app.models.vocabulary import Vocabulary
+
+
+def test_export_attempts_filtered_by_session(app_client):
+    """Test that session_id, allow-listed for exports, passes the privacy pipeline."""
+    client, SessionFactory = app_client
+    with SessionFactory() as db:
+        source, target = Language(code="en", name="English"), Language(code="de", name="German")
+        db.add_all([source, target])
+        db.flush()
+        pair = LanguagePair(source_language_id=source.id, target_language_id=target.id)
+        db.add(pair)
+        db.flush()
+        vocabulary = Vocabulary(word="laufen", translation="to run", language_pair_id=pair.id)
+        activity = Activity(type="flashcard", name="Verbs", practice_direction="forward")
+        db.add_all([vocabulary, activity])
+        db.flush()
+        sessions = [ActivitySession(activity_id=activity.id, start_time=datetime.now(UTC)) for _ in range(2)]
+        db.add_all(sessions)
+        db.flush()
+        for session in sessions:
+            db.add(SessionAttempt(
+                session_id=session.id, vocabulary_id=vocabulary.id, is_correct=True, response_time_ms=900
+            ))
+        db.commit()
+        session_id = sessions[0].id
+
+    response = client.get(f"/api/v1/export/attempts?session_id={session_id}")
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["session_id"] for row in rows] == [session_id]
+
+    assert client.get("/api/v1/export/attempts?token=1").status_code == 400
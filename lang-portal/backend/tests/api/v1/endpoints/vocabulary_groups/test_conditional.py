@@ -0,0 +1,66 @@
+"""Tests for conditional GETs on vocabulary group resources."""
+from app.models.activity import Activity
+from app.models.language import Language
+from app.models.language_pair import LanguagePair
+from app.models.vocabulary import Vocabulary
+from app.models.vocabulary_group import VocabularyGroup
+
+
+def _seed_group(SessionFactory) -> int:
+    with SessionFactory() as db:
+        source, target = Language(code="en", name="English"), Language(code="de", name="German")
+        db.add_all([source, target])
+        db.flush()
+        pair = LanguagePair(source_language_id=source.id, target_language_id=target.id)
+        db.add(pair)
+        db.flush()
+        group = VocabularyGroup(name="Verbs", description="Verbs", language_pair_id=pair.id)
+        group.vocabularies = [
+            Vocabulary(word="run", translation="laufen", language_pair_id=pair.id),
+            Vocabulary(word="go", translation="gehen", language_pair_id=pair.id),
+        ]
+        group.activities = [Activity(type="flashcard", name="Daily", practice_direction="forward")]
+        db.add(group)
+        db.commit()
+        return group.id
+
+
+def test_group_detail_etag_and_not_modified(app_client):
+    """Test that the group detail carries an ETag and answers 304 for it."""
+    client, SessionFactory = app_client
+    group_id = _seed_group(SessionFactory)
+    url = f"/api/v1/vocabulary-groups/vocabulary-groups/{group_id}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["vocabulary_count"] == 2
+    assert [vocab["word"] for vocab in body["vocabularies"]] == ["go", "run"]
+    assert [activity["name"] for activity in body["activities"]] == ["Daily"]
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+    assert client.get(f"/api/v1/vocabulary-groups/vocabulary-groups/{group_id + 1}").status_code == 404
+
+
+def test_group_practice_etag_and_not_modified(app_client):
+    """Test that group practice items carry an ETag and answer 304 for it."""
+    client, SessionFactory = app_client
+    group_id = _seed_group(SessionFactory)
+    url = f"/api/v1/vocabulary-groups/vocabulary-groups/{group_id}/practice"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    etag = response.headers["etag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    # Reverse practice is a different representation with its own ETag
+    reverse = client.get(f"{url}?reverse=true", headers={"If-None-Match": etag})
+    assert reverse.status_code == 200
+    assert reverse.headers["etag"] != etag
@@ -0,0 +1,47 @@
+"""Tests for cursor pagination headers through the full application."""
+from datetime import datetime, timedelta, UTC
+
+from app.models.language import Language
+from app.models.language_pair import LanguagePair
+from app.models.vocabulary_group import VocabularyGroup
+
+
+def test_pagination_headers_survive_privacy_pipeline(app_client):
+    """Test that X-Total-Count, X-Next-Cursor and Link reach the client and can be followed."""
+    client, SessionFactory = app_client
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    with SessionFactory() as db:
+        source, target = Language(code="en", name="English"), Language(code="de", name="German")
+        db.add_all([source, target])
+        db.flush()
+        pair = LanguagePair(source_language_id=source.id, target_language_id=target.id)
+        db.add(pair)
+        db.flush()
+        db.add_all([
+            VocabularyGroup(
+                name=f"Group {i:03d}", description="", language_pair_id=pair.id,
+                created_at=start + timedelta(minutes=i)
+            )
+            for i in range(120)
+        ])
+        db.commit()
+
+    response = client.get("/api/v1/vocabulary-groups/vocabulary-groups?limit=50&sort=recent")
+    assert response.status_code == 200
+    assert response.headers["x-total-count"] == "120"
+    assert response.headers["link"] == (
+        f'</api/v1/vocabulary-groups/vocabulary-groups?limit=50&sort=recent'
+        f'&cursor={response.headers["x-next-cursor"]}>; rel="next"'
+    )
+
+    names = [group["name"] for group in response.json()]
+    pages = 1
+    while "link" in response.headers:
+        next_url = response.headers["link"].split(">")[0].lstrip("<")
+        response = client.get(next_url)
+        assert response.status_code == 200
+        names.extend(group["name"] for group in response.json())
+        pages += 1
+
+    assert pages == 3
+    assert names == [f"Group {i:03d}" for i in reversed(range(120))]
@@ -1,7 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, event, text
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, UTC, timedelta
 from pathlib import Path
@@ -9,7 +11,9 @@ import shutil
 
 from app.core.config import settings
 from app.db.base_class import Base
-from app.db.database import get_db, engine
+from app.db.database import get_db, get_read_db, get_read_engine, engine, use_immediate_transactions
+from app.db.pragmas import configure_sqlite
+from app.db.writer import WriteQueue, get_write_queue
 from app.main import app
 from app.models.language import Language
 from app.models.language_pair import LanguagePair
@@ -30,18 +34,41 @@ engine = create_engine(
     }
 )
 
+# Async engine on the same test database, for routes using get_read_db;
+# unpooled, since every TestClient runs its own event loop
+async_engine = create_async_engine(
+    TEST_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1),
+    echo=settings.TEST_DB_ECHO,
+    poolclass=NullPool,
+    connect_args={"timeout": 30}
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Writer connection for the write queue, as in app.db.database
+writer_engine = create_async_engine(
+    TEST_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1),
+    echo=settings.TEST_DB_ECHO,
+    poolclass=NullPool,
+    connect_args={"timeout": 30}
+)
+use_immediate_transactions(writer_engine)
+TestingWriterSessionLocal = async_sessionmaker(
+    bind=writer_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Test cache setup
 TEST_CACHE_DIR = Path(settings.BACKEND_DIR) / "data" / "test_cache"
 
-# Enable foreign key support for SQLite
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for better concurrency
-    cursor.execute("PRAGMA synchronous=NORMAL")  # Faster writes with reasonable safety
-    cursor.execute("PRAGMA cache_size=-2000")  # 2MB cache
-    cursor.close()
+# Same SQLite pragmas as the application engines
+configure_sqlite(engine)
+configure_sqlite(async_engine.sync_engine)
+configure_sqlite(writer_engine.sync_engine)
 
 TestingSessionLocal = sessionmaker(
     autocommit=False,
@@ -101,6 +128,7 @@ def test_cache():
     yield cache
     
     # Clean up after test
+    cache.close()
     if TEST_CACHE_DIR.exists():
         shutil.rmtree(TEST_CACHE_DIR)
 
@@ -130,11 +158,70 @@ def client(db_session: Session):
         finally:
             pass
     
+    async def override_get_read_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+    
+    write_queue = WriteQueue(session_factory=TestingWriterSessionLocal)
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_read_engine] = lambda: async_engine
+    app.dependency_overrides[get_write_queue] = lambda: write_queue
     with TestClient(app) as test_client:
         yield test_client
+        test_client.portal.call(write_queue.close)
     app.dependency_overrides.clear()
 
+
+@pytest.fixture(scope="function")
+def app_client(tmp_path):
+    """Client for the full application stack on a fresh database of its own.
+
+    Requests carry a local Origin so the privacy pipeline serves them.
+    Yields the client and a sync session factory for seeding data.
+    """
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    async_url = url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+    reader_engine = create_async_engine(async_url, poolclass=NullPool, connect_args={"timeout": 30})
+    queue_engine = create_async_engine(async_url, poolclass=NullPool, connect_args={"timeout": 30})
+    use_immediate_transactions(queue_engine)
+    for target in (sync_engine, reader_engine.sync_engine, queue_engine.sync_engine):
+        configure_sqlite(target)
+    Base.metadata.create_all(bind=sync_engine)
+    SessionFactory = sessionmaker(bind=sync_engine, autoflush=False, expire_on_commit=False)
+    AsyncSessionFactory = async_sessionmaker(bind=reader_engine, autoflush=False, expire_on_commit=False)
+    write_queue = WriteQueue(session_factory=async_sessionmaker(
+        bind=queue_engine, autoflush=False, expire_on_commit=False
+    ))
+
+    def override_get_db():
+        db = SessionFactory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_read_db():
+        async with AsyncSessionFactory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_read_engine] = lambda: reader_engine
+    app.dependency_overrides[get_write_queue] = lambda: write_queue
+    LocalCache.get_instance().clear()
+    try:
+        with TestClient(app, headers={"Origin": "http://localhost:3000"}) as test_client:
+            yield test_client, SessionFactory
+            test_client.portal.call(write_queue.close)
+    finally:
+        app.dependency_overrides.clear()
+        LocalCache.get_instance().clear()
+        sync_engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def test_language(db_session: Session):
     """Create a test language."""
@@ -12,7 +12,8 @@ from app.core.cache import (
     invalidate_dashboard_cache,
     invalidate_stats_cache,
     test_redis_client,
-    LocalCache
+    LocalCache,
+    _digest as cache_digest
 )
 from app.core.config import settings
 import threading
@@ -44,6 +45,7 @@ def test_cache():
     yield cache
     
     # Cleanup
+    cache.close()
     for file in cache_dir.glob("*.cache"):
         file.unlink()
     cache_dir.rmdir()
@@ -146,6 +148,7 @@ def test_cache_cleanup(test_cache):
     
     # Verify expired cache is cleaned up
     assert not cache_file.exists()
+    new_cache.close()
 
 def test_cache_response_decorator():
     """Test the cache_response decorator privacy features."""
@@ -624,6 +627,53 @@ def test_cache_response_headers():
     stats2 = json.loads(response2.headers["X-Cache-Stats"])
     assert stats2["hit_ratio"] > stats1["hit_ratio"]
 
+
+def test_cache_response_miss_serves_sanitized_body():
+    """Test that a miss serves the same sanitized body later hits will."""
+    app = FastAPI()
+
+    @app.get("/test")
+    @cache_response(prefix="test:sanitized", expire=60)
+    async def test_endpoint(request: Request):
+        return {"data": "test", "password": "secret"}
+
+    client = TestClient(app)
+    miss = client.get("/test")
+    hit = client.get("/test")
+
+    assert miss.headers["X-Cache-Status"] == "MISS"
+    assert hit.headers["X-Cache-Status"] == "HIT"
+    assert miss.content == hit.content
+    assert miss.json()["password"] == "[REDACTED]"
+
+
+def test_cache_response_round_trip_through_file_store(tmp_path):
+    """Test that a cached response survives the per-file store."""
+    with patch.object(settings, 'CACHE_BACKEND', 'files'), \
+            patch.object(settings, 'CACHE_DIR', str(tmp_path)):
+        local = LocalCache()
+    app = FastAPI()
+
+    @app.get("/test")
+    @cache_response(prefix="test:files", expire=60)
+    async def test_endpoint(request: Request):
+        return {"data": "test"}
+
+    try:
+        with patch.object(LocalCache, 'get_instance', return_value=local):
+            client = TestClient(app)
+            miss = client.get("/test")
+            # Only the file tier holds the entry now
+            local._memory.clear()
+            hit = client.get("/test")
+    finally:
+        local.close()
+
+    assert miss.headers["X-Cache-Status"] == "MISS"
+    assert hit.headers["X-Cache-Status"] == "HIT"
+    assert hit.json() == {"data": "test"}
+
+
 def test_cache_response_error_handling():
     """Test that errors are not cached."""
     app = FastAPI()
@@ -782,9 +832,10 @@ class TestLocalCache:
         except HTTPException as exc:
             assert exc.status_code == 413
         
-        # Test total cache size limit
+        # Test total cache size limit with the largest values allowed;
+        # max_entry_size counts the JSON encoded entry, quotes included
         for i in range(100):
-            cache.set(f'key_{i}', 'x' * 1024 * 1024)  # 1MB each
+            cache.set(f'key_{i}', 'x' * (cache.max_entry_size - 2))
         
         # Verify cleanup occurred
         total_size = sum(f.stat().st_size for f in cache.cache_dir.glob('*.cache'))
@@ -864,13 +915,283 @@ class TestLocalCache:
         # Verify file permissions
         assert oct(cache_files[0].stat().st_mode)[-3:] == '600'
     
-    def test_quota_management(self, cache):
+    def test_quota_management(self, cache, monkeypatch):
         """Test cache quota management."""
-        # Fill cache to near max
-        data_size = cache.max_cache_size // 10
-        for i in range(11):  # Slightly over threshold
+        # Entries are capped at max_entry_size (and stored compressed), so
+        # size the quota at ten stored entries rather than filling 100MB
+        data_size = cache.max_entry_size - 2
+        cache.set('quota_key_0', 'x' * data_size)
+        entry_size = cache._get_cache_path('quota_key_0').stat().st_size
+        monkeypatch.setattr(cache, 'max_cache_size', entry_size * 10)
+        for i in range(1, 11):  # Slightly over threshold
             cache.set(f'quota_key_{i}', 'x' * data_size)
-        
+
         # Verify cleanup occurred
         total_size = sum(f.stat().st_size for f in cache.cache_dir.glob('*.cache'))
-        assert total_size < cache.max_cache_size * 0.8  # Should be reduced to below 80%
\ No newline at end of file
+        assert total_size < cache.max_cache_size * 0.8  # Should be reduced to below 80%
+
+class TestMemoryTier:
+    """Test the in-process LRU tier in front of the file tier."""
+    def test_memory_budget_eviction(self):
+        """Test that entries are evicted by byte budget, oldest first."""
+        from app.core.cache import MemoryLRU
+        lru = MemoryLRU(max_bytes=10)
+        lru.set('a', b'"aaaa"', None)
+        lru.set('b', b'"bbbb"', None)
+        assert lru.get('a') is None
+        assert lru.get('b') == b'"bbbb"'
+        assert lru.current_bytes == 6
+
+    def test_oversized_payload_replaces_entry(self):
+        """Test that an update too large for the budget drops the previous payload."""
+        from app.core.cache import MemoryLRU
+        lru = MemoryLRU(max_bytes=10)
+        lru.set('a', b'"aaaa"', None)
+        lru.set('a', b'"' + b'a' * 20 + b'"', None)
+        assert lru.get('a') is None
+        assert len(lru) == 0
+        assert lru.current_bytes == 0
+
+    def test_file_hit_promoted_to_memory(self, cache):
+        """Test that a file tier hit is served from memory afterwards."""
+        cache.set('promote_key', {'value': 1})
+        cache._memory.clear()
+        assert cache.get('promote_key') == {'value': 1}
+        
+        cache._get_cache_path('promote_key').unlink()
+        assert cache.get('promote_key') == {'value': 1}
+    
+    def test_prefix_invalidation(self, cache):
+        """Test that prefix invalidation clears both tiers."""
+        cache.set('dashboard:stats:/a', {'v': 1})
+        cache.set('dashboard:progress:/b', {'v': 2})
+        assert cache.delete_pattern('dashboard:stats:*') == 1
+        assert cache.get('dashboard:stats:/a') is None
+        assert cache.get('dashboard:progress:/b') == {'v': 2}
+
+    def test_redis_hit_promoted_with_ttl_and_tags(self, cache):
+        """Test that a Redis hit is kept locally for its remaining TTL, under its tags."""
+        with patch.object(settings, 'REDIS_ENABLED', True), \
+                patch.object(Cache, 'client', return_value=test_redis_client):
+            cache.set('shared:sessions:/a', {'v': 1}, expire=600, tags=['table:sessions'])
+            # As another worker sees it: the entry is only in Redis
+            cache._memory.clear()
+            cache._remove_file(cache_digest('shared:sessions:/a'))
+            test_redis_client.expire('shared:sessions:/a', 30)
+
+            assert cache.get('shared:sessions:/a') == {'v': 1}
+            entry = cache._index[cache_digest('shared:sessions:/a')]
+            assert 25 < entry.expires_at - time.time() <= 30
+
+            cache.delete_tags(['table:sessions'])
+            assert cache_digest('shared:sessions:/a') not in cache._index
+            assert cache.get('shared:sessions:/a') is None
+
+    def test_invalidations_reach_other_workers(self, cache, tmp_path):
+        """Test that an invalidation is broadcast to another worker's local tiers."""
+        with patch.object(settings, 'REDIS_ENABLED', True), \
+                patch.object(Cache, 'client', return_value=test_redis_client):
+            with patch.object(settings, 'CACHE_DIR', str(tmp_path)):
+                worker = LocalCache()
+            worker._start_listener()
+            try:
+                deadline = time.time() + 5
+                while not test_redis_client.pubsub_numsub(settings.REDIS_INVALIDATION_CHANNEL)[0][1]:
+                    assert time.time() < deadline
+                    time.sleep(0.05)
+
+                worker.set('activity:sessions:/1', {'v': 1}, expire=600, tags=['table:session_attempts'])
+                test_redis_client.flushdb()
+                cache.delete_tags(['table:session_attempts'])
+
+                while cache_digest('activity:sessions:/1') in worker._index:
+                    assert time.time() < deadline
+                    time.sleep(0.05)
+                assert worker.get('activity:sessions:/1') is None
+            finally:
+                worker.close()
+
+    def test_local_ttl_capped_without_redis(self, cache):
+        """Test that local TTLs are capped when Redis cannot broadcast invalidations."""
+        cap = settings.CACHE_LOCAL_MAX_EXPIRE
+        assert cache.effective_expire(3600) == cap
+        assert cache.effective_expire(10) == 10
+        cache.set('capped:key', 'value', expire=3600)
+        entry = cache._index[cache_digest('capped:key')]
+        assert entry.expires_at - time.time() <= cap
+
+        cache.set_bytes('capped:stale', b'"value"', expire=3600, stale_ttl=300)
+        entry = cache._index[cache_digest('capped:stale')]
+        assert cap + 290 < entry.expires_at - time.time() <= cap + 300
+
+    def test_cache_response_reports_effective_ttl(self):
+        """Test that response headers carry the capped TTL, not the requested one."""
+        app = FastAPI()
+
+        @app.get("/capped")
+        @cache_response(prefix="test:capped", expire=3600)
+        async def capped(request: Request):
+            return {"data": "test"}
+
+        client = TestClient(app)
+        for status in ("MISS", "HIT"):
+            response = client.get("/capped")
+            assert response.headers["X-Cache-Status"] == status
+            assert response.headers["Cache-Control"] == f"private, max-age={settings.CACHE_LOCAL_MAX_EXPIRE}"
+
+    def test_list_entries_by_pattern(self, cache):
+        """Test that listed entries can be narrowed to a key prefix."""
+        cache.set('dashboard:stats:1', {'v': 1})
+        cache.set('activity:sessions:1', {'v': 2})
+
+        listed = cache.list_entries(pattern='dashboard:stats:*')
+        assert [entry['key'] for entry in listed] == [cache_digest('dashboard:stats:1')[:16]]
+        assert len(cache.list_entries(pattern='*')) == 2
+
+    def test_large_entries_stored_compressed(self, cache):
+        """Test that large values are compressed in every local tier and sized by stored bytes."""
+        value = {'words': ['vocabulary'] * 2000}
+        cache.set('compress_key', value)
+        
+        stored = cache._memory.get(cache_digest('compress_key'))
+        assert len(stored) < len(json.dumps(value)) / 4
+        assert cache.metrics.total_size < len(json.dumps(value)) / 4
+        assert cache.metrics.get_compression_stats()['entries'] >= 1
+        
+        cache._memory.clear()
+        assert cache.get('compress_key') == value
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent cache misses."""
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self, cache):
+        """Test that concurrent misses for one key run the endpoint once."""
+        calls = []
+        
+        @cache_response(prefix="test:single_flight")
+        async def endpoint():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"value": 1}
+        
+        coalesced_before = cache.metrics.coalesced_count
+        results = await asyncio.gather(*[endpoint() for _ in range(5)])
+        
+        assert len(calls) == 1
+        assert all(result == {"value": 1} for result in results)
+        assert cache.metrics.coalesced_count - coalesced_before == 4
+    
+    @pytest.mark.asyncio
+    async def test_coalesce_timeout_recomputes(self, cache):
+        """Test that waiters past the timeout compute on their own."""
+        calls = []
+        
+        @cache_response(prefix="test:single_flight_timeout", coalesce_timeout=0.01)
+        async def endpoint():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"value": 1}
+        
+        await asyncio.gather(endpoint(), endpoint())
+        assert len(calls) == 2
+
+
+class TestStaleWhileRevalidate:
+    """Test serving stale entries while refreshing in the background."""
+    @pytest.mark.asyncio
+    async def test_stale_value_served_and_refreshed(self, cache):
+        """Test that an expired entry is served once and refreshed in the background."""
+        calls = []
+        
+        @cache_response(prefix="test:swr", expire=1, stale_ttl=60)
+        async def endpoint():
+            calls.append(1)
+            return {"version": len(calls)}
+        
+        assert await endpoint() == {"version": 1}
+        await asyncio.sleep(1.1)
+        
+        # Stale value is returned immediately, refresh runs in the background
+        assert await endpoint() == {"version": 1}
+        await asyncio.sleep(0.05)
+        assert await endpoint() == {"version": 2}
+        assert len(calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_refresh_failure_counted(self, cache):
+        """Test that failing background refreshes keep the stale value."""
+        calls = []
+        
+        @cache_response(prefix="test:swr_failure", expire=1, stale_ttl=60)
+        async def endpoint():
+            calls.append(1)
+            if len(calls) > 1:
+                raise ValueError("refresh failed")
+            return {"version": 1}
+        
+        failures_before = cache.metrics.refresh_failures
+        await endpoint()
+        await asyncio.sleep(1.1)
+        assert await endpoint() == {"version": 1}
+        await asyncio.sleep(0.05)
+        assert cache.metrics.refresh_failures == failures_before + 1
+
+    @pytest.mark.asyncio
+    async def test_stale_window_follows_local_cap(self, cache, monkeypatch):
+        """Test that the fresh window is the capped TTL, not the requested one."""
+        monkeypatch.setattr(settings, 'CACHE_LOCAL_MAX_EXPIRE', 1)
+        calls = []
+
+        @cache_response(prefix="test:swr_capped", expire=3600, stale_ttl=120)
+        async def endpoint():
+            calls.append(1)
+            return {"version": len(calls)}
+
+        assert await endpoint() == {"version": 1}
+        await asyncio.sleep(1.1)
+
+        # Past the capped TTL the entry is stale but still stored, so it is served and refreshed
+        assert await endpoint() == {"version": 1}
+        await asyncio.sleep(0.05)
+        assert await endpoint() == {"version": 2}
+        assert len(calls) == 2
+
+
+class TestExpiryScheduler:
+    """Test heap-driven removal of expired entries."""
+    def test_expire_due_removes_only_due_entries(self, cache):
+        """Test that only entries past their deadline are removed."""
+        cache.set('expiry:short', 'value', expire=1)
+        cache.set('expiry:long', 'value', expire=3600)
+        cleaned_before = cache.metrics.cleaned_entries
+        
+        assert cache.expire_due(now=time.time() + 2) == 1
+        
+        assert cache.get('expiry:long') == 'value'
+        assert len(cache._get_all_keys()) == 1
+        assert cache.metrics.cleaned_entries == cleaned_before + 1
+    
+    def test_expire_due_is_bounded(self, cache):
+        """Test that one pass removes at most the batch limit."""
+        for i in range(5):
+            cache.set(f'expiry:batch:{i}', i, expire=1)
+        
+        assert cache.expire_due(now=time.time() + 2, limit=2) == 2
+        assert cache.expire_due(now=time.time() + 2, limit=10) == 3
+    
+    def test_overwritten_entry_keeps_new_deadline(self, cache):
+        """Test that a superseded deadline does not remove the new value."""
+        cache.set('expiry:overwrite', 'old', expire=1)
+        cache.set('expiry:overwrite', 'new', expire=3600)
+        
+        assert cache.expire_due(now=time.time() + 2) == 0
+        assert cache.get('expiry:overwrite') == 'new'
+
+    def test_only_singleton_runs_expiry_thread(self, cache, tmp_path):
+        """Test that extra instances start no background thread to leak."""
+        assert cache._expiry_thread.is_alive()
+        with patch.object(settings, 'CACHE_DIR', str(tmp_path)):
+            other = LocalCache()
+        assert other._expiry_thread is None
+        other.close()
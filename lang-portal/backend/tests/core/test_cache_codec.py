@@ -0,0 +1,74 @@
+"""Tests for the cache value codec."""
+import json
+import pytest
+from app.core.cache_codec import CacheCodec
+from app.core.metrics import CacheMetrics
+
+
+@pytest.fixture
+def metrics():
+    """Create a fresh metrics instance."""
+    return CacheMetrics()
+
+
+@pytest.fixture
+def codec(metrics):
+    """Create a zlib codec with a small threshold."""
+    return CacheCodec("zlib", threshold=64, level=6, metrics=metrics)
+
+
+def test_small_payloads_stored_as_is(codec, metrics):
+    """Test that payloads below the threshold are not compressed."""
+    payload = json.dumps({"v": 1}).encode("utf-8")
+    data = codec.encode(payload)
+    
+    assert data == payload
+    assert codec.decode(data) == payload
+    assert metrics.compressed_entries == 0
+
+
+def test_large_payloads_round_trip(codec, metrics):
+    """Test that large payloads are compressed and recorded in metrics."""
+    payload = json.dumps({"words": ["word"] * 500}).encode("utf-8")
+    data = codec.encode(payload)
+    
+    assert CacheCodec.is_compressed(data)
+    assert len(data) < len(payload)
+    assert codec.decode(data) == payload
+    
+    stats = metrics.get_compression_stats()
+    assert stats["entries"] == 1
+    assert stats["bytes_in"] == len(payload)
+    assert stats["bytes_out"] == len(data)
+    assert stats["overall_ratio"] < 1.0
+    assert stats["compress_cpu"]["count"] == 1
+    assert stats["decompress_cpu"]["count"] == 1
+
+
+def test_incompressible_payloads_stored_as_is(metrics):
+    """Test that compression is skipped when it does not save space."""
+    codec = CacheCodec("zlib", threshold=1, level=6, metrics=metrics)
+    payload = json.dumps("ab").encode("utf-8")
+    data = codec.encode(payload)
+    
+    assert not CacheCodec.is_compressed(data)
+    assert codec.decode(data) == payload
+    assert metrics.compression_bytes_out == len(payload)
+
+
+def test_disabled_compression(metrics):
+    """Test that the "none" algorithm never compresses."""
+    codec = CacheCodec("none", threshold=0, level=6, metrics=metrics)
+    payload = json.dumps({"words": ["word"] * 500}).encode("utf-8")
+    
+    assert codec.encode(payload) == payload
+
+
+def test_text_form_round_trip(codec):
+    """Test the text representation used by the Redis tier."""
+    for value in ({"v": 1}, {"words": ["word"] * 500}):
+        data = codec.encode(json.dumps(value).encode("utf-8"))
+        text = CacheCodec.to_text(data)
+        assert isinstance(text, str)
+        assert CacheCodec.from_text(text) == data
+    assert CacheCodec.from_text(None) is None
@@ -147,4 +147,41 @@ def test_invalidate_cache_large_dataset():
     assert invalidate_stats_cache(test_mode=True)
     
     # Verify all keys are gone
-    assert test_redis_client.dbsize() == 0 
\ No newline at end of file
+    assert test_redis_client.dbsize() == 0
+
+
+def test_commit_invalidates_tagged_entries(db_session):
+    """Test that committing a change invalidates entries tagged with its row"""
+    from app.core.cache import LocalCache
+    from app.models.activity import Activity
+    
+    cache = LocalCache.get_instance()
+    activity = Activity(name="Tagged Activity", type="flashcard")
+    db_session.add(activity)
+    db_session.commit()
+    
+    cache.set("activity:practice:tagged", {"items": []}, tags=[f"activities:{activity.id}"])
+    cache.set("activity:practice:other", {"items": []}, tags=["activities:0"])
+    
+    activity.name = "Renamed Activity"
+    db_session.commit()
+    
+    assert cache.get("activity:practice:tagged") is None
+    assert cache.get("activity:practice:other") == {"items": []}
+    cache.delete("activity:practice:other")
+
+
+def test_rollback_keeps_tagged_entries(db_session):
+    """Test that rolled back changes do not invalidate anything"""
+    from app.core.cache import LocalCache
+    from app.models.activity import Activity
+    
+    cache = LocalCache.get_instance()
+    cache.set("dashboard:stats:rollback", {"value": 1}, tags=["table:activities"])
+    
+    db_session.add(Activity(name="Rolled Back", type="flashcard"))
+    db_session.flush()
+    db_session.rollback()
+    
+    assert cache.get("dashboard:stats:rollback") == {"value": 1}
+    cache.delete("dashboard:stats:rollback")
@@ -0,0 +1,139 @@
+"""Tests for the persistent cache stores."""
+import time
+import pytest
+from app.core.cache_store import FileStore, SegmentStore
+
+
+def _digest(i: int) -> str:
+    return f"{i:064x}"
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    """Directory for segment files."""
+    return tmp_path / "segments"
+
+
+@pytest.fixture
+def store(store_dir):
+    """Create a loaded segment store with small segments."""
+    segment_store = SegmentStore(store_dir, segment_size=4096, compaction_ratio=0.5)
+    segment_store.load(time.time())
+    yield segment_store
+    segment_store.close()
+
+
+def test_write_and_read(store):
+    """Test that the latest write for a digest wins."""
+    store.write(_digest(1), b'{"v": 1}', time.time(), None, [])
+    store.write(_digest(1), b'{"v": 2}', time.time(), None, [])
+    assert store.read(_digest(1)) == b'{"v": 2}'
+    assert store.read(_digest(2)) is None
+
+
+def test_segment_permissions(store, store_dir):
+    """Test segment file and directory permissions."""
+    store.write(_digest(1), b'"value"', time.time(), None, [])
+    assert oct(store_dir.stat().st_mode)[-3:] == '700'
+    for segment in store_dir.glob("segment-*.seg"):
+        assert oct(segment.stat().st_mode)[-3:] == '600'
+
+
+def test_recovery_replays_writes_and_tombstones(store, store_dir):
+    """Test that reopening the store restores live entries only."""
+    now = time.time()
+    store.write(_digest(1), b'"kept"', now, None, ["scope"])
+    store.write(_digest(2), b'"deleted"', now, None, [])
+    store.write(_digest(3), b'"expired"', now, now - 1, [])
+    store.remove(_digest(2))
+    store.close()
+    
+    reopened = SegmentStore(store_dir, segment_size=4096, compaction_ratio=0.5)
+    result = reopened.load(time.time())
+    
+    assert [digest for digest, _ in result.entries] == [_digest(1)]
+    assert result.entries[0][1].scopes == ["scope"]
+    assert result.cleaned_entries == 1
+    assert reopened.read(_digest(1)) == b'"kept"'
+    assert reopened.read(_digest(2)) is None
+    reopened.close()
+
+
+def test_recovery_truncates_torn_record(store, store_dir):
+    """Test that a partially written record is discarded on recovery."""
+    store.write(_digest(1), b'"complete"', time.time(), None, [])
+    store.close()
+    segment = sorted(store_dir.glob("segment-*.seg"))[-1]
+    valid_size = segment.stat().st_size
+    with segment.open("ab") as f:
+        f.write(b"LPC1\x00\x00partial")
+    
+    reopened = SegmentStore(store_dir, segment_size=4096, compaction_ratio=0.5)
+    reopened.load(time.time())
+    
+    assert reopened.read(_digest(1)) == b'"complete"'
+    assert segment.stat().st_size == valid_size
+    reopened.close()
+
+
+def test_compaction_reclaims_dead_bytes(store, store_dir):
+    """Test that overwrites trigger compaction into a single segment."""
+    for i in range(200):
+        store.write(_digest(i % 10), b'{"v": %d}' % i, time.time(), None, [])
+    
+    assert store.compactions > 0
+    assert store.dead_bytes <= store.total_bytes * 0.5
+    for key in range(10):
+        assert store.read(_digest(key)) == b'{"v": %d}' % (190 + key)
+
+
+def test_corrupt_record_read_as_miss(store, store_dir):
+    """Test that a record whose bytes changed on disk is not served."""
+    store.write(_digest(1), b'"original"', time.time(), None, [])
+    segment = sorted(store_dir.glob("segment-*.seg"))[-1]
+    data = segment.read_bytes()
+    segment.write_bytes(data.replace(b'"original"', b'"tampered"'))
+    store._close_files()
+    store._open_active()
+
+    assert store.read(_digest(1)) is None
+    assert store.path_for(_digest(1)) is None
+
+
+def test_directory_locked_to_one_process(store, store_dir, tmp_path):
+    """Test that a held directory is refused and workers get their own slots."""
+    with pytest.raises(OSError):
+        SegmentStore(store_dir, segment_size=4096, compaction_ratio=0.5).load(time.time())
+
+    first = SegmentStore.for_worker(tmp_path / "cache", segment_size=4096, compaction_ratio=0.5)
+    second = SegmentStore.for_worker(tmp_path / "cache", segment_size=4096, compaction_ratio=0.5)
+    try:
+        assert first.cache_dir.name == "worker-0"
+        assert second.cache_dir.name == "worker-1"
+    finally:
+        first.close()
+        second.close()
+    reused = SegmentStore.for_worker(tmp_path / "cache", segment_size=4096, compaction_ratio=0.5)
+    assert reused.cache_dir.name == "worker-0"
+    reused.close()
+
+
+def test_file_store_rescan_picks_up_foreign_files(tmp_path):
+    """Test that files added or removed by other processes are noticed on rescan."""
+    store = FileStore(tmp_path / "files")
+    store.write(_digest(1), b'"own"', time.time(), None, [])
+    known = {digest: entry for digest, entry in store.load(time.time()).entries}
+    assert store.rescan(time.time(), known) is None
+
+    other = FileStore(tmp_path / "files")
+    other.write(_digest(2), b'"foreign"', time.time(), None, ["scope"])
+    other.remove(_digest(1))
+    (tmp_path / "files" / "invalid.cache").write_text("invalid json")
+
+    result = store.rescan(time.time(), known)
+    assert [digest for digest, _ in result.entries] == [_digest(2)]
+    assert result.entries[0][1].scopes == ["scope"]
+    assert result.missing == [_digest(1)]
+    assert result.cleaned_entries == 1
+    assert not (tmp_path / "files" / "invalid.cache").exists()
+    assert store.read(_digest(2)) == b'"foreign"'
@@ -0,0 +1,89 @@
+"""Tests for conditional GET support."""
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.conditional import ResourceVersion, conditional_get
+from app.db.database import get_db
+
+MODIFIED = datetime(2025, 3, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def state():
+    """Mutable resource state read by the version loader."""
+    return {"modified": MODIFIED, "members": 2, "calls": 0}
+
+
+@pytest.fixture
+def client(state):
+    """App with one conditional endpoint that counts how often it runs."""
+    app = FastAPI()
+
+    def load_version(db, *, id):
+        if id != 1:
+            return None
+        return ResourceVersion([state["modified"]], [state["members"]])
+
+    @app.get("/items/{item_id}", dependencies=[Depends(conditional_get(load_version, "item_id"))])
+    def get_item(item_id: int):
+        state["calls"] += 1
+        return {"id": item_id, "members": state["members"]}
+
+    app.dependency_overrides[get_db] = lambda: None
+    return TestClient(app)
+
+
+def test_validators_set_on_response(client):
+    """Test that ETag and Last-Modified are sent with the full response."""
+    response = client.get("/items/1")
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["last-modified"] == format_datetime(
+        MODIFIED.replace(tzinfo=timezone.utc), usegmt=True
+    )
+
+
+def test_if_none_match_returns_304_before_endpoint(client, state):
+    """Test that a matching ETag is answered without running the endpoint."""
+    etag = client.get("/items/1").headers["etag"]
+    response = client.get("/items/1", headers={"If-None-Match": f'W/"other", {etag}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert state["calls"] == 1
+
+
+def test_if_modified_since(client, state):
+    """Test Last-Modified based revalidation."""
+    last_modified = client.get("/items/1").headers["last-modified"]
+    assert client.get("/items/1", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    state["modified"] = datetime(2025, 3, 2)
+    assert client.get("/items/1", headers={"If-Modified-Since": last_modified}).status_code == 200
+
+
+def test_membership_change_changes_etag(client, state):
+    """Test that a membership change without a newer timestamp still changes the ETag."""
+    etag = client.get("/items/1").headers["etag"]
+    state["members"] = 3
+
+    response = client.get("/items/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_varies_by_query(client):
+    """Test that different representations get different ETags."""
+    assert client.get("/items/1").headers["etag"] != client.get("/items/1?reverse=true").headers["etag"]
+
+
+def test_missing_resource_runs_endpoint(client, state):
+    """Test that unknown resources fall through to the endpoint."""
+    response = client.get("/items/2", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
@@ -0,0 +1,167 @@
+"""Tests for keyset pagination of services and list endpoints."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import app.db.cache_events  # noqa: F401  Invalidates cached totals on commit
+import app.models  # noqa: F401  Registers all mappers
+from app.api.v1.endpoints import vocabulary_groups
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.base_class import Base
+from app.db.database import get_db
+from app.models.activity import Session as ActivitySession
+from app.models.vocabulary_group import VocabularyGroup
+from app.services.activity import async_session_service
+from app.services.vocabulary_group import vocabulary_group_service
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of a database with 25 groups and 30 sessions sharing creation times pairwise."""
+    path = tmp_path / "pages.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    tables = Base.metadata.tables
+    with engine.begin() as conn:
+        conn.execute(insert(tables["languages"]), [
+            {"id": 1, "code": "en", "name": "English"},
+            {"id": 2, "code": "de", "name": "German"},
+        ])
+        conn.execute(insert(tables["language_pairs"]), [{"id": 1, "source_language_id": 1, "target_language_id": 2}])
+        conn.execute(insert(tables["vocabulary_groups"]), [
+            {"id": i, "name": f"Group {(i * 7) % 25:02d}", "language_pair_id": 1,
+             "created_at": START + timedelta(hours=i // 2)}
+            for i in range(1, 26)
+        ])
+        conn.execute(insert(tables["activities"]), [{"id": 1, "type": "flashcards", "name": "Cards"}])
+        conn.execute(insert(tables["sessions"]), [
+            {"id": i, "activity_id": 1, "start_time": START, "created_at": START + timedelta(minutes=i // 2)}
+            for i in range(1, 31)
+        ])
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def db(database):
+    engine = create_engine(f"sqlite:///{database}")
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def all_pages(fetch, limit):
+    """Items of every page, following next cursors."""
+    items, cursor = [], None
+    while True:
+        page = fetch(cursor=cursor, limit=limit)
+        items.extend(page.items)
+        if page.next_cursor is None:
+            return items
+        cursor = page.next_cursor
+
+
+def test_cursor_round_trip():
+    """Test that cursors keep their values and are bound to their sort."""
+    columns = [VocabularyGroup.created_at, VocabularyGroup.id]
+    cursor = encode_cursor("recent", [START, 7])
+    assert decode_cursor(cursor, "recent", columns) == [START, 7]
+
+    for invalid in ("not-a-cursor", encode_cursor("name", [START, 7]), encode_cursor("recent", ["x", 7])):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(invalid, "recent", columns)
+        assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("sort, key, reverse", [
+    ("id", lambda g: g.id, False),
+    ("name", lambda g: (g.name, g.id), False),
+    ("recent", lambda g: (g.created_at, g.id), True),
+])
+def test_pages_cover_every_row_once(db, sort, key, reverse):
+    """Test that following cursors returns every row once, in sort order."""
+    groups = all_pages(lambda **page: vocabulary_group_service.get_page(db, sort=sort, **page), limit=4)
+    assert len(groups) == 25
+    assert groups == sorted(groups, key=key, reverse=reverse)
+
+
+def test_cursor_unaffected_by_inserts(db):
+    """Test that rows inserted before the cursor do not shift the next page."""
+    first = vocabulary_group_service.get_page(db, limit=5)
+    db.add(VocabularyGroup(id=0, name="Inserted", language_pair_id=1))
+    db.commit()
+    second = vocabulary_group_service.get_page(db, limit=5, cursor=first.next_cursor)
+    assert [group.id for group in second.items] == [6, 7, 8, 9, 10]
+
+
+def test_total_cached_until_commit(db, database):
+    """Test that totals are reused until an ORM commit touches the table."""
+    assert vocabulary_group_service.count(db) == 25
+    assert vocabulary_group_service.count(db, language_pair_id=1) == 25
+
+    # Core inserts bypass the ORM and keep the cached total
+    with db.get_bind().begin() as conn:
+        conn.execute(insert(VocabularyGroup.__table__), [{"name": "Core", "language_pair_id": 1}])
+    assert vocabulary_group_service.get_page(db, limit=1).total == 25
+
+    db.add(VocabularyGroup(name="ORM", language_pair_id=1))
+    db.commit()
+    assert vocabulary_group_service.count(db) == 27
+
+
+def test_async_pages(database):
+    """Test cursor pages of an async service in its default sort."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+
+    async def run():
+        items, cursor = [], None
+        try:
+            async with async_sessionmaker(bind=engine)() as db:
+                while True:
+                    page = await async_session_service.get_page(db, limit=7, cursor=cursor, activity_id=1)
+                    items.extend(page.items)
+                    cursor = page.next_cursor
+                    if cursor is None:
+                        return items, page.total
+        finally:
+            await engine.dispose()
+
+    sessions, total = asyncio.run(run())
+    assert total == 30
+    assert all(isinstance(session, ActivitySession) for session in sessions)
+    # Most recent first; sessions created in the same minute by descending id
+    assert [session.id for session in sessions] == sorted(range(1, 31), key=lambda i: (i // 2, i), reverse=True)
+
+
+def test_list_endpoint_headers(db):
+    """Test the total, next cursor and Link headers of a list endpoint."""
+    app = FastAPI()
+    app.include_router(vocabulary_groups.router)
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+
+    response = client.get("/vocabulary-groups", params={"limit": 10, "sort": "name"})
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+    assert response.headers["x-total-count"] == "25"
+    link = response.headers["link"]
+    assert link.startswith("</vocabulary-groups?") and link.endswith('>; rel="next"')
+
+    names = [group["name"] for group in response.json()]
+    while "link" in response.headers:
+        response = client.get(response.headers["link"][1:response.headers["link"].index(">")])
+        names.extend(group["name"] for group in response.json())
+    assert names == sorted(names) and len(names) == 25
+
+    assert client.get("/vocabulary-groups", params={"cursor": "bogus"}).status_code == 400
+    assert client.get("/vocabulary-groups", params={"sort": "size"}).status_code == 400
@@ -0,0 +1,75 @@
+"""Tests for per-request SQL statement instrumentation."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.metrics import QueryMetrics
+from app.db.instrumentation import fingerprint, instrument_engine, track_queries
+from app.middleware.performance import PerformanceMiddleware
+
+
+def test_fingerprint_replaces_literals():
+    """Test that statements differing only in values share a fingerprint."""
+    assert fingerprint("SELECT * FROM words WHERE id = 12") == fingerprint("SELECT * FROM words WHERE id = 7")
+    assert fingerprint("SELECT * FROM words WHERE word = 'it''s'") == "SELECT * FROM words WHERE word = ?"
+    assert fingerprint("SELECT * FROM t1 WHERE id IN (?, ?, ?)") == fingerprint("SELECT * FROM t1 WHERE id IN (?,?)")
+    assert "t1" in fingerprint("SELECT * FROM t1 WHERE id IN (?, ?)")
+
+
+def test_statements_attributed_to_tracked_context(tmp_path):
+    """Test that only statements inside track_queries are counted."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'queries.db'}", poolclass=NullPool)
+    instrument_engine(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries() as queries:
+            for i in range(3):
+                conn.execute(text("SELECT :value"), {"value": i})
+        conn.execute(text("SELECT 2"))
+
+    assert queries.statements == 3
+    assert queries.db_time_ms > 0
+    assert queries.repeated(3) == {"SELECT ?": 3}
+    engine.dispose()
+
+
+def test_middleware_reports_server_timing_and_n_plus_one(tmp_path):
+    """Test the Server-Timing header and N+1 detection for sync and async routes."""
+    path = tmp_path / "queries.db"
+    engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+
+    app = FastAPI()
+
+    @app.get("/items")
+    def items():
+        # One query per item, as a lazy load in a loop would issue
+        with engine.connect() as conn:
+            return [conn.execute(text("SELECT :id"), {"id": i}).scalar() for i in range(6)]
+
+    @app.get("/count")
+    async def count():
+        async with async_engine.connect() as conn:
+            return (await conn.execute(text("SELECT 1"))).scalar()
+
+    metrics = QueryMetrics()
+    app.add_middleware(PerformanceMiddleware, query_metrics=metrics, n_plus_one_threshold=5)
+    client = TestClient(app)
+
+    response = client.get("/items")
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="6 queries"' in response.headers["server-timing"]
+    response = client.get("/count")
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+
+    summary = metrics.to_dict()
+    assert summary["requests"] == 2
+    assert summary["n_plus_one_requests"] == 1
+    assert summary["routes"]["GET /items"]["n_plus_one"] == {"SELECT ?": 1}
+    assert summary["routes"]["GET /count"]["n_plus_one_requests"] == 0
+    assert summary["top_statements"][0]["statement"] == "SELECT ?"
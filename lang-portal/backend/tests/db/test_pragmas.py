@@ -0,0 +1,45 @@
+"""Tests for SQLite pragma profiles."""
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db.pragmas import configure_sqlite, sqlite_pragmas
+
+
+@pytest.mark.parametrize("profile", sorted(settings.SQLITE_PROFILES))
+def test_profile_applied_to_connections(tmp_path, profile):
+    """Test that every profile sets its pragmas on new connections."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    configure_sqlite(engine, profile=profile)
+    expected = settings.SQLITE_PROFILES[profile]
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == expected["cache_size"]
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == expected["busy_timeout"]
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    engine.dispose()
+
+
+def test_read_only_pragmas():
+    """Test that read-only connections skip file-changing pragmas and reject writes."""
+    pragmas = sqlite_pragmas("throughput", read_only=True)
+
+    assert "journal_mode" not in pragmas
+    assert "wal_autocheckpoint" not in pragmas
+    assert pragmas["query_only"] == "ON"
+    assert pragmas["cache_size"] == settings.SQLITE_PROFILES["throughput"]["cache_size"]
+
+
+def test_invalid_profiles_rejected(monkeypatch):
+    """Test that unknown profiles, pragmas and values fail when the engine is configured."""
+    with pytest.raises(ValueError):
+        sqlite_pragmas("fastest")
+
+    monkeypatch.setitem(settings.SQLITE_PROFILES, "custom", {"cache_size": "1; DROP TABLE x"})
+    with pytest.raises(ValueError):
+        sqlite_pragmas("custom")
+
+    monkeypatch.setitem(settings.SQLITE_PROFILES, "custom", {"locking_mode": "EXCLUSIVE"})
+    with pytest.raises(ValueError):
+        sqlite_pragmas("custom")
@@ -0,0 +1,59 @@
+"""Tests for the background database metrics collector."""
+import time
+
+from sqlalchemy import create_engine, insert, text
+
+import app.models  # noqa: F401  Registers all mappers
+from app.db.base_class import Base
+from app.db.pragmas import configure_sqlite
+from app.db.stats import DatabaseStatsCollector
+
+
+def create_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}", pool_size=2)
+    configure_sqlite(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Base.metadata.tables["languages"]), [{"code": "en", "name": "English"}])
+    return engine
+
+
+def test_sqlite_sample(tmp_path):
+    """Test SQLite file, WAL, per-table and pool metrics."""
+    engine = create_database(tmp_path)
+    collector = DatabaseStatsCollector(engine)
+    assert collector.snapshot() is None
+
+    collector.sample()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        snapshot = collector.snapshot()
+    assert snapshot["performance"]["active_connections"] == 1
+
+    snapshot = collector.snapshot()
+    size = snapshot["size"]
+    assert snapshot["dialect"] == "sqlite"
+    assert snapshot["tables"] == {"activities": 0, "vocabularies": 0, "attempts": 0}
+    assert size["total_bytes"] == size["page_count"] * size["page_size"]
+    assert size["wal_bytes"] > 0
+    assert "languages" in size["tables"]
+    assert snapshot["performance"]["active_connections"] == 0
+    assert snapshot["pools"]["default"]["checkouts"] == 2
+    assert snapshot["pools"]["default"]["peak_checked_out"] == 1
+    engine.dispose()
+
+
+def test_background_sampling(tmp_path):
+    """Test that the thread samples right away and stops cleanly."""
+    engine = create_database(tmp_path)
+    collector = DatabaseStatsCollector(engine, interval=60)
+
+    collector.start()
+    deadline = time.monotonic() + 5
+    while collector.snapshot() is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    collector.stop()
+
+    assert collector.snapshot() is not None
+    assert collector._thread is None
+    engine.dispose()
@@ -0,0 +1,116 @@
+"""Tests for the single-writer queue and read-only connections."""
+import asyncio
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.models  # noqa: F401  Registers all mappers
+from app.core.config import Settings
+from app.core.metrics import WriteQueueMetrics
+from app.db.base_class import Base
+from app.db.database import use_immediate_transactions
+from app.db.pragmas import configure_sqlite
+from app.db.writer import WriteQueue
+from app.models.language import Language
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of a fresh file database in WAL mode."""
+    path = tmp_path / "writer.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_wal(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(create_schema())
+    return path
+
+
+def writer_factory(path) -> async_sessionmaker:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    use_immediate_transactions(engine)
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def add_language(code: str):
+    async def job(db):
+        language = Language(code=code, name=code.upper())
+        db.add(language)
+        await db.flush()
+        return language.id
+    return job
+
+
+def test_concurrent_writes_are_group_committed(database):
+    """Test that writes queued together share one commit."""
+    metrics = WriteQueueMetrics()
+    writes = WriteQueue(writer_factory(database), max_batch=8, metrics=metrics)
+
+    async def run():
+        ids = await asyncio.gather(*(writes.submit(add_language(f"l{i}")) for i in range(20)))
+        await writes.close()
+        return ids
+
+    ids = asyncio.run(run())
+
+    assert len(set(ids)) == 20
+    summary = metrics.to_dict()
+    assert summary["transactions"] == 20
+    assert summary["batches"] < 20
+    assert summary["max_batch_size"] <= 8
+    assert summary["depth"] == 0
+
+
+def test_failed_transaction_does_not_affect_batch(database):
+    """Test that a failing write rolls back alone and only its submitter sees the error."""
+    metrics = WriteQueueMetrics()
+    session_factory = writer_factory(database)
+    writes = WriteQueue(session_factory, metrics=metrics)
+
+    async def run():
+        results = await asyncio.gather(
+            writes.submit(add_language("en")),
+            writes.submit(add_language("en")),  # Duplicate code
+            writes.submit(add_language("de")),
+            return_exceptions=True,
+        )
+        await writes.close()
+        async with session_factory() as db:
+            codes = (await db.execute(select(Language.code).order_by(Language.code))).scalars().all()
+        return results, codes
+
+    results, codes = asyncio.run(run())
+
+    assert isinstance(results[1], IntegrityError)
+    assert not isinstance(results[0], Exception) and not isinstance(results[2], Exception)
+    assert codes == ["de", "en"]
+    assert metrics.failed_transactions == 1
+    assert metrics.failed_commits == 0
+
+
+def test_read_only_connections_reject_writes(database):
+    """Test that read-only sessions can read but not write."""
+    url = Settings(DATABASE_URL=f"sqlite:///{database}").ASYNC_READ_ONLY_DATABASE_URL
+    engine = create_async_engine(url, poolclass=NullPool)
+    configure_sqlite(engine.sync_engine, read_only=True)
+    session_factory = async_sessionmaker(bind=engine)
+
+    async def run():
+        async with session_factory() as db:
+            assert (await db.execute(select(func.count(Language.id)))).scalar() == 0
+            db.add(Language(code="en", name="English"))
+            with pytest.raises(OperationalError):
+                await db.flush()
+        await engine.dispose()
+
+    asyncio.run(run())
@@ -19,7 +19,8 @@ def cache():
     """Create a test cache instance."""
     cache = LocalCache()
     cache.clear()
-    return cache
+    yield cache
+    cache.close()
 
 def test_metrics_endpoint_integration(client):
     """Test metrics endpoint integration."""
@@ -0,0 +1,123 @@
+"""Tests for response compression."""
+import gzip
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+from app.middleware.pipeline import PrivacyPipelineMiddleware
+
+BODY = b'{"items": [' + b", ".join(b'{"id": %d, "word": "laufen"}' % i for i in range(100)) + b"]}"
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/vocabulary/")
+    async def vocabulary():
+        return Response(BODY, media_type="application/json", headers={"X-Cache-Status": "HIT"})
+
+    @app.get("/tagged")
+    async def tagged():
+        return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/tagged-small")
+    async def tagged_small():
+        return Response(b'{"ok": true}', media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/not-modified")
+    async def not_modified():
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b"line\n"] * 500), media_type="text/plain")
+
+    app.add_middleware(PrivacyPipelineMiddleware, rules={})
+    app.add_middleware(CompressionMiddleware, min_size=100)
+    return app
+
+
+def test_negotiate_encoding():
+    """Test Accept-Encoding negotiation with quality values."""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("deflate") is None
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("*") == compression.SUPPORTED_ENCODINGS[0]
+    assert negotiate_encoding("identity") is None
+
+
+def test_sanitized_before_compression():
+    """Test that compressed bodies were sanitized and cached variants are reused."""
+    app = create_app()
+    client = TestClient(app, headers={"Origin": "http://localhost:8000"})
+
+    with patch.object(compression, "compress", wraps=compression.compress) as compress:
+        first = client.get("/api/v1/vocabulary/", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/api/v1/vocabulary/", headers={"Accept-Encoding": "gzip"})
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["vary"]
+    # The client decodes transparently; the body must carry no raw IDs
+    assert b'"id": "[ID]"' in first.content
+    assert b'"id": 1,' not in first.content
+    assert second.content == first.content
+    assert compress.call_count == 1
+
+
+def test_small_streamed_and_identity_responses():
+    """Test the size threshold, streamed bodies and clients without gzip."""
+    client = TestClient(create_app(), headers={"Origin": "http://localhost:8000"})
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    streamed = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert streamed.text == "line\n" * 500
+
+    plain = client.get("/api/v1/vocabulary/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_gzip_output_is_deterministic():
+    """Test that identical bodies compress to identical bytes."""
+    assert compression.compress(BODY, "gzip") == compression.compress(BODY, "gzip")
+    assert gzip.decompress(compression.compress(BODY, "gzip")) == BODY
+
+
+def test_etag_weakened_when_encoded():
+    """Test that a strong ETag is only kept on the identity body."""
+    client = TestClient(create_app(), headers={"Origin": "http://localhost:8000"})
+
+    encoded = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/tagged", headers={"Accept-Encoding": "identity"})
+
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.headers["etag"] == 'W/"v1"'
+    assert identity.headers["etag"] == '"v1"'
+
+
+def test_not_modified_etag_matches_encoding():
+    """Test that a 304 carries the same ETag as the 200 it revalidates."""
+    client = TestClient(create_app(), headers={"Origin": "http://localhost:8000"})
+
+    # Too small to compress, but weakened like the 304 below
+    small = client.get("/tagged-small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.headers["etag"] == 'W/"v1"'
+
+    encoded = client.get("/not-modified", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/not-modified", headers={"Accept-Encoding": "identity"})
+
+    assert encoded.status_code == identity.status_code == 304
+    assert "content-encoding" not in encoded.headers
+    assert encoded.headers["etag"] == 'W/"v1"'
+    assert identity.headers["etag"] == '"v1"'
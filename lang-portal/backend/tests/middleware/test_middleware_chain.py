@@ -11,39 +11,34 @@ from typing import List
 
 @pytest.fixture
 def test_middleware():
-    """Create a test middleware for tracking execution order."""
-    def create_middleware(app, name: str):
+    """Create test middleware classes that record their execution order."""
+    def create_middleware(name: str, calls: List[str]):
         class _TestMiddleware(BaseHTTPMiddleware):
-            calls = []
-
             async def dispatch(
                 self, request: Request, call_next: RequestResponseEndpoint
             ) -> Response:
                 # Record pre-processing
-                self.calls.append(f"{name}_pre")
+                calls.append(f"{name}_pre")
                 
                 # Process request
                 response = await call_next(request)
                 
                 # Record post-processing
-                self.calls.append(f"{name}_post")
+                calls.append(f"{name}_post")
                 
                 return response
         
-        return _TestMiddleware(app)
+        return _TestMiddleware
     return create_middleware
 
 def test_middleware_execution_order(test_middleware):
     """Test that middleware executes in the correct order."""
     app = FastAPI()
+    calls = []
     
-    # Create test middlewares
-    middleware1 = test_middleware(app, "middleware1")
-    middleware2 = test_middleware(app, "middleware2")
-    
-    # Add middlewares in order
-    app.add_middleware(lambda app: middleware2)
-    app.add_middleware(lambda app: middleware1)
+    # Add middlewares in order; the last one added is outermost
+    app.add_middleware(test_middleware("middleware2", calls))
+    app.add_middleware(test_middleware("middleware1", calls))
     
     @app.get("/test")
     async def test_endpoint():
@@ -53,8 +48,7 @@ def test_middleware_execution_order(test_middleware):
     response = client.get("/test")
     
     # Verify order: middleware1_pre -> middleware2_pre -> middleware2_post -> middleware1_post
-    assert middleware1.calls == ["middleware1_pre", "middleware1_post"]
-    assert middleware2.calls == ["middleware2_pre", "middleware2_post"]
+    assert calls == ["middleware1_pre", "middleware2_pre", "middleware2_post", "middleware1_post"]
 
 def test_middleware_error_handling():
     """Test middleware error handling."""
@@ -74,7 +68,7 @@ def test_middleware_error_handling():
     async def test_endpoint():
         return {"message": "test"}
     
-    client = TestClient(app)
+    client = TestClient(app, raise_server_exceptions=False)
     
     # Test normal request
     response = client.get("/test")
@@ -130,13 +124,14 @@ def test_middleware_response_modification():
     response = client.get("/test")
     assert response.headers["X-Custom-Response"] == "modified"
 
-def test_middleware_chain_performance():
+def test_middleware_chain_performance(test_middleware):
     """Test performance impact of middleware chain."""
     app = FastAPI()
+    calls = []
     
     # Add multiple middlewares
     for i in range(5):
-        app.add_middleware(test_middleware()(app, f"middleware{i}"))
+        app.add_middleware(test_middleware(f"middleware{i}", calls))
     
     @app.get("/test")
     async def test_endpoint():
@@ -296,7 +291,13 @@ def test_middleware_cleanup():
     app = FastAPI()
     cleanup_called = False
     
+    instances = []
+
     class CleanupMiddleware(BaseHTTPMiddleware):
+        def __init__(self, app):
+            super().__init__(app)
+            instances.append(self)
+
         async def dispatch(
             self, request: Request, call_next: RequestResponseEndpoint
         ) -> Response:
@@ -306,8 +307,7 @@ def test_middleware_cleanup():
             nonlocal cleanup_called
             cleanup_called = True
     
-    middleware = CleanupMiddleware(app)
-    app.add_middleware(lambda app: middleware)
+    app.add_middleware(CleanupMiddleware)
     
     @app.get("/test")
     async def test_endpoint():
@@ -316,6 +316,7 @@ def test_middleware_cleanup():
     # Create and use client
     client = TestClient(app)
     client.get("/test")
+    middleware = instances[0]
     
     # Cleanup should be called on shutdown
     if hasattr(middleware, 'cleanup'):
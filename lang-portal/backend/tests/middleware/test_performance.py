@@ -157,4 +157,36 @@ def test_performance_middleware_status_code_recording():
     for code in status_codes:
         response = client.get(f"/status/{code}")
         assert response.status_code == code
-        assert "X-Process-Time-Ms" in response.headers 
\ No newline at end of file
+        assert "X-Process-Time-Ms" in response.headers
+
+
+def test_performance_middleware_route_metrics():
+    """Test that latency and errors are recorded per route template"""
+    from app.core.metrics import ApiMetrics
+
+    metrics = ApiMetrics()
+    app = FastAPI()
+    app.add_middleware(PerformanceMiddleware, slow_threshold_ms=50, metrics=metrics)
+
+    @app.get("/items/{item_id}")
+    async def item_endpoint(item_id: int):
+        if item_id == 0:
+            raise ValueError("Test error")
+        if item_id == 2:
+            time.sleep(0.06)
+        return Response(status_code=404 if item_id == 3 else 200)
+
+    client = TestClient(app)
+    for item_id in (1, 2, 3, 0):
+        client.get(f"/items/{item_id}")
+    client.get("/missing")
+
+    routes = metrics.get_route_stats()
+    assert set(routes) == {"GET /items/{item_id}", "unmatched"}
+    assert routes["GET /items/{item_id}"]["response_times"]["count"] == 4
+    assert routes["GET /items/{item_id}"]["errors"] == {"4xx": 1, "5xx": 1}
+    assert metrics.error_counts == {"4xx": 2, "5xx": 1}
+    assert metrics.total_requests == 5
+    assert metrics.slow_requests == 1
+    assert metrics.in_flight == 0
+    assert metrics.peak_in_flight == 1
@@ -0,0 +1,129 @@
+"""Tests for the single-pass privacy pipeline middleware."""
+from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+import pytest
+
+from app.middleware.pipeline import PrivacyPipelineMiddleware
+
+LOCAL = {"Origin": "http://localhost:8000"}
+
+
+@pytest.fixture
+def app():
+    """Create a test FastAPI application with the privacy pipeline."""
+    app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+    app.add_middleware(PrivacyPipelineMiddleware)
+
+    @app.get("/api/v1/dashboard/stats")
+    async def dashboard_stats(response: Response):
+        response.headers["X-Tracking"] = "abc"
+        response.headers["X-Request-Ref"] = "ref-123456"
+        response.headers["Access-Control-Allow-Origin"] = "http://localhost:3000"
+        response.headers["ETag"] = '"0123456789abcdef0123456789abcdef"'
+        response.set_cookie("session", "value")
+        return {"id": 123, "created_at": "2024-03-15T10:00:00Z", "stats": {"total": 100}}
+
+    @app.get("/api/v1/sessions/stream")
+    async def session_stream():
+        chunks = [b'{"session_id": "abc123", ', b'"user_agent": "test-browser"}']
+        return StreamingResponse(iter(chunks), media_type="application/json")
+
+    @app.get("/api/v1/activities/text")
+    async def activity_text():
+        return PlainTextResponse('"id": 1')
+
+    @app.get("/openapi.json")
+    async def openapi():
+        return {"id": 1}
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Create a local test client."""
+    return TestClient(app, headers=LOCAL)
+
+
+def test_route_headers_and_sanitization(client):
+    """Test that route rules, security headers and sanitization apply in one pass."""
+    response = client.get("/api/v1/dashboard/stats")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store, max-age=0"
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["x-privacy-mode"] == "strict"
+    assert "default-src 'self'" in response.headers["content-security-policy"]
+    assert response.json() == {"id": "[ID]", "created_at": "[TIMESTAMP]", "stats": {"total": 100}}
+    assert int(response.headers["content-length"]) == len(response.content)
+
+
+def test_tracking_headers_removed_and_values_redacted(client):
+    """Test header removal and redaction, keeping CORS headers and validators."""
+    response = client.get("/api/v1/dashboard/stats")
+    assert "set-cookie" not in response.headers
+    assert "x-tracking" not in response.headers
+    assert response.headers["x-request-ref"] == "[REDACTED]"
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert response.headers["etag"] == '"0123456789abcdef0123456789abcdef"'
+    assert len(response.headers.get_list("x-content-type-options")) == 1
+
+
+def test_streamed_json_is_sanitized(client):
+    """Test that a chunked JSON body is buffered and sanitized."""
+    response = client.get("/api/v1/sessions/stream")
+    assert response.json() == {"session_id": "[REDACTED]", "user_agent": "[REDACTED]"}
+
+
+def test_non_json_passes_through(client):
+    """Test that non-JSON bodies are not rewritten."""
+    assert client.get("/api/v1/activities/text").text == '"id": 1'
+
+
+def test_request_checks(client):
+    """Test query parameter, sensitive parameter and local-only checks."""
+    response = client.get("/api/v1/dashboard/stats?sort=asc")
+    assert response.status_code == 400
+    assert "Invalid query parameters" in response.text
+
+    response = client.get("/api/v1/unknown?api_key=1")
+    assert response.status_code == 400
+
+    remote = TestClient(client.app, headers={"Origin": "http://example.com"})
+    response = remote.get("/api/v1/dashboard/stats")
+    assert response.status_code == 403
+    assert "local use only" in response.text
+    assert response.headers["x-privacy-mode"] == "strict"
+
+
+def test_options_and_docs(client):
+    """Test OPTIONS preflight and documentation endpoint handling."""
+    response = client.options("/api/v1/dashboard/stats")
+    assert response.status_code == 204
+    assert response.headers["access-control-max-age"] == "600"
+
+    response = client.get("/openapi.json")
+    assert response.json() == {"id": 1}
+    assert response.headers["x-frame-options"] == "DENY"
+    assert "x-privacy-mode" not in response.headers
+
+
+def test_custom_rule_table():
+    """Test that the rule table is configurable."""
+    app = FastAPI()
+    app.add_middleware(PrivacyPipelineMiddleware, rules={
+        "/public/**": {
+            "cache_control": "public, max-age=60",
+            "sanitize_response": False,
+            "allow_query_params": {"page"}
+        }
+    })
+
+    @app.get("/public/items")
+    async def items():
+        return {"id": 7}
+
+    response = TestClient(app, headers=LOCAL).get("/public/items?page=2")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.json() == {"id": 7}
@@ -0,0 +1,65 @@
+"""Tests for the token-bucket rate limiter."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import ApiMetrics
+from app.middleware.rate_limit import RateLimitMiddleware, RateLimitRule, TokenBucketLimiter
+
+
+def test_bucket_refills_over_time():
+    """Test that a bucket allows a burst, then one request per refill interval."""
+    limiter = TokenBucketLimiter(max_buckets=10)
+    rule = RateLimitRule("dashboard", requests=2, window=1)
+
+    assert limiter.acquire("client", rule, now=0.0) == 0
+    assert limiter.acquire("client", rule, now=0.0) == 0
+    assert limiter.acquire("client", rule, now=0.0) == 0.5
+    assert limiter.acquire("client", rule, now=0.5) == 0
+    assert limiter.acquire("other", rule, now=0.5) == 0
+
+
+def test_idle_buckets_evicted_least_recently_used_first():
+    """Test that the bucket count is bounded and recently used buckets survive."""
+    limiter = TokenBucketLimiter(max_buckets=2)
+    rule = RateLimitRule("dashboard", requests=1, window=60)
+
+    limiter.acquire("a", rule, now=0.0)
+    limiter.acquire("b", rule, now=0.0)
+    assert limiter.acquire("a", rule, now=1.0) > 0  # Touches "a"
+    limiter.acquire("c", rule, now=1.0)  # Evicts "b"
+
+    assert len(limiter) == 2
+    assert limiter.acquire("a", rule, now=1.0) > 0
+    assert limiter.acquire("b", rule, now=1.0) == 0
+
+
+def test_middleware_limits_route_classes():
+    """Test 429 responses, Retry-After and metrics per route class."""
+    app = FastAPI()
+
+    @app.get("/api/v1/dashboard/stats")
+    async def stats():
+        return {"ok": True}
+
+    @app.get("/api/v1/vocabulary")
+    async def vocabulary():
+        return {"ok": True}
+
+    metrics = ApiMetrics()
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules={"/api/v1/dashboard/**": {"name": "dashboard", "requests": 2, "window": 60}},
+        metrics=metrics,
+    )
+    client = TestClient(app)
+
+    assert client.get("/api/v1/dashboard/stats").status_code == 200
+    assert client.get("/api/v1/dashboard/stats").status_code == 200
+    response = client.get("/api/v1/dashboard/stats")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests. Please try again later."}
+    assert int(response.headers["retry-after"]) == 30
+
+    for _ in range(5):
+        assert client.get("/api/v1/vocabulary").status_code == 200
+    assert metrics.rate_limited == {"dashboard": 1}
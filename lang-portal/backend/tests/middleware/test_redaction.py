@@ -0,0 +1,78 @@
+"""Tests and micro-benchmark for header and query parameter redaction checks."""
+import re
+import timeit
+
+import pytest
+
+from app.middleware.redaction import contains_sensitive_data, is_sensitive_param, should_redact
+
+# Previous implementation: four patterns searched separately on every value
+LEGACY_PATTERNS = [
+    r"[0-9]{3,}",
+    r"[a-fA-F0-9]{32,}",
+    r"eyJ[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*",
+    r"[a-zA-Z0-9+/]{32,}={0,2}",
+]
+
+# Typical response headers; most values repeat on every response
+HEADERS = [
+    ("content-type", "application/json"),
+    ("cache-control", "private, max-age=300"),
+    ("x-content-type-options", "nosniff"),
+    ("x-frame-options", "DENY"),
+    ("x-xss-protection", "1; mode=block"),
+    ("referrer-policy", "strict-origin-when-cross-origin"),
+    ("permissions-policy", "camera=(), microphone=(), geolocation=(), payment=(), usb=(), interest-cohort=()"),
+    ("x-privacy-mode", "strict"),
+    ("x-cache-status", "HIT"),
+]
+
+SAMPLES = [
+    "nosniff", "ref-12", "ref-123", "d41d8cd98f00b204e9800998ecf8427e",
+    "eyJhbGciOi.eyJzdWIiOi.c2lnbmF0dXJl", "QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVo0NTY3ODkw==",
+]
+
+
+def _legacy(value: str) -> bool:
+    return any(re.search(pattern, str(value)) for pattern in LEGACY_PATTERNS)
+
+
+def test_combined_pattern_matches_legacy_checks():
+    """Test that the combined scanner flags the same values as the four patterns."""
+    for value in SAMPLES + [value for _, value in HEADERS]:
+        assert contains_sensitive_data(value) == _legacy(value)
+
+
+def test_validators_and_cors_never_redacted():
+    """Test header names exempt from redaction."""
+    assert not should_redact("etag", '"d41d8cd98f00b204e9800998ecf8427e"')
+    assert not should_redact("content-length", "2048")
+    assert not should_redact("access-control-max-age", "600")
+    assert not should_redact("x-total-count", "1200")
+    assert not should_redact("link", '</api/v1/activities/activities?cursor=eyJpZCI6IDEyM30>; rel="next"')
+    assert should_redact("x-request-ref", "ref-123")
+
+
+def test_sensitive_param_names():
+    """Test substring matching of sensitive parameter names."""
+    assert is_sensitive_param("api_KEY")
+    assert is_sensitive_param("session_id")
+    assert not is_sensitive_param("limit")
+
+
+@pytest.mark.privacy
+def test_header_scan_benchmark():
+    """Benchmark scanning a response's headers with the legacy and combined checks."""
+    def legacy():
+        return [_legacy(value) for _, value in HEADERS]
+
+    def combined():
+        return [should_redact(name, value) for name, value in HEADERS]
+
+    assert legacy() == combined()
+    legacy_us = min(timeit.repeat(legacy, number=2000, repeat=5)) / 2000 * 1_000_000
+    combined_us = min(timeit.repeat(combined, number=2000, repeat=5)) / 2000 * 1_000_000
+    print(f"\nheader scan per response: legacy {legacy_us:.2f}us, combined {combined_us:.2f}us "
+          f"({legacy_us / combined_us:.1f}x)")
+
+    assert combined_us < legacy_us
@@ -143,4 +143,22 @@ def test_permissions_policy_header(client):
     
     # Check for newer privacy-related permissions
     assert "interest-cohort=()" in policy
-    assert "web-share=()" in policy 
\ No newline at end of file
+    assert "web-share=()" in policy
+
+
+def test_validators_preserved_when_body_rewritten():
+    """Test that ETag and Last-Modified survive response sanitization."""
+    from fastapi import Response
+    app = FastAPI()
+    app.add_middleware(RoutePrivacyMiddleware)
+
+    @app.get("/api/v1/activities/1/practice")
+    async def practice(response: Response):
+        response.headers["ETag"] = '"abc123"'
+        response.headers["Last-Modified"] = "Sat, 01 Mar 2025 12:00:00 GMT"
+        return {"id": 1, "items": []}
+
+    response = TestClient(app).get("/api/v1/activities/1/practice")
+    assert response.json()["id"] == "[ID]"
+    assert response.headers["etag"] == '"abc123"'
+    assert response.headers["last-modified"] == "Sat, 01 Mar 2025 12:00:00 GMT"
@@ -0,0 +1,57 @@
+"""Tests for the compiled route rule router."""
+import pytest
+
+from app.middleware.rules import DEFAULT_RULE, RouteRule, RuleRouter
+
+
+@pytest.fixture
+def router():
+    """Router with literal, parameter and prefix templates."""
+    return RuleRouter({
+        "/api/v1/vocabulary/**": {"cache_control": "private, max-age=300", "allow_query_params": ["limit"]},
+        "/api/v1/vocabulary-groups/{group_id}": {"cache_control": "private, no-cache"},
+        "/api/v1/vocabulary-groups/{group_id}/practice": {"cache_control": "no-store, max-age=0"},
+        "/api/v1/vocabulary-groups/stats": {"cache_control": "no-cache"},
+        "/api/v1/sessions/.*": {"cache_control": "no-store", "sanitize_response": False},
+    }, cache_size=4)
+
+
+def test_prefix_templates(router):
+    """Test that '**' matches everything below a prefix but not the prefix itself."""
+    assert router.resolve("/api/v1/vocabulary/").cache_control == "private, max-age=300"
+    assert router.resolve("/api/v1/vocabulary/1/words").cache_control == "private, max-age=300"
+    assert router.resolve("/api/v1/vocabulary") is DEFAULT_RULE
+    assert router.resolve("/api/v1/sessions/current").sanitize_response is False
+
+
+def test_precedence(router):
+    """Test that literal segments win over parameters."""
+    assert router.resolve("/api/v1/vocabulary-groups/7").cache_control == "private, no-cache"
+    assert router.resolve("/api/v1/vocabulary-groups/7/practice").cache_control == "no-store, max-age=0"
+    assert router.resolve("/api/v1/vocabulary-groups/stats").cache_control == "no-cache"
+    assert router.resolve("/api/v1/vocabulary-groups/7/other") is DEFAULT_RULE
+    assert router.resolve("/api/v1/vocabulary-groups/") is DEFAULT_RULE
+
+
+def test_lookups_memoized_in_bounded_lru(router):
+    """Test that resolved paths are cached up to the configured size."""
+    for i in range(10):
+        router.resolve(f"/api/v1/vocabulary/{i}")
+    router.resolve("/api/v1/vocabulary/9")
+    info = router.resolve.cache_info()
+    assert info.hits == 1
+    assert info.currsize == 4
+
+
+def test_query_param_allow_list():
+    """Test allow-listing query parameter names."""
+    rule = RouteRule("no-store", allow_query_params=["limit", "offset"])
+    assert rule.allows(["limit"])
+    assert rule.allows([])
+    assert not rule.allows(["limit", "token"])
+
+
+def test_rest_must_be_last_segment():
+    """Test that '**' is rejected in the middle of a template."""
+    with pytest.raises(ValueError):
+        RuleRouter({"/api/**/items": {"cache_control": "no-store"}})
@@ -0,0 +1,57 @@
+"""Tests for the streaming JSON field sanitizer."""
+import json
+
+from app.middleware.sanitizer import JsonFieldSanitizer, sanitize_json
+
+BODY = json.dumps([
+    {
+        "id": i,
+        "vocabulary_id": i,
+        "word": f"wört {i}",
+        "created_at": "2025-01-01T00:00:00",
+        "updated_at": None,
+        "token": 'quoted \\"value\\"',
+        "note": 'says "id": 5',
+    }
+    for i in range(3)
+], ensure_ascii=False).encode("utf-8")
+
+
+def _stream(body: bytes, sizes) -> bytes:
+    sanitizer = JsonFieldSanitizer()
+    parts, pos, index = [], 0, 0
+    while pos < len(body):
+        size = sizes[index % len(sizes)]
+        parts.append(sanitizer.feed(body[pos:pos + size]))
+        pos += size
+        index += 1
+    parts.append(sanitizer.close())
+    return b"".join(parts)
+
+
+def test_fields_redacted_by_key():
+    """Test that only sensitive keys are redacted and the result stays valid JSON."""
+    item = json.loads(sanitize_json(BODY))[0]
+    assert item["id"] == "[ID]"
+    assert item["vocabulary_id"] == 0
+    assert item["created_at"] == "[TIMESTAMP]"
+    assert item["updated_at"] is None
+    assert item["token"] == "[REDACTED]"
+    assert item["note"] == 'says "id": 5'
+    assert item["word"] == "wört 0"
+
+
+def test_chunked_output_matches_whole_body():
+    """Test that any chunking produces the same output as one pass."""
+    expected = sanitize_json(BODY)
+    for sizes in ([1], [2, 3], [7], [5, 11, 1], [64]):
+        assert _stream(BODY, sizes) == expected
+    for split in range(1, len(BODY)):
+        assert _stream(BODY, [split, len(BODY)]) == expected
+
+
+def test_numbers_split_across_chunks():
+    """Test that a number cut by a chunk boundary is replaced as a whole."""
+    sanitizer = JsonFieldSanitizer()
+    output = sanitizer.feed(b'{"id": 12') + sanitizer.feed(b'34.5e2, "n": 1}') + sanitizer.close()
+    assert json.loads(output) == {"id": "[ID]", "n": 1}
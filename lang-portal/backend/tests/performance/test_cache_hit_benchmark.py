@@ -0,0 +1,87 @@
+"""Benchmark cache hit latency for endpoints with a response model."""
+import statistics
+import time
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core.cache import LocalCache, cache_response
+
+ITEMS = 500
+REQUESTS = 200
+
+
+class ProgressItem(BaseModel):
+    activity_id: int
+    activity_name: str
+    total_sessions: int
+    success_rate: float
+    last_attempt: str
+
+
+def _progress() -> List[dict]:
+    return [
+        {
+            "activity_id": i,
+            "activity_name": f"Activity {i}",
+            "total_sessions": i * 3,
+            "success_rate": 0.75,
+            "last_attempt": "2025-01-01T00:00:00+00:00",
+        }
+        for i in range(ITEMS)
+    ]
+
+
+@pytest.fixture
+def bench_app():
+    """App with the same payload cached as Python objects and as response bytes."""
+    app = FastAPI()
+    cache = LocalCache.get_instance()
+
+    @app.get("/objects", response_model=List[ProgressItem])
+    async def cached_objects():
+        # Previous behaviour: hits return the value and FastAPI validates it again
+        value = cache.get("bench:objects")
+        if value is None:
+            value = _progress()
+            cache.set("bench:objects", value, expire=600)
+        return value
+
+    @app.get("/bytes", response_model=List[ProgressItem])
+    @cache_response(prefix="bench:bytes", expire=600)
+    async def cached_bytes():
+        return _progress()
+
+    yield TestClient(app)
+    cache.delete("bench:objects")
+    cache.delete_pattern("bench:bytes:*")
+
+
+def _median_ms(client: TestClient, path: str) -> float:
+    client.get(path)
+    timings = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return statistics.median(timings)
+
+
+@pytest.mark.cache
+def test_cached_bytes_hit_benchmark(bench_app):
+    """Report the hit latency of stored bytes against validating cached objects.
+
+    Timings vary too much on shared CI hosts to assert on, so the numbers are
+    only printed.
+    """
+    assert bench_app.get("/objects").json() == bench_app.get("/bytes").json()
+    assert bench_app.get("/bytes").headers["X-Cache-Status"] == "HIT"
+
+    objects_ms = _median_ms(bench_app, "/objects")
+    bytes_ms = _median_ms(bench_app, "/bytes")
+    print(f"\ncache hit median over {REQUESTS} requests of {ITEMS} items: "
+          f"objects {objects_ms:.3f}ms, bytes {bytes_ms:.3f}ms ({objects_ms / bytes_ms:.1f}x)")
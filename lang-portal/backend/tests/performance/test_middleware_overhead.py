@@ -0,0 +1,77 @@
+"""Benchmark per-request overhead of the privacy middleware stack."""
+import asyncio
+import statistics
+import time
+
+import pytest
+from fastapi import FastAPI
+
+from app.middleware.pipeline import PrivacyPipelineMiddleware
+from app.middleware.privacy import PrivacyMiddleware
+from app.middleware.route_privacy import RoutePrivacyMiddleware
+from app.middleware.security import SecurityMiddleware
+
+REQUESTS = 2000
+
+
+def _build(*middleware) -> FastAPI:
+    app = FastAPI()
+    for cls in middleware:
+        app.add_middleware(cls)
+
+    @app.get("/api/v1/dashboard/stats")
+    async def stats():
+        return {"id": 1, "created_at": "2025-01-01T00:00:00Z", "stats": {"total": 100}}
+
+    return app
+
+
+async def _request(app: FastAPI) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/api/v1/dashboard/stats",
+        "raw_path": b"/api/v1/dashboard/stats", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"origin", b"http://localhost:8000")],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 8000),
+    }
+    status = 0
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _median_us(app: FastAPI) -> float:
+    for _ in range(100):
+        assert await _request(app) == 200
+    timings = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        await _request(app)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+@pytest.mark.privacy
+def test_pipeline_overhead_below_layered_stack():
+    """Test that one pure-ASGI pass costs less than three BaseHTTPMiddleware layers."""
+    async def run():
+        bare = await _median_us(_build())
+        layered = await _median_us(_build(SecurityMiddleware, PrivacyMiddleware, RoutePrivacyMiddleware))
+        pipeline = await _median_us(_build(PrivacyPipelineMiddleware))
+        return bare, layered, pipeline
+
+    bare, layered, pipeline = asyncio.run(run())
+    print(f"\nmiddleware overhead per request (median of {REQUESTS}): "
+          f"layered {layered - bare:.0f}us, pipeline {pipeline - bare:.0f}us "
+          f"(bare app {bare:.0f}us)")
+
+    assert pipeline < layered
@@ -0,0 +1,135 @@
+"""Tests for the async service layer."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.models  # noqa: F401  Registers all mappers
+from app.db.base_class import Base
+from app.models.language import Language
+from app.models.language_pair import LanguagePair
+from app.models.vocabulary import Vocabulary
+from app.models.vocabulary_group import VocabularyGroup
+from app.schemas.activity import ActivityCreate, ActivityUpdate
+from app.schemas.language import LanguageCreate, LanguageUpdate
+from app.services.activity import async_activity_service
+from app.services.base import AsyncBaseService
+
+
+@pytest.fixture
+def async_session_factory(tmp_path):
+    """Async sessions on a fresh file database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}", poolclass=NullPool)
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def vocabulary_group(async_session_factory):
+    """A vocabulary group with two vocabularies."""
+    async def create():
+        async with async_session_factory() as db:
+            source, target = Language(code="en", name="English"), Language(code="de", name="German")
+            db.add_all([source, target])
+            await db.flush()
+            pair = LanguagePair(source_language_id=source.id, target_language_id=target.id)
+            db.add(pair)
+            await db.flush()
+            group = VocabularyGroup(name="Verbs", language_pair_id=pair.id, vocabularies=[
+                Vocabulary(word="run", translation="laufen", language_pair_id=pair.id),
+                Vocabulary(word="walk", translation="gehen", language_pair_id=pair.id),
+            ])
+            db.add(group)
+            await db.commit()
+            return group.id
+
+    return asyncio.run(create())
+
+
+def test_async_base_service_crud(async_session_factory):
+    """Test create, read, update and delete through an AsyncSession."""
+    service = AsyncBaseService[Language, LanguageCreate, LanguageUpdate](Language)
+
+    async def run():
+        async with async_session_factory() as db:
+            language = await service.create(db, obj_in=LanguageCreate(code="es", name="Spanish"))
+            assert await service.exists(db, language.id)
+            await service.update(db, db_obj=language, obj_in=LanguageUpdate(name="Español"))
+            assert [lang.name for lang in await service.get_multi(db, code="es")] == ["Español"]
+            await service.delete(db, id=language.id)
+            assert await service.get(db, language.id) is None
+            with pytest.raises(HTTPException):
+                await service.delete(db, id=language.id)
+
+    asyncio.run(run())
+
+
+def test_async_activity_service(async_session_factory, vocabulary_group):
+    """Test activity validation, group updates and practice data without lazy loads."""
+    async def run():
+        async with async_session_factory() as db:
+            with pytest.raises(HTTPException) as exc_info:
+                await async_activity_service.create_with_validation(db, obj_in=ActivityCreate(
+                    type="flashcard", name="Empty", practice_direction="forward", vocabulary_group_ids=[]
+                ))
+            assert exc_info.value.detail["code"] == "EMPTY_GROUP_IDS"
+            with pytest.raises(HTTPException) as exc_info:
+                await async_activity_service.create_with_validation(db, obj_in=ActivityCreate(
+                    type="flashcard", name="Missing", practice_direction="forward", vocabulary_group_ids=[999]
+                ))
+            assert exc_info.value.status_code == 404
+
+            activity = await async_activity_service.create_with_validation(db, obj_in=ActivityCreate(
+                type="flashcard", name="Verbs", practice_direction="reverse", vocabulary_group_ids=[vocabulary_group]
+            ))
+            activity_id = activity.id
+            await async_activity_service.update(db, db_obj=activity, obj_in=ActivityUpdate(name="All verbs"))
+
+        async with async_session_factory() as db:
+            activity = await async_activity_service.get(db, activity_id)
+            assert activity.name == "All verbs"
+            assert {item["word"] for item in activity.get_practice_vocabulary()} == {"laufen", "gehen"}
+            progress = await async_activity_service.get_progress(db, activity_id)
+            assert [p.attempt_count for p in progress] == [0, 0]
+            assert await async_activity_service.get_practice_version(db, id=activity_id) is not None
+
+    asyncio.run(run())
+
+
+def test_slow_query_does_not_block_event_loop(async_session_factory):
+    """Test that other coroutines keep running while a query executes."""
+    slow_query = text(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 2000000) "
+        "SELECT COUNT(*) FROM n"
+    )
+
+    async def run():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        async def query():
+            async with async_session_factory() as db:
+                result = await db.execute(slow_query)
+            done.set()
+            return result.scalar()
+
+        count, _ = await asyncio.gather(query(), ticker())
+        assert count == 2000000
+        assert ticks > 5
+
+    asyncio.run(run())
@@ -0,0 +1,135 @@
+"""Tests for the streaming exports."""
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.models  # noqa: F401  Registers all mappers
+from app.api.v1.endpoints import export
+from app.db.base_class import Base
+from app.db.database import get_read_engine
+from app.services.export import attempts_export, progress_export, stream_export, vocabulary_export
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of a database with 25 words, progress for 10 of them and 50 attempts."""
+    path = tmp_path / "export.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    tables = Base.metadata.tables
+    with engine.begin() as conn:
+        conn.execute(insert(tables["languages"]), [
+            {"id": 1, "code": "en", "name": "English"},
+            {"id": 2, "code": "de", "name": "German"},
+        ])
+        conn.execute(insert(tables["language_pairs"]), [{"id": 1, "source_language_id": 1, "target_language_id": 2}])
+        conn.execute(insert(tables["vocabularies"]), [
+            {"id": i, "word": f"Wort {i}, \"quoted\"", "translation": f"word {i}", "language_pair_id": 1}
+            for i in range(1, 26)
+        ])
+        conn.execute(insert(tables["vocabulary_groups"]), [{"id": 1, "name": "Basics", "language_pair_id": 1}])
+        conn.execute(insert(tables["vocabulary_group_association"]), [
+            {"vocabulary_id": i, "group_id": 1} for i in (2, 4, 6)
+        ])
+        conn.execute(insert(tables["vocabulary_progress"]), [
+            {"id": i, "vocabulary_id": i, "correct_attempts": i, "incorrect_attempts": 1, "mastered": i > 5,
+             "last_reviewed": START}
+            for i in range(1, 11)
+        ])
+        conn.execute(insert(tables["activities"]), [{"id": 1, "type": "flashcards", "name": "Cards"}])
+        conn.execute(insert(tables["sessions"]), [
+            {"id": 1, "activity_id": 1, "start_time": START},
+            {"id": 2, "activity_id": 1, "start_time": START},
+        ])
+        conn.execute(insert(tables["session_attempts"]), [
+            {"id": i, "session_id": 1 + i % 2, "vocabulary_id": 1 + i % 25, "is_correct": i % 3 == 0,
+             "response_time_ms": 100 * i, "created_at": START + timedelta(minutes=i)}
+            for i in range(1, 51)
+        ])
+    engine.dispose()
+    return path
+
+
+def export_chunks(path, stmt, export_format, batch_size=None):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+    async def run():
+        try:
+            return [chunk async for chunk in stream_export(engine, stmt, export_format, batch_size)]
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_ndjson_streamed_in_batches(database):
+    """Test that rows are fetched and encoded one batch per chunk."""
+    chunks = export_chunks(database, attempts_export(), "ndjson", batch_size=20)
+    assert [chunk.count(b"\n") for chunk in chunks] == [20, 20, 10]
+
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["id"] for row in rows] == list(range(1, 51))
+    assert rows[2] == {
+        "id": 3, "session_id": 2, "activity_id": 1, "vocabulary_id": 4, "is_correct": True,
+        "response_time_ms": 300, "created_at": rows[2]["created_at"],
+    }
+    assert datetime.fromisoformat(rows[2]["created_at"]).replace(tzinfo=UTC) == START + timedelta(minutes=3)
+
+
+def test_csv_export(database):
+    """Test the CSV header, quoting and value encoding."""
+    chunks = export_chunks(database, vocabulary_export(), "csv", batch_size=10)
+    assert len(chunks) == 4  # Header and three batches
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert len(rows) == 25
+    assert rows[0]["word"] == 'Wort 1, "quoted"'
+    assert list(rows[0]) == ["id", "word", "translation", "language_pair_id", "created_at", "updated_at"]
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(export_chunks(database, progress_export(mastered=True), "csv")).decode())))
+    assert [row["vocabulary_id"] for row in rows] == ["6", "7", "8", "9", "10"]
+    assert rows[0]["mastered"] == "true"
+
+
+def test_filters_and_resume(database):
+    """Test the export filters and resuming after an id."""
+    def ids(stmt):
+        return [json.loads(line)["id"] for chunk in export_chunks(database, stmt, "ndjson") for line in chunk.splitlines()]
+
+    assert ids(vocabulary_export(group_id=1)) == [2, 4, 6]
+    assert ids(vocabulary_export(after_id=22)) == [23, 24, 25]
+    assert ids(attempts_export(session_id=1, after_id=40)) == [42, 44, 46, 48, 50]
+    assert ids(attempts_export(since=START + timedelta(minutes=48))) == [48, 49, 50]
+    assert export_chunks(database, vocabulary_export(language_pair_id=2), "ndjson") == []
+
+
+def test_export_endpoint(database):
+    """Test the download headers and format selection of the endpoints."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    app = FastAPI()
+    app.include_router(export.router, prefix="/export")
+    app.dependency_overrides[get_read_engine] = lambda: engine
+    client = TestClient(app)
+
+    response = client.get("/export/attempts", params={"format": "csv", "activity_id": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="attempts.csv"'
+    assert len(response.text.splitlines()) == 51
+
+    response = client.get("/export/progress")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(response.text.splitlines()) == 10
+
+    assert client.get("/export/vocabularies", params={"format": "xml"}).status_code == 422
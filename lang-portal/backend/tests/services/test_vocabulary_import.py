@@ -0,0 +1,158 @@
+"""Tests for the streaming bulk vocabulary import."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.models  # noqa: F401  Registers all mappers
+from app.db.base_class import Base
+from app.db.database import use_immediate_transactions
+from app.db.writer import WriteQueue
+from app.models.associations import vocabulary_group_association
+from app.models.vocabulary import Vocabulary
+from app.services.vocabulary_import import VocabularyImporter, iter_lines
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of a database with two language pairs and a group on the first."""
+    path = tmp_path / "import.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    tables = Base.metadata.tables
+    with engine.begin() as conn:
+        conn.execute(insert(tables["languages"]), [
+            {"id": 1, "code": "en", "name": "English"},
+            {"id": 2, "code": "de", "name": "German"},
+            {"id": 3, "code": "es", "name": "Spanish"},
+        ])
+        conn.execute(insert(tables["language_pairs"]), [
+            {"id": 1, "source_language_id": 1, "target_language_id": 2},
+            {"id": 2, "source_language_id": 1, "target_language_id": 3},
+        ])
+        conn.execute(insert(tables["vocabulary_groups"]), [{"id": 1, "name": "Basics", "language_pair_id": 1}])
+    engine.dispose()
+    return path
+
+
+def import_lines(path, lines, import_format="csv", **options):
+    """Run one import over the given lines and return its result and the stored rows."""
+    read_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    writer_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    use_immediate_transactions(writer_engine)
+    writes = WriteQueue(async_sessionmaker(bind=writer_engine, expire_on_commit=False))
+
+    async def stream():
+        for line in lines:
+            yield line
+
+    async def run():
+        try:
+            async with async_sessionmaker(bind=read_engine)() as db:
+                result = await VocabularyImporter(db, writes, import_format, **options).run(stream())
+                rows = (await db.execute(
+                    select(Vocabulary.word, Vocabulary.translation, Vocabulary.language_pair_id).order_by(Vocabulary.word)
+                )).all()
+                grouped = (await db.execute(
+                    select(func.count()).select_from(vocabulary_group_association)
+                )).scalar()
+            return result, [tuple(row) for row in rows], grouped
+        finally:
+            await writes.close()
+            await read_engine.dispose()
+            await writer_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_iter_lines_splits_chunks():
+    """Test that lines split across chunks and multibyte characters are reassembled."""
+    async def chunks():
+        for chunk in (b"word,trans", b"lation\r\nStra\xc3", b"\x9fe,street\n", b"Haus,house"):
+            yield chunk
+
+    async def collect():
+        return [line async for line in iter_lines(chunks())]
+
+    assert asyncio.run(collect()) == ["word,translation", "Straße,street", "Haus,house"]
+
+
+def test_csv_upsert(database):
+    """Test that a re-import updates changed translations and counts the rest as unchanged."""
+    result, rows, _ = import_lines(database, [
+        "word,translation",
+        "Haus,house",
+        "Hund,dog",
+        "Katze,cat",
+    ], language_pair_id=1, batch_size=2)
+    assert result["processed"] == 3
+    assert result["written"] == 3
+    assert result["batches"] == 2
+
+    result, rows, _ = import_lines(database, [
+        "word,translation,language_pair_id",
+        "Haus,home,",
+        "Hund,dog,",
+        "Baum,tree,2",
+    ], language_pair_id=1)
+    assert result["written"] == 2
+    assert result["unchanged"] == 1
+    assert rows == [("Baum", "tree", 2), ("Haus", "home", 1), ("Hund", "dog", 1), ("Katze", "cat", 1)]
+
+    result, rows, _ = import_lines(database, ["word,translation", "Haus,building"], language_pair_id=1, on_conflict="skip")
+    assert result["written"] == 0
+    assert result["unchanged"] == 1
+    assert ("Haus", "home", 1) in rows
+
+
+def test_invalid_rows_are_reported(database):
+    """Test that invalid rows are skipped with their line numbers."""
+    result, rows, _ = import_lines(database, [
+        "word,translation",
+        "Haus,house",
+        ",empty",
+        "",
+        "Hund,dog,extra",
+        "Hund,hound",
+        "Hund,dog",
+    ], language_pair_id=1)
+
+    assert result["processed"] == 5
+    assert result["invalid"] == 2
+    assert result["duplicates"] == 1
+    assert [error["line"] for error in result["errors"]] == [3, 5]
+    assert result["errors"][0]["error"].startswith("word:")
+    assert rows == [("Haus", "house", 1), ("Hund", "dog", 1)]
+
+
+def test_jsonl_import_into_group(database):
+    """Test that imported words join the group once and other pairs are rejected."""
+    lines = [
+        '{"word": "Haus", "translation": "house"}',
+        '{"word": "Hund", "translation": "dog"}',
+        '{"word": "casa", "translation": "house", "language_pair_id": 2}',
+        "[1, 2]",
+    ]
+    result, rows, grouped = import_lines(database, lines, "jsonl", group_id=1)
+    assert result["written"] == 2
+    assert result["invalid"] == 2
+    assert grouped == 2
+
+    result, rows, grouped = import_lines(database, lines, "jsonl", group_id=1)
+    assert result["unchanged"] == 2
+    assert grouped == 2
+    assert rows == [("Haus", "house", 1), ("Hund", "dog", 1)]
+
+
+def test_missing_target_is_rejected(database):
+    """Test that unknown groups and CSV files without a usable header fail up front."""
+    with pytest.raises(HTTPException) as error:
+        import_lines(database, ["word,translation"], group_id=5)
+    assert error.value.status_code == 404
+
+    with pytest.raises(HTTPException) as error:
+        import_lines(database, ["word,meaning", "Haus,house"], language_pair_id=1)
+    assert error.value.status_code == 400
@@ -10,7 +10,8 @@ def cache():
     """Create a test cache instance."""
     cache = LocalCache()
     cache.clear()  # Ensure clean state
-    return cache
+    yield cache
+    cache.close()
 
 def test_basic_operations(cache):
     """Test basic cache operations."""